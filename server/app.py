@@ -1,9 +1,17 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pktcgai.routes.endpoints import router as pktcgai_router
+from pktcgai.graph.pokemon_tcg_graph import warm_up_graphs
 import uvicorn
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile the agent workflow before the first turn request arrives
+    warm_up_graphs()
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
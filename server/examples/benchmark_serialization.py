@@ -0,0 +1,51 @@
+import sys
+import timeit
+from collections import deque
+from collections.abc import Mapping
+from pathlib import Path
+
+# Make pktcgai importable when the script is run directly, e.g. python examples/benchmark_serialization.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pktcgai.decks import get_deck
+from pktcgai.state import get_initial_state, dataclass_to_dict, dict_to_player_state
+
+ITERATIONS = 2000
+
+
+def reflective_dataclass_to_dict(obj):
+    """The previous dataclass_to_dict, kept here as the baseline."""
+    if hasattr(obj, "__dataclass_fields__"):
+        return {field: reflective_dataclass_to_dict(getattr(obj, field)) for field in obj.__dataclass_fields__}
+    elif isinstance(obj, (list, deque)):  # The deck is a deque since Deck
+        return [reflective_dataclass_to_dict(item) for item in obj]
+    elif isinstance(obj, Mapping):
+        return {key: reflective_dataclass_to_dict(value) for key, value in obj.items()}
+    return obj
+
+
+def benchmark_serialization():
+    """Time serializing a full BoardState and reading a player back, old versus generated converters."""
+    state = get_initial_state(get_deck("gardevoir"), get_deck("pikachu"))
+    assert dataclass_to_dict(state) == reflective_dataclass_to_dict(state)
+    player_dict = dataclass_to_dict(state.playerOne)
+
+    timings = {
+        "BoardState to dict (reflective)": lambda: reflective_dataclass_to_dict(state),
+        "BoardState to dict (generated)": lambda: dataclass_to_dict(state),
+        "PlayerState to dict (reflective)": lambda: reflective_dataclass_to_dict(state.playerOne),
+        "PlayerState to dict (generated)": lambda: dataclass_to_dict(state.playerOne),
+        "PlayerState from dict (generated)": lambda: dict_to_player_state(player_dict),
+    }
+
+    print(f"{ITERATIONS} iterations each")
+    results = {}
+    for name, function in timings.items():
+        results[name] = timeit.timeit(function, number=ITERATIONS) / ITERATIONS * 1e6
+        print(f"{name:<36} {results[name]:8.1f} us")
+    print(f"\nBoardState speedup:  {results['BoardState to dict (reflective)'] / results['BoardState to dict (generated)']:.1f}x")
+    print(f"PlayerState speedup: {results['PlayerState to dict (reflective)'] / results['PlayerState to dict (generated)']:.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark_serialization()
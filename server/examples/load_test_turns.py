@@ -0,0 +1,67 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Make pktcgai importable when the script is run directly, e.g. python examples/load_test_turns.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# The agents must run on the scripted model, set before pktcgai reads it
+os.environ.setdefault("PKTCGAI_FAKE_LLM", "tokens_per_second=80,time_to_first_token=0.3,chunk_size=4,seed=7")
+
+from pktcgai.decks import get_deck
+from pktcgai.state import get_initial_state
+from pktcgai.events import NODE_HEADERS
+from pktcgai.routes.endpoints import process_player_turn, sessions, PLAYER_ONE_DECK, PLAYER_TWO_DECK
+
+
+async def play_turn(session, player_number):
+    """Consume one turn's SSE stream, returning (time to the first agent token, total time, error seen)."""
+    started = time.perf_counter()
+    first_token = None
+    agent_started = False
+    error = False
+    async for message in process_player_turn(session, player_number):
+        if any(header in message for header in NODE_HEADERS.values()):
+            agent_started = True
+        elif agent_started and first_token is None:
+            first_token = time.perf_counter() - started
+        if "ERROR" in message:
+            error = True
+    return first_token or 0.0, time.perf_counter() - started, error
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def load_test(games: int, turns: int):
+    game_sessions = [
+        sessions.create(get_initial_state(get_deck(PLAYER_ONE_DECK), get_deck(PLAYER_TWO_DECK), isPreset=True, seed=index))
+        for index in range(games)
+    ]
+    started = time.perf_counter()
+    results = []
+    for turn in range(turns):
+        # Every game plays its turn at the same time, players alternating between rounds
+        results += await asyncio.gather(*(play_turn(session, turn % 2 + 1) for session in game_sessions))
+    elapsed = time.perf_counter() - started
+
+    first_tokens = [result[0] for result in results]
+    totals = [result[1] for result in results]
+    print(f"{len(results)} turns over {games} concurrent games in {elapsed:.2f}s ({len(results) / elapsed:.1f} turns/s)")
+    print(f"First token:   median {statistics.median(first_tokens) * 1e3:.0f} ms, p95 {percentile(first_tokens, 0.95) * 1e3:.0f} ms")
+    print(f"Turn:          median {statistics.median(totals):.2f} s, p95 {percentile(totals, 0.95):.2f} s")
+    print(f"Turns with an error: {sum(result[2] for result in results)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run many turns concurrently against the scripted chat model (PKTCGAI_FAKE_LLM).")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(load_test(args.games, args.turns))
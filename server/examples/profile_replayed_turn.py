@@ -0,0 +1,53 @@
+import argparse
+import cProfile
+import pstats
+import sys
+import time
+from pathlib import Path
+
+# Make pktcgai importable when the script is run directly, e.g. python examples/profile_replayed_turn.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pktcgai.decks import get_deck
+from pktcgai.state import get_initial_state
+from pktcgai.routes.endpoints import prepare_game_state_for_player, PLAYER_ONE_DECK, PLAYER_TWO_DECK
+from pktcgai.graph.pokemon_tcg_graph import run_pokemon_tcg_turn
+from pktcgai.llm.ai import ANTHROPIC_LLM
+from pktcgai.llm.replay import RecordingChatModel, ReplayChatModel
+
+# The same seed deals the same board, so a recorded turn replays against the prompts it was recorded with
+SEED = 1234
+
+
+def run_turn(llm):
+    state = get_initial_state(get_deck(PLAYER_ONE_DECK), get_deck(PLAYER_TWO_DECK), isPreset=True, seed=SEED)
+    game_state, card_mapping = prepare_game_state_for_player(state, 1)
+    return run_pokemon_tcg_turn(game_state, card_mapping, llm=llm, card_map_hash=state.cardMapHash)
+
+
+def profile_replayed_turn():
+    """Record one turn against the live model, or replay a recording offline under the profiler."""
+    parser = argparse.ArgumentParser(description=profile_replayed_turn.__doc__)
+    parser.add_argument("log", help="Exchange log (.jsonl or .jsonl.gz)")
+    parser.add_argument("--record", action="store_true", help="Call the live model and record the turn to the log")
+    parser.add_argument("--realtime", action="store_true", help="Replay with the recorded delays")
+    parser.add_argument("--top", type=int, default=25, help="Functions to show in the profile")
+    args = parser.parse_args()
+
+    if args.record:
+        result = run_turn(RecordingChatModel(inner=ANTHROPIC_LLM, log_path=args.log))
+        print(f"Recorded a turn ending in: {result['explanation']}")
+        return
+
+    llm = ReplayChatModel(log_path=args.log, realtime=args.realtime)
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    result = run_turn(llm)
+    profiler.disable()
+    print(f"Replayed turn in {time.perf_counter() - started:.3f}s, legal: {result['is_legal']}")
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(args.top)
+
+
+if __name__ == "__main__":
+    profile_replayed_turn()
@@ -0,0 +1,158 @@
+from typing import Dict, List, Any, Optional
+from dataclasses import dataclass
+from enum import Enum
+import re
+
+from pktcgai.state import PlayerState
+from pktcgai.card_map import lookup_card
+
+# Card references in agent messages, the prompts require the "( id: N )" format
+CARD_ID_PATTERN = re.compile(r"\(\s*id:\s*(\d+)\s*\)")
+
+
+def _words(*words: str) -> re.Pattern:
+    """Match any of the words whole: "attack" but not "counter-attack" or "attacker"."""
+    return re.compile(r"(?<![\w-])(?:" + "|".join(words) + r")(?![\w-])")
+
+
+EVOLVE_WORDS = _words(r"evolv(?:e|es|ed|ing)")
+ATTACH_WORDS = _words(r"attach(?:es|ed|ing)?")
+RETREAT_WORDS = _words(r"retreat(?:s|ed|ing)?")
+ATTACK_WORDS = _words(r"attack(?:s|ed|ing)?")
+ACTIVE_WORDS = _words("active")
+# Other moves, a decision mentioning one of them is not a pass
+MOVE_WORDS = _words(
+    r"play(?:s|ed|ing)?", r"use(?:s|d)?", r"using", r"bench(?:es|ed|ing)?", r"switch(?:es|ed|ing)?",
+    r"search(?:es|ed|ing)?", r"draw(?:s|ing)?", r"discard(?:s|ed|ing)?"
+)
+# Moves whose cards or effects the parser cannot follow: Rare Candy skips a stage,
+# abilities have their own effects and cards taken from the discard pile or deck
+# are not in the hand
+INDIRECT_MOVE = re.compile(
+    r"(?<![\w-])(?:rare\s+candy|abilit(?:y|ies)|from\s+(?:my\s+|the\s+|your\s+)?(?:discard(?:\s+pile)?|deck))(?![\w-])"
+)
+# A decision that starts by passing: "Pass the turn.", "I pass", "I'll end my turn"
+PASS_DECISION = re.compile(
+    r"^(?:i(?:\s+will|'ll|\s+want\s+to)?\s+)?(?:pass(?:\s+(?:the|my|this)\s+turn)?|end\s+(?:the\s+|my\s+|this\s+)?turn)(?![\w-])"
+)
+
+
+class ActionKind(str, Enum):
+    ATTACH = "attach"
+    EVOLVE = "evolve"
+    BENCH = "bench"
+    PLAY_TRAINER = "play_trainer"
+    RETREAT = "retreat"
+    ATTACK = "attack"
+    PASS = "pass"
+
+
+@dataclass
+class Action:
+    """A single move by the player whose turn it is."""
+    kind: ActionKind
+    card_id: Optional[int] = None  # Card played from the hand
+    target_id: Optional[int] = None  # Pokémon in play the card goes onto, or the bench Pokémon to switch in
+    attack_name: Optional[str] = None
+
+
+def _in_play_ids(player: PlayerState) -> List[int]:
+    ids = [player.active.id] if player.active else []
+    ids.extend(pokemon.id for pokemon in player.bench or [])
+    return ids
+
+
+def parse_action(decision: str, player: PlayerState, card_map: Dict[Any, dict]) -> Optional[Action]:
+    """
+    Turn a Player "FINAL DECISION:" message into an Action.
+
+    The parser is deliberately conservative: card roles are resolved from the
+    zone each referenced id is in, and anything ambiguous (several kinds of move,
+    ids in neither the hand nor play, Rare Candy, abilities, cards taken from the
+    discard pile or deck) returns None so the Referee decides.
+
+    Args:
+        decision: The player's message
+        player: State of the player making the move
+        card_map: Mapping of card IDs to card details
+
+    Returns:
+        The parsed Action, or None if the move could not be classified with certainty
+    """
+    text = decision.rsplit("FINAL DECISION:", 1)[-1]
+    lowered = text.lower()
+    if INDIRECT_MOVE.search(lowered):
+        return None
+    card_ids = [int(card_id) for card_id in CARD_ID_PATTERN.findall(text)]
+
+    hand_ids = {card.id for card in player.hand or []}
+    in_play_ids = _in_play_ids(player)
+    # A card from anywhere else is moved by an effect the parser does not know
+    if any(card_id not in hand_ids and card_id not in in_play_ids for card_id in card_ids):
+        return None
+    in_play = [card_id for card_id in card_ids if card_id in in_play_ids]
+    played = [card_id for card_id in card_ids if card_id in hand_ids]
+    if len(set(played)) > 1:
+        return None
+
+    active_card = lookup_card(card_map, player.active.id) if player.active else None
+    attack_name = next(
+        (
+            attack["name"] for attack in (active_card or {}).get("attacks", [])
+            if _words(re.escape(attack["name"].lower())).search(lowered)
+        ),
+        None
+    )
+
+    kinds = set()
+    if EVOLVE_WORDS.search(lowered):
+        kinds.add(ActionKind.EVOLVE)
+    if ATTACH_WORDS.search(lowered):
+        kinds.add(ActionKind.ATTACH)
+    if RETREAT_WORDS.search(lowered):
+        kinds.add(ActionKind.RETREAT)
+    if ATTACK_WORDS.search(lowered) or attack_name:
+        kinds.add(ActionKind.ATTACK)
+    if len(kinds) > 1:
+        return None
+
+    card_id = played[0] if played else None
+    card = lookup_card(card_map, card_id) if card_id is not None else None
+
+    if kinds == {ActionKind.EVOLVE}:
+        if card is None or len(set(in_play)) != 1:
+            return None
+        return Action(ActionKind.EVOLVE, card_id=card_id, target_id=in_play[0])
+
+    if kinds == {ActionKind.ATTACH}:
+        if card is None:
+            return None
+        if in_play:
+            target_id = in_play[0]
+        elif ACTIVE_WORDS.search(lowered) and player.active:
+            target_id = player.active.id
+        else:
+            return None
+        return Action(ActionKind.ATTACH, card_id=card_id, target_id=target_id)
+
+    if kinds == {ActionKind.RETREAT}:
+        bench_ids = [card_id for card_id in in_play if not (player.active and card_id == player.active.id)]
+        return Action(ActionKind.RETREAT, target_id=bench_ids[0] if bench_ids else None)
+
+    if kinds == {ActionKind.ATTACK}:
+        if attack_name is None:
+            return None
+        return Action(ActionKind.ATTACK, attack_name=attack_name)
+
+    # No card is being played, only passing is left. Only a decision that opens
+    # with the pass and names no card or other move counts ("Battle VIP Pass", "bypass")
+    if card is None:
+        if not card_ids and PASS_DECISION.match(lowered.strip(" \t\n*\"'")) and not MOVE_WORDS.search(lowered):
+            return Action(ActionKind.PASS)
+        return None
+
+    if card.get("supertype") == "Pokémon":
+        return Action(ActionKind.BENCH, card_id=card_id)
+    if card.get("supertype") == "Trainer":
+        return Action(ActionKind.PLAY_TRAINER, card_id=card_id)
+    return None
@@ -0,0 +1,263 @@
+from typing import Dict, List, Any, Callable, Optional, Iterator, Set, Tuple
+from collections import OrderedDict
+from collections.abc import Mapping
+from array import array
+import hashlib
+import json
+import threading
+
+# Serialized relevant card subsets keyed by (content hash, referenced ids, on-board
+# ids of brief lists). A game's card map never changes, so every Player/Mentor/Referee
+# call on the same view reuses the same string.
+_SERIALIZED_CARD_MAPS: "OrderedDict[tuple, str]" = OrderedDict()
+_SERIALIZED_CARD_MAPS_LOCK = threading.Lock()
+MAX_SERIALIZED_CARD_MAPS = 256
+
+# Card fields no agent needs to decide or judge a move, never sent in prompts
+PROMPT_OMITTED_FIELDS = ("images",)
+# Zones of a player view whose cards are out of play
+OFF_BOARD_ZONES = ("deck", "discard", "lostZone", "prizeCards")
+
+
+def hash_card_map(card_map: Dict[Any, dict]) -> str:
+    """
+    Compute a stable content hash of a card map.
+
+    Keys are normalised to strings so the hash is the same before and after a
+    JSON round trip. Call this once per game and pass the result around.
+    """
+    payload = json.dumps({str(key): value for key, value in card_map.items()}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def lookup_card(card_map: Dict[Any, dict], card_id: Any) -> Optional[dict]:
+    """Look up a card by id in a map keyed by int (BoardState) or str (after a JSON round trip)."""
+    card = card_map.get(card_id)
+    if card is None:
+        card = card_map.get(str(card_id))
+    if card is None and isinstance(card_id, str) and card_id.isdigit():
+        card = card_map.get(int(card_id))
+    return card
+
+
+class CardDatabase:
+    """
+    Process-wide store of card definitions, deduplicated by content.
+
+    Each distinct card is stored once and identified by its index, so every game
+    (and every copy of a card within a deck) refers to the same definition.
+    Definitions are shared and must not be modified. The database only grows.
+    """
+
+    def __init__(self):
+        self._cards: List[dict] = []
+        self._index: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # (kind, index) -> value derived from a definition, see derived()
+        self._derived: Dict[Tuple[str, int], Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def __getitem__(self, index: int) -> dict:
+        return self._cards[index]
+
+    def intern(self, card: dict) -> int:
+        """Return the index of a card definition, adding it on first sight."""
+        # Same-name cards can differ (e.g. two Ralts prints), so dedupe on the full content
+        key = json.dumps(card, sort_keys=True)
+        index = self._index.get(key)
+        if index is None:
+            with self._lock:
+                index = self._index.get(key)
+                if index is None:
+                    index = len(self._cards)
+                    self._cards.append(card)
+                    self._index[key] = index
+        return index
+
+    def derived(self, kind: str, index: int, build: Callable[[dict], Any]) -> Any:
+        """
+        A value built from a definition (e.g. a trimmed view of the card), built once
+        per kind and kept with this database. Shared, must not be modified.
+        """
+        key = (kind, index)
+        value = self._derived.get(key)
+        if value is None:
+            value = self._derived[key] = build(self._cards[index])
+        return value
+
+
+# Definitions of every card dealt in this process
+card_database = CardDatabase()
+
+
+class GameCardMap(Mapping):
+    """
+    A game's card ids mapped to shared definitions in the card database.
+
+    The game only stores one definition index per card id (card ids are
+    consecutive from 0), yet the object reads like the Dict[int, dict] card
+    maps used everywhere else, so it can be used as BoardState.cardMap directly.
+    """
+    __slots__ = ("_handles", "_database")
+
+    def __init__(self, handles: array, database: CardDatabase = card_database):
+        self._handles = handles
+        self._database = database
+
+    @classmethod
+    def from_decks(cls, *decks: List[dict], database: CardDatabase = card_database) -> "GameCardMap":
+        """Intern the cards of each deck in order, ids continue from one deck to the next."""
+        return cls(array("H", (database.intern(card) for deck in decks for card in deck)), database)
+
+    @property
+    def database(self) -> CardDatabase:
+        """The database holding the definitions, handles index into it."""
+        return self._database
+
+    def handle(self, card_id: int) -> int:
+        """Index of the card's definition, equal for every copy of the same card."""
+        if not isinstance(card_id, int) or not 0 <= card_id < len(self._handles):
+            raise KeyError(card_id)
+        return self._handles[card_id]
+
+    def __getitem__(self, card_id: int) -> dict:
+        return self._database[self.handle(card_id)]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self._handles)))
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+
+def _get_cached(key: tuple) -> Optional[str]:
+    with _SERIALIZED_CARD_MAPS_LOCK:
+        serialized = _SERIALIZED_CARD_MAPS.get(key)
+        if serialized is not None:
+            _SERIALIZED_CARD_MAPS.move_to_end(key)
+        return serialized
+
+
+def _put_cached(key: tuple, serialized: str) -> None:
+    with _SERIALIZED_CARD_MAPS_LOCK:
+        _SERIALIZED_CARD_MAPS[key] = serialized
+        while len(_SERIALIZED_CARD_MAPS) > MAX_SERIALIZED_CARD_MAPS:
+            _SERIALIZED_CARD_MAPS.popitem(last=False)
+
+
+def referenced_card_ids(game_state: Any) -> List[int]:
+    """
+    Collect the card ids referenced anywhere in a prepared game state.
+
+    Hidden zones are already reduced to "N cards" strings by
+    prepare_game_state_for_player, so only visible cards are returned.
+
+    Returns:
+        Sorted, de-duplicated list of card ids
+    """
+    card_ids = set()
+    pending = [game_state]
+    while pending:
+        obj = pending.pop()
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                if key == "id" and isinstance(value, (int, str)):
+                    card_ids.add(int(value))
+                elif isinstance(value, (dict, list)):
+                    pending.append(value)
+        elif isinstance(obj, list):
+            pending.extend(obj)
+    return sorted(card_ids)
+
+
+def on_board_card_ids(game_state: Any) -> Set[int]:
+    """
+    Collect the card ids of a prepared game state outside OFF_BOARD_ZONES: cards
+    in play, in hand and the stadium.
+    """
+    if not isinstance(game_state, dict):
+        return set(referenced_card_ids(game_state))
+    card_ids = set()
+    for side in game_state.values():
+        if isinstance(side, dict):
+            side = {zone: cards for zone, cards in side.items() if zone not in OFF_BOARD_ZONES}
+        card_ids.update(referenced_card_ids(side))
+    return card_ids
+
+
+def _brief_card(card: dict) -> dict:
+    """A card without its rules text, attack and ability names are kept."""
+    brief = {key: value for key, value in card.items() if key != "rules"}
+    for key in ("attacks", "abilities"):
+        if isinstance(card.get(key), list):
+            brief[key] = [
+                {field: value for field, value in item.items() if field != "text"} if isinstance(item, dict) else item
+                for item in card[key]
+            ]
+    return brief
+
+
+def relevant_card_subset(game_state: Any, card_map: Dict[Any, dict], brief: bool = False) -> List[dict]:
+    """
+    Build the card reference list for only the cards visible in a game state.
+
+    Copies of the same card (same name and details) share one entry whose "ids"
+    lists every instance, so four copies of an energy cost a single entry. Fields
+    in PROMPT_OMITTED_FIELDS are left out.
+
+    Args:
+        game_state: Prepared game state (YOUR_HAND / OPPONENT_HAND)
+        card_map: Mapping of card IDs (int or str keys) to card details
+        brief: Leave out the rules text of cards that are all off the board
+            (deck, discard, lost zone, prizes), to fit a prompt into its token budget
+
+    Returns:
+        List of card details, each with an "ids" key, ordered by first id
+    """
+    entries: Dict[Any, dict] = {}
+    for card_id in referenced_card_ids(game_state):
+        card = lookup_card(card_map, card_id)
+        if card is None:
+            continue
+        # Same-name cards can differ (e.g. two Ralts prints), so group on content;
+        # interned maps already know which ids share a definition
+        key = card_map.handle(card_id) if isinstance(card_map, GameCardMap) else json.dumps(card, sort_keys=True)
+        entry = entries.get(key)
+        if entry is None:
+            entries[key] = {"ids": [card_id], **{field: value for field, value in card.items() if field not in PROMPT_OMITTED_FIELDS}}
+        else:
+            entry["ids"].append(card_id)
+    if not brief:
+        return list(entries.values())
+
+    on_board = on_board_card_ids(game_state)
+    return [entry if on_board.intersection(entry["ids"]) else _brief_card(entry) for entry in entries.values()]
+
+
+def serialize_relevant_cards(game_state: Any, card_map: Dict[Any, dict], card_map_hash: Optional[str] = None,
+                             brief: bool = False) -> str:
+    """
+    Return the JSON string of relevant_card_subset, cached per set of visible cards.
+
+    Args:
+        game_state: Prepared game state (YOUR_HAND / OPPONENT_HAND)
+        card_map: Mapping of card IDs to card details
+        card_map_hash: Hash from hash_card_map, the cache is bypassed when missing
+        brief: See relevant_card_subset
+
+    Returns:
+        The serialized card subset
+    """
+    if card_map_hash is None:
+        return json.dumps(relevant_card_subset(game_state, card_map, brief))
+
+    # Which cards are on the board only matters for brief lists
+    placement = tuple(sorted(on_board_card_ids(game_state))) if brief else None
+    key = (card_map_hash, tuple(referenced_card_ids(game_state)), placement)
+    serialized = _get_cached(key)
+    if serialized is None:
+        serialized = json.dumps(relevant_card_subset(game_state, card_map, brief))
+        _put_cached(key, serialized)
+    return serialized
@@ -1,5 +1,6 @@
 from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
 from pktcgai.llm.ai import ANTHROPIC_LLM
+from pktcgai.prompts.layout import layered_prompt, PromptSegment, STATIC, PER_GAME, PER_TURN, PER_CALL
 from langchain.agents import AgentExecutor, create_react_agent
 from langchain.tools import Tool
 from langchain.schema import AgentAction, AgentFinish
@@ -26,7 +27,9 @@ class Master:
         #     )
         # ]
         
-        self.prompt = ChatPromptTemplate.from_template("""
+        # Most stable first so the provider can reuse the cached prefix (see pktcgai.prompts.layout)
+        self.prompt = layered_prompt([
+            PromptSegment(STATIC, """
         You are a master mentor for Pokemon Trading Card Game players. You have deep expertise in all aspects of the game.
         Your role is to advise a player agent who is trying to make decisions in a Pokemon TCG match.
                                                        
@@ -34,13 +37,7 @@ class Master:
         2. Never propose a move that does not follow the rules of the game
         3. Only assume it's your first turn of the game if you ONLY have a single pokemon card in the active spot and 6 cards in your hand, i.e., the rest of the cards are in the prizes and deck.    
         
-        The current game state is provided as a JSON object:
-        {game_state}
-                                                       
-        You will notice that the game state has "id" values for the pokemon card it is referring to. The card for each id is as follows:
-        {card_id_to_card_mapping}
-    
-        Here is an explination on how to interpret the JSON above that represents the game state:
+        Here is an explination on how to interpret the JSON below that represents the game state:
                 - The JSON object represents what cards belong with part of the Pokemon Game setup.
                 - The JSON shows you all the cards you have in your deck, but this is in no particular order
                 - "active": refers to the pokemon ids that your current active pokemon
@@ -70,16 +67,8 @@ class Master:
 
         Carefully reason about the cards you have available to play, for example you know what pokemon ids/card are in your deck but you may not have them in your hand so don't play them
                                                        
-        You learn more about the id of a pokemon in teh game state through the card id to pokemon mapping above
+        You learn more about the id of a pokemon in teh game state through the card id to pokemon mapping below
                                                         
-        You and the player have had this conversation for far:
-        {mentor_player_conversation}
-                                                       
-        The player has asked the following question or is considering the following decisions:
-        {player_question}
-        
-        
-        
         Think step by step about the implications of different moves.
         Consider factors like:
         - Energy management and attachment strategy
@@ -95,7 +84,25 @@ class Master:
         EXTREMELY IMPORTANT: Your entire response must be no more than 1-2 sentences total. Be direct and concise with your advice.
         
         Do not include any explanations, greetings, or follow-up questions. Just provide a single, precise recommendation in 1-2 sentences.
-        """)
+"""),
+            PromptSegment(PER_GAME, """
+        The game state has "id" values for the pokemon card it is referring to. The card for each id is as follows (each entry lists every id that refers to that card under "ids"):
+        {card_id_to_card_mapping}
+"""),
+            PromptSegment(PER_TURN, """
+        Here is the current game state as a JSON object:
+        {game_state}
+"""),
+            PromptSegment(PER_CALL, """
+        You and the player have had this conversation for far:
+        {mentor_player_conversation}
+                                                       
+        The player has asked the following question or is considering the following decisions:
+        {player_question}
+
+        Give your recommendation now, in 1-2 sentences.
+        """),
+        ])
         
     # def _create_vector_store(self):
     #     """Create a vector store from all documents in the text folder"""
@@ -325,7 +332,7 @@ class Master:
     #         handle_parsing_errors=True,
     #         max_iterations=10
     #     )
-    def make_chain(self):
-        mentor_chain = self.prompt | ANTHROPIC_LLM.with_config({"callbacks": None, "streaming": True})
+    def make_chain(self, llm=None):
+        mentor_chain = self.prompt | (llm or ANTHROPIC_LLM).with_config({"callbacks": None, "streaming": True})
         return mentor_chain
     
\ No newline at end of file
@@ -1,19 +1,18 @@
 from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
 from pktcgai.llm.ai import ANTHROPIC_LLM
+from pktcgai.prompts.layout import layered_prompt, PromptSegment, STATIC, PER_GAME, PER_TURN, PER_CALL
 
 class Player:
     def __init__(self):
-        self.prompt = ChatPromptTemplate.from_template("""
+        # Most stable first so the provider can reuse the cached prefix (see pktcgai.prompts.layout)
+        self.prompt = layered_prompt([
+            PromptSegment(STATIC, """
             You are a Pokémon player, who is very knowledgeable about the Pokemon Trading card game battle mechanics.
-            You are given a deck of Pokémon cards which is represented through the following JSON:
-            {game_state}
-                                                       
-            You will notice that the game state has id/integer values for the pokemon card it is referring to. The card for each id is as follows:
-            {card_id_to_card_mapping}
+            You are given a deck of Pokémon cards which is represented through the game state JSON given below.
                                                        
             Only assume it's your first turn of the game if you ONLY have a single pokemon card in the active spot and 6 cards in your hand, i.e., the rest of the cards are in the prizes and deck.    
                                                        
-            Here is an explination on how to interpret the JSON above that represents the game state:
+            Here is an explination on how to interpret the JSON below that represents the game state:
                 - The JSON object represents what cards belong with part of the Pokemon Game setup.
                 - The JSON shows you all the cards you have in your deck, but this is in no particular order
                 - "active": refers to the pokemon ids that your current active pokemon
@@ -41,7 +40,7 @@ class Player:
                         Prize cards are six cards set aside at the start of the game. Each time you knock out an opponent's Pokémon, you take one of your Prize cards. The goal is to take all six Prize cards to win the game.
                         Managing Prize cards is important, as sometimes key cards may be stuck in your Prize pool, requiring strategies to retrieve them (e.g., using cards like Hisuian Heavy Ball).
 
-            You learn more about the id of a pokemon in teh game state through the card id to pokemon mapping above
+            You learn more about the id of a pokemon in teh game state through the card id to pokemon mapping below
 
             You task is to describe an action you want to take on the state. Any action is valid as long as it respects the rule of the Pokemon TCG game. 
                                                        
@@ -51,9 +50,6 @@ class Player:
             You are allowed to talk with your mentor my asking any questions you have. You can even ask if for feedback on your moves, and anything else.
             However, YOU CAN ONLY INTERACT WITH THE MENTOR ONCE and ONLY ONCE!!!
             
-            Here is your current conversation with your mentor:
-            {mentor_player_conversation}
-                                                       
             When you propose your next move. If you're ready to make a final decision, include the phrase: FINAL DECISION: <your move here>.
             YOU MUST INCLUDE "FINAL DECISION" IN YOUR ANSWER IF AND ONLY IF YOU NO LONGER WANT TO TALK TO THE MENTOR.
             Without "FINAL DECISION" it will be assumed anything you ask will be directed to the mentor for their feedback
@@ -65,9 +61,24 @@ class Player:
             Do not include any explanations, greetings, or verbose descriptions. Just state your question or decision clearly and concisely.
 
             When referring to card IDs, you MUST use the format ( id: number ), including the parentheses. Any other format will fail. Double check your format before submitting your final decision.
-        """)
+"""),
+            PromptSegment(PER_GAME, """
+            The game state has id/integer values for the pokemon card it is referring to. The card for each id is as follows (each entry lists every id that refers to that card under "ids"):
+            {card_id_to_card_mapping}
+"""),
+            PromptSegment(PER_TURN, """
+            Here is the current game state as a JSON object:
+            {game_state}
+"""),
+            PromptSegment(PER_CALL, """
+            Here is your current conversation with your mentor:
+            {mentor_player_conversation}
+
+            Propose your next move now, with "FINAL DECISION: <your move here>" only if you no longer want to talk to the mentor.
+        """),
+        ])
 
-    def make_chain(self):
-        player_chain = self.prompt | ANTHROPIC_LLM.with_config({"callbacks": None, "streaming": True})
+    def make_chain(self, llm=None):
+        player_chain = self.prompt | (llm or ANTHROPIC_LLM).with_config({"callbacks": None, "streaming": True})
         return player_chain
     
\ No newline at end of file
@@ -1,25 +1,289 @@
 from langchain_core.prompts import ChatPromptTemplate
 from pktcgai.llm.ai import ANTHROPIC_LLM
+from pktcgai.prompts.layout import layered_prompt, PromptSegment, STATIC, PER_GAME, PER_TURN, PER_CALL
+from pktcgai.card_map import serialize_relevant_cards
+from pktcgai.prompts.budget import NODE_BUDGETS, REFEREE, CARD_COMPACTION_STAGES, Compaction, fit_to_budget, prompt_overhead, usage_report, add_chunk_usage
+from pktcgai.events import emit, aemit, TOKEN, ERROR, VERDICT, PARTIAL_STATE, TOKEN_USAGE
+from pktcgai.patch import parse_patch, patch_to_dict, PatchError
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
+from collections.abc import Mapping
 import json
 import re
 
-class Referee:
+# Parser modes of RefereeResponseStream
+TEXT, FENCE_INFO, JSON_BLOCK, CODE_BLOCK = range(4)
+
+ILLEGAL_MARKER = "ILLEGAL ACTION"
+UNREADABLE_PATCH_MESSAGE = "The Referee's changes could not be read, asking for the full game state instead."
+
+
+class RefereeResponseStream:
+    """
+    Incremental parser for a streamed referee response.
+    
+    Every chunk is scanned once. Text outside the ```json fence is returned for
+    display, the fenced JSON is tokenized as it arrives so each completed top-level
+    member (e.g. "YOUR_HAND", or "moves" in diff mode) is available before the block
+    closes, and an "ILLEGAL ACTION" verdict is noticed as soon as it is streamed.
+    Fence markers split across chunks are held back until the next chunk decides them.
+    
+    Shared by Referee.invoke and Referee.ainvoke so both stream identically.
+    """
     def __init__(self):
-        self.prompt = ChatPromptTemplate.from_template("""
+        self._parts = []
+        self._visible_parts = []
+        self._json_parts = []
+        self.mode = TEXT
+        # Backticks or fence info string that the next chunk has to complete
+        self._pending = ""
+        self._fence_info = ""
+        # End of the visible text, to find a verdict split across chunks
+        self._tail = ""
+        self.is_illegal = False
+        self.json_value = None
+        self.json_error = None
+        self.partial_state = {}
+        # (event type, data) pairs for the caller to publish
+        self.events = []
+        
+        # JSON tokenizer state
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member = None
+    
+    @property
+    def full_response(self):
+        return "".join(self._parts)
+    
+    @property
+    def visible_response(self):
+        return "".join(self._visible_parts)
+    
+    @property
+    def json_content(self):
+        return "".join(self._json_parts)
+    
+    @property
+    def finished(self):
+        """An illegal move has been announced and only the (unchanged) JSON is left to stream."""
+        return self.is_illegal and self.mode == JSON_BLOCK
+    
+    def pop_events(self):
+        events, self.events = self.events, []
+        return events
+    
+    def feed(self, chunk_text):
+        """Consume a chunk and return the part of it that should be shown to the user."""
+        self._parts.append(chunk_text)
+        text = self._pending + chunk_text
+        self._pending = ""
+        visible = []
+        index = 0
+        
+        while index < len(text):
+            if self.mode in (TEXT, CODE_BLOCK):
+                fence = text.find("```", index)
+                if fence == -1:
+                    # Up to two trailing backticks may be the start of a fence
+                    end = len(text)
+                    while end > index and text[end - 1] == "`" and len(text) - end < 2:
+                        end -= 1
+                    self._pending = text[end:]
+                    visible.append(text[index:end])
+                    break
+                if self.mode == CODE_BLOCK:
+                    # Fences other than ```json are shown as they are
+                    visible.append(text[index:fence + 3])
+                    self.mode = TEXT
+                else:
+                    visible.append(text[index:fence])
+                    self.mode = FENCE_INFO
+                index = fence + 3
+            elif self.mode == FENCE_INFO:
+                newline = text.find("\n", index)
+                if newline == -1:
+                    self._fence_info += text[index:]
+                    break
+                info = self._fence_info + text[index:newline]
+                self._fence_info = ""
+                if info.strip() == "json":
+                    self.mode = JSON_BLOCK
+                else:
+                    visible.append("```" + info + "\n")
+                    self.mode = CODE_BLOCK
+                index = newline + 1
+            else:
+                index = self._scan_json(text, index)
+        
+        visible_text = "".join(visible)
+        self._add_visible(visible_text)
+        return visible_text
+    
+    def _add_visible(self, visible_text):
+        if not visible_text:
+            return
+        self._visible_parts.append(visible_text)
+        if not self.is_illegal and ILLEGAL_MARKER in self._tail + visible_text:
+            self.is_illegal = True
+            self.events.append((VERDICT, {"is_legal": False}))
+        self._tail = (self._tail + visible_text)[-(len(ILLEGAL_MARKER) - 1):]
+    
+    def _scan_json(self, text, start):
+        """Tokenize JSON from text[start:], returning the index after the closing fence or len(text)."""
+        mark = start
+        for index in range(start, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._member = []
+                    mark = index + 1
+            elif char in "}]" or (char == "," and self._depth == 1):
+                if self._depth == 1 and self._member is not None:
+                    self._member.append(text[mark:index])
+                    self._finish_member("".join(self._member))
+                    self._member = [] if char == "," else None
+                    mark = index + 1
+                if char != ",":
+                    self._depth -= 1
+            elif char == "`" and text.startswith("```", index):
+                self._json_parts.append(text[start:index])
+                self._close_json()
+                return index + 3
+            elif char == "`" and index + 3 > len(text):
+                # A closing fence split across chunks, decide on the next chunk
+                self._json_parts.append(text[start:index])
+                if self._member is not None:
+                    self._member.append(text[mark:index])
+                self._pending = text[index:]
+                return len(text)
+        self._json_parts.append(text[start:])
+        if self._member is not None:
+            self._member.append(text[mark:])
+        return len(text)
+    
+    def _finish_member(self, member_text):
+        # A top-level "key": value pair of the JSON object is complete
+        if not member_text.strip():
+            return
+        try:
+            member = json.loads("{" + member_text + "}")
+        except json.JSONDecodeError:
+            return
+        self.partial_state.update(member)
+        self.events.append((PARTIAL_STATE, member))
+    
+    def _close_json(self):
+        self.mode = TEXT
+        try:
+            self.json_value = json.loads(self.json_content)
+        except json.JSONDecodeError as e:
+            self.json_error = e
+    
+    def close(self):
+        """Finish the stream and return any visible text that was held back."""
+        if self.mode == JSON_BLOCK:
+            # Unterminated JSON block, keep whatever parses without showing it.
+            # After an illegal verdict it is the unchanged state and is not needed.
+            if not self.is_illegal:
+                self._json_parts.append(self._pending.rstrip("`"))
+                self._close_json()
+            self._pending = ""
+        visible_text = self._pending
+        self._pending = ""
+        self._add_visible(visible_text)
+        if not self.is_illegal:
+            self.events.append((VERDICT, {"is_legal": True}))
+        return visible_text
+
+
+# Output section of the Referee prompt when the Referee restates the whole game state
+FULL_STATE_INSTRUCTIONS = """
+        Then, if the action is legal:
+        1. Update the game state JSON to reflect the changes caused by the action
+            - For example if the opponent pokemon has 100 hp and the player attacks for 50, the opponent pokemon should be updated to have 50 hp
+            - If a prize card is taken, update the game state to reflect the prize card being taken.
+            - If a pokemon is knocked out, update the ids in the discard pile to reflect the pokemon being knocked out. This applies for both players.
+            - As part of the players action if they want to look for a card in the deck and place it in their hand, you must update the "hand" key in the game state to reflect the ids of the card being drawn.
+            - If the player is not specific enough, for example the player simply states they want to search for a basic card to add to their hand then you MUST ABSOLUTELY MUST choose which basic pokemon card they draw to their hand and update the game state accordingly. The same applies for other vague actions in you are able to reason about it.
+            - And so on....
+        2. Return the new game state as a valid JSON object
+
+        If the action is illegal:
+        1. Do not modify the game state
+        2. Explain why the action is not legal
+        3. Start your response with "ILLEGAL ACTION:"
+
+        ALWAYS MAINTAIN THE EXACT STRUCTURE OF THE ORIGINAL GAME STATE JSON BUT UPDATE THE RELEVANT VALUES.
+        YOU FAIL YOUR TASK IF YOU DO NOT FOLLOW THIS INSTRUCTION.
+                                                       
+        NEVER OUTPUT THE CARD ID MAPPING IN YOUR RESPONSE, ONLY THE GAME STATE!!!
+
+        When referring to card IDs, you MUST use the format ( id: number ), including the parentheses. Any other format will fail. Double check your format before submitting your final decision.
+ 
+        Updated Game State:
+        ```json
+        {{Updated game state JSON if the action is legal or the original game state if the action is illegal}}
+        ```
+        
+"""
+
+# Output section of the Referee prompt in diff mode, the Referee only lists what changed
+STATE_PATCH_INSTRUCTIONS = """
+        Then, if the action is legal:
+        1. Work out every change the action makes to the game state
+            - Each card that changes zone is one move: {{"card_id": id, "from": zone, "to": zone}}
+            - Zones of the player taking the turn are "hand", "deck", "discard", "lostZone", "prizeCards", "active", "bench" and "stadium"
+            - Zones of the opponent use the same names prefixed with "opponent.", for example "opponent.discard"
+            - Cards attached to a pokemon in play use "attached:<pokemon id>", for example an energy attached to ( id: 12 ) moves to "attached:12"
+            - An evolution card played onto a pokemon in play moves to "evolve:<pokemon id>"
+            - When a pokemon leaves play (for example when it is knocked out) only move the pokemon itself, the cards attached to it go with it
+            - Each change in hp is one entry: {{"card_id": id of the pokemon in play, "delta": change in hp}}, for example -50 when it takes 50 damage
+            - If a prize card is taken, move it from "prizeCards" to "hand".
+            - If the player is not specific enough, for example the player simply states they want to search for a basic card to add to their hand then you MUST ABSOLUTELY MUST choose which basic pokemon card they draw to their hand and list the move accordingly. The same applies for other vague actions in you are able to reason about it.
+        2. Return the changes as a valid JSON object, listing the moves in the order they happen
+
+        If the action is illegal:
+        1. Do not list any changes
+        2. Explain why the action is not legal
+        3. Start your response with "ILLEGAL ACTION:"
+
+        NEVER OUTPUT THE GAME STATE OR THE CARD ID MAPPING IN YOUR RESPONSE, ONLY THE CHANGES!!!
+
+        When referring to card IDs, you MUST use the format ( id: number ), including the parentheses. Any other format will fail. Double check your format before submitting your final decision.
+ 
+        Changes:
+        ```json
+        {{"moves": [], "hp": []}}
+        ```
+        
+"""
+
+
+class Referee:
+    def __init__(self, llm=None, diff_mode=False):
+        # In diff mode the Referee returns a StatePatch instead of the full updated game state
+        self.diff_mode = diff_mode
+        output_instructions = STATE_PATCH_INSTRUCTIONS if diff_mode else FULL_STATE_INSTRUCTIONS
+        # Most stable first so the provider can reuse the cached prefix (see pktcgai.prompts.layout)
+        self.prompt = layered_prompt([
+            PromptSegment(STATIC, """
         You are a Referee for a Pokemon Trading Card Game match. Your job is to:
         1. Determine if a player's proposed action is legal according to the Pokemon TCG rules
         2. Update the game state based on the action if it is legal
 
-        Here is the current game state as a JSON object:
-        {game_state}
-                                                       
-        You will notice that the game state has "id" values for the pokemon card it is referring to. The card for each id is as follows:
-        {card_id_to_card_mapping}
-        The description of each card above is only for your reference to update the game state correctly, you must not output the card id mapping in your response.
-       
-         Here is an explination on how to interpret the JSON above that represents the game state:
+         Here is an explination on how to interpret the JSON below that represents the game state:
                 - The JSON object represents what cards belong with part of the Pokemon Game setup.
                 - The JSON shows you all the cards you have in your deck, but this is in no particular order
                 - "active": refers to the pokemon ids that your current active pokemon
@@ -47,63 +311,52 @@ class Referee:
                         Prize cards are six cards set aside at the start of the game. Each time you knock out an opponent's Pokémon, you take one of your Prize cards. The goal is to take all six Prize cards to win the game.
                         Managing Prize cards is important, as sometimes key cards may be stuck in your Prize pool, requiring strategies to retrieve them (e.g., using cards like Hisuian Heavy Ball).
 
-        You learn more about the id of a pokemon in teh game state through the card id to pokemon mapping above                      
+        You learn more about the id of a pokemon in teh game state through the card id to pokemon mapping below                      
 
-        The player has proposed the following action:
-        {player_action}
-
-        
-        Then, if the action is legal:
-        1. Update the game state JSON to reflect the changes caused by the action
-            - For example if the opponent pokemon has 100 hp and the player attacks for 50, the opponent pokemon should be updated to have 50 hp
-            - If a prize card is taken, update the game state to reflect the prize card being taken.
-            - If a pokemon is knocked out, update the ids in the discard pile to reflect the pokemon being knocked out. This applies for both players.
-            - As part of the players action if they want to look for a card in the deck and place it in their hand, you must update the "hand" key in the game state to reflect the ids of the card being drawn.
-            - If the player is not specific enough, for example the player simply states they want to search for a basic card to add to their hand then you MUST ABSOLUTELY MUST choose which basic pokemon card they draw to their hand and update the game state accordingly. The same applies for other vague actions in you are able to reason about it.
-            - And so on....
-        2. Return the new game state as a valid JSON object
-
-        If the action is illegal:
-        1. Do not modify the game state
-        2. Explain why the action is not legal
-        3. Start your response with "ILLEGAL ACTION:"
-
-        ALWAYS MAINTAIN THE EXACT STRUCTURE OF THE ORIGINAL GAME STATE JSON BUT UPDATE THE RELEVANT VALUES.
-        YOU FAIL YOUR TASK IF YOU DO NOT FOLLOW THIS INSTRUCTION.
-                                                       
-        NEVER OUTPUT THE CARD ID MAPPING IN YOUR RESPONSE, ONLY THE GAME STATE!!!
-
-        When referring to card IDs, you MUST use the format ( id: number ), including the parentheses. Any other format will fail. Double check your format before submitting your final decision.
- 
-        Updated Game State:
-        ```json
-        {{Updated game state JSON if the action is legal or the original game state if the action is illegal}}
-        ```
-        
+""" + output_instructions + """
         EXTREMELY IMPORTANT: Your explanation must be only 1-2 sentences maximum. Do not include any thought process, greetings, or verbose explanations.
         
         If the action is legal, only mention that the action was legal NOTHING ELSE, DO NOT SAY WHY ITS LEGAL OR WHY IT MIGHT BE A GOOD MOVE YOU FAIL IF YOU DO.
         If the action is illegal, start with "ILLEGAL ACTION:" followed by a single sentence explaining why.
-        """)
+"""),
+            PromptSegment(PER_GAME, """
+        The game state has "id" values for the pokemon card it is referring to. The card for each id is as follows (each entry lists every id that refers to that card under "ids"):
+        {card_id_to_card_mapping}
+        The description of each card above is only for your reference to update the game state correctly, you must not output the card id mapping in your response.
+"""),
+            PromptSegment(PER_TURN, """
+        Here is the current game state as a JSON object:
+        {game_state}
+"""),
+            PromptSegment(PER_CALL, """
+        The player has proposed the following action:
+        {player_action}
+        """),
+        ])
+        # A legal verdict whose patch cannot be read is asked again in full-state mode
+        self.full_state_referee = Referee(llm) if diff_mode else None
+        self.budget = NODE_BUDGETS[REFEREE]
+        self.prompt_overhead = prompt_overhead(self.prompt)
+        # Build the chain once so repeated invocations skip prompt/model setup
+        self.chain = self.make_chain(llm)
     
-    def make_chain(self):
+    def make_chain(self, llm=None):
         # Use streaming like Player and Mentor classes
-        referee_chain = self.prompt | ANTHROPIC_LLM.with_config({"callbacks": None, "streaming": True})
+        referee_chain = self.prompt | (llm or ANTHROPIC_LLM).with_config({"callbacks": None, "streaming": True})
         return referee_chain
     
-    def invoke(self, inputs):
+    def _chain_inputs(self, inputs):
         """
-        Validates a player's action and updates the game state if legal
-        
-        Args:
-            inputs (dict): Dictionary containing game_state, player_action, and card_id_to_card_mapping
-            
+        Build the prompt variables for the referee chain from the invoke inputs,
+        compacting the card list if the prompt is over the Referee's token budget.
+
         Returns:
-            dict: Response containing whether the action was legal and the updated game state
+            The prompt variables and their PromptEstimate
         """
         game_state = inputs.get("game_state", {})
         player_action = inputs.get("player_action", "")
         card_id_to_card_mapping = inputs.get("card_id_to_card_mapping", {})
+        card_map_hash = inputs.get("card_map_hash")
         
         # Convert to string if needed
         if isinstance(game_state, dict):
@@ -111,122 +364,146 @@ class Referee:
         else:
             game_state_str = game_state
         
-        if isinstance(card_id_to_card_mapping, dict):
-            card_id_to_card_mapping_str = json.dumps(card_id_to_card_mapping)
-        else:
-            card_id_to_card_mapping_str = card_id_to_card_mapping
-        
-        # Use streaming chain like other classes
-        chain = self.make_chain()
-        
-        # Print info about the referee's analysis
-        # print("--------------REFEREE ANALYZING ACTION-----------------")
-        
-        try:
-            # Get the streaming response
-            response_chunks = chain.stream({
+        def build_inputs(compaction: Compaction):
+            if isinstance(card_id_to_card_mapping, Mapping):
+                # Only the cards referenced by the game state are sent to the model
+                visible_state = game_state if isinstance(game_state, dict) else json.loads(game_state)
+                card_id_to_card_mapping_str = serialize_relevant_cards(
+                    visible_state, card_id_to_card_mapping, card_map_hash, brief=compaction.brief_cards
+                )
+            else:
+                card_id_to_card_mapping_str = card_id_to_card_mapping
+            
+            return {
                 "game_state": game_state_str, 
                 "player_action": player_action, 
                 "card_id_to_card_mapping": card_id_to_card_mapping_str
-            })
-            
-            # Process and collect streaming chunks
-            full_response = ""
-            visible_response = ""
-            json_content = ""
-            in_json_block = False
-            
-            # Collect chunks and only print non-JSON content
-            accumulated_text = ""
+            }
+        
+        return fit_to_budget(self.budget, self.prompt_overhead, build_inputs, CARD_COMPACTION_STAGES)
+    
+    def _error_response(self, game_state, error):
+        emit(ERROR, f"Error in referee invoke method: {error}", node="referee")
+        # Return a fallback response
+        return {
+            "is_legal": False,
+            "explanation": f"Error processing referee response: {str(error)}",
+            "updated_state": game_state,
+            "raw_response": "Error"
+        }
+    
+    def invoke(self, inputs):
+        """
+        Validates a player's action and updates the game state if legal
+        
+        Args:
+            inputs (dict): Dictionary containing game_state, player_action, card_id_to_card_mapping
+                and optionally card_map_hash to reuse the cached serialized mapping
             
-            # Process each chunk as it comes in
-            for chunk in response_chunks:
-                chunk_text = chunk.content if hasattr(chunk, 'content') else str(chunk)
-                full_response += chunk_text
-                
-                # Check for JSON markers and accumulate text
-                if "json" in chunk_text:
-                    # Split the chunk at the JSON marker
-                    parts = chunk_text.split("json", 1)
-                    
-                    # Print any text before the JSON marker
-                    if parts[0]:
-                        print(parts[0], end="", flush=True)
-                        visible_response += parts[0]
-                    
-                    # Start accumulating for JSON content
-                    accumulated_text = "json" + (parts[1] if len(parts) > 1 else "")
-                    in_json_block = True
-                elif in_json_block:
-                    # Keep accumulating text while in JSON block
-                    accumulated_text += chunk_text
-                    
-                    # Check if we're exiting the JSON block
-                    if "```" in chunk_text:
-                        # Find the position of the closing marker
-                        parts = accumulated_text.split("```", 1)
-                        if len(parts) > 1:
-                            # We have text after the closing marker
-                            json_block = parts[0]
-                            after_json = parts[1]
-                            
-                            # Store the JSON content without printing
-                            json_content += json_block
-                            
-                            # Print the text after the JSON block
-                            print(after_json, end="", flush=True)
-                            visible_response += after_json
-                            
-                            # Reset accumulation
-                            accumulated_text = ""
-                            in_json_block = False
-                else:
-                    # Normal text outside of JSON block, print it
-                    print(chunk_text, end="", flush=True)
-                    visible_response += chunk_text
+        Returns:
+            dict: Response containing whether the action was legal and the updated game state
+        """
+        game_state = inputs.get("game_state", {})
+        
+        try:
+            # Get the streaming response and only publish non-JSON content
+            stream = RefereeResponseStream()
+            chain_inputs, estimate = self._chain_inputs(inputs)
+            usage = None
+            for chunk in self.chain.stream(chain_inputs):
+                usage = add_chunk_usage(usage, chunk)
+                visible_text = stream.feed(chunk.content if hasattr(chunk, 'content') else str(chunk))
+                if visible_text:
+                    emit(TOKEN, visible_text, node="referee")
+                for event_type, data in stream.pop_events():
+                    emit(event_type, data, node="referee")
+                if stream.finished:
+                    # The move is illegal, the rest is only the unchanged game state
+                    break
+            visible_text = stream.close()
+            if visible_text:
+                emit(TOKEN, visible_text, node="referee")
+            for event_type, data in stream.pop_events():
+                emit(event_type, data, node="referee")
+            emit(TOKEN_USAGE, usage_report(estimate, stream.full_response, usage), node="referee")
             
-            # Handle any remaining accumulated text
-            if in_json_block:
-                # Extract any JSON content without printing
-                json_content += accumulated_text
+            # Build the result from what the stream already parsed
+            result = self.process_response(stream, game_state)
+            if self._needs_full_state(result):
+                emit(ERROR, UNREADABLE_PATCH_MESSAGE, node="referee")
+                return self.full_state_referee.invoke(inputs)
+            return result
             
-            # print()  # Add a newline after the streaming response
+        except Exception as e:
+            return self._error_response(game_state, e)
+    
+    async def ainvoke(self, inputs):
+        """Async counterpart of invoke, streaming the referee chain with astream."""
+        game_state = inputs.get("game_state", {})
+        
+        try:
+            stream = RefereeResponseStream()
+            chain_inputs, estimate = self._chain_inputs(inputs)
+            usage = None
+            chunks = self.chain.astream(chain_inputs)
+            try:
+                async for chunk in chunks:
+                    usage = add_chunk_usage(usage, chunk)
+                    visible_text = stream.feed(chunk.content if hasattr(chunk, 'content') else str(chunk))
+                    if visible_text:
+                        await aemit(TOKEN, visible_text, node="referee")
+                    for event_type, data in stream.pop_events():
+                        await aemit(event_type, data, node="referee")
+                    if stream.finished:
+                        break
+            finally:
+                # Stops the model call when the stream ends early
+                await chunks.aclose()
+            visible_text = stream.close()
+            if visible_text:
+                await aemit(TOKEN, visible_text, node="referee")
+            for event_type, data in stream.pop_events():
+                await aemit(event_type, data, node="referee")
+            await aemit(TOKEN_USAGE, usage_report(estimate, stream.full_response, usage), node="referee")
             
-            # Process the full response after streaming is complete
-            return self.process_response(full_response, game_state, visible_response)
+            result = self.process_response(stream, game_state)
+            if self._needs_full_state(result):
+                await aemit(ERROR, UNREADABLE_PATCH_MESSAGE, node="referee")
+                return await self.full_state_referee.ainvoke(inputs)
+            return result
             
         except Exception as e:
-            print(f"Error in referee invoke method: {e}")
-            # Return a fallback response
-            return {
-                "is_legal": False,
-                "explanation": f"Error processing referee response: {str(e)}",
-                "updated_state": game_state,
-                "raw_response": "Error"
-            }
+            return self._error_response(game_state, e)
     
-    def process_response(self, result, game_state, visible_response):
-        """Process the response from the LLM to extract the necessary information"""
+    def _needs_full_state(self, result):
+        """A legal diff-mode verdict without a readable patch must not be applied as is."""
+        return self.diff_mode and result["is_legal"] and result.get("state_patch") is None
+
+    def process_response(self, stream, game_state):
+        """Build the referee result from a closed RefereeResponseStream"""
+        result = stream.full_response
+        visible_response = stream.visible_response
         try:
-            # print(f"Processing referee response of length: {len(result)}")
+            is_illegal = stream.is_illegal
             
-            # Parse the result to extract the JSON game state
-            is_illegal = "ILLEGAL ACTION" in result or (visible_response and "ILLEGAL ACTION" in visible_response)
-            
-            # Extract the updated game state JSON
-            json_match = re.search(r"```json\n(.*?)\n```", result, re.DOTALL)
-            # json_match = "```json" in result
+            # The fenced JSON was already parsed while it streamed
             updated_state = None
+            state_patch = None
             
-            if json_match:
+            if stream.json_value is not None:
                 try:
-                    updated_state = json.loads(json_match.group(1))
-                    # print("Successfully parsed JSON from referee response")
-                except json.JSONDecodeError as e:
-                    print(f"JSON parsing error: {e}")
-                    print(f"JSON content that failed to parse: {json_match.group(1)[:100]}...")
-                    # If there's an error parsing the JSON, return the original state
-                    updated_state = game_state if isinstance(game_state, dict) else json.loads(game_state)
+                    updated_state = stream.json_value
+                    if self.diff_mode:
+                        state_patch = patch_to_dict(parse_patch(updated_state))
+                        updated_state = None
+                except PatchError as e:
+                    print(f"Patch parsing error: {e}")
+                    updated_state = None
+            elif stream.json_error is not None:
+                print(f"JSON parsing error: {stream.json_error}")
+                print(f"JSON content that failed to parse: {stream.json_content[:100]}...")
+                # If there's an error parsing the JSON, return the original state
+                updated_state = game_state if isinstance(game_state, dict) else json.loads(game_state)
             else:
                 # print("No JSON block found in referee response")
                 ...
@@ -248,14 +525,19 @@ class Referee:
                 # print("No Explanation section found in response")
                 explanation = explanation_text  # Use the whole visible text as explanation
             
-            return {
+            response = {
                 "is_legal": not is_illegal,
                 "explanation": explanation,
                 "updated_state": updated_state or game_state,
                 "raw_response": result
             }
+            if self.diff_mode:
+                # A legal verdict keeps None for a missing or unreadable patch (see _needs_full_state),
+                # an illegal one changes nothing
+                response["state_patch"] = {"moves": [], "hp": []} if is_illegal else state_patch
+            return response
         except Exception as e:
-            print(f"Error in process_response: {e}")
+            emit(ERROR, f"Error in process_response: {e}", node="referee")
             return {
                 "is_legal": False,
                 "explanation": f"Error processing response: {str(e)}",
@@ -0,0 +1,89 @@
+from typing import Dict, List, Tuple
+from pathlib import Path
+import json
+import threading
+
+# Deck files live in the repository's common/ folder, one "<name>-deck.json" per deck
+DECKS_DIR = Path(__file__).resolve().parents[2] / "common"
+DECK_FILE_SUFFIX = "-deck.json"
+
+REQUIRED_CARD_KEYS = ("name", "supertype")
+
+
+class DeckError(ValueError):
+    """A deck file is missing or does not describe a valid deck."""
+
+
+def validate_deck(name: str, cards) -> List[dict]:
+    """Check that a parsed deck file is a list of cards with a name and supertype."""
+    if not isinstance(cards, list) or not cards:
+        raise DeckError(f"Deck {name} must be a non-empty list of cards.")
+    for index, card in enumerate(cards):
+        if not isinstance(card, dict):
+            raise DeckError(f"Card {index} of deck {name} is not an object.")
+        missing = [key for key in REQUIRED_CARD_KEYS if key not in card]
+        if missing:
+            raise DeckError(f"Card {index} of deck {name} is missing {', '.join(missing)}.")
+    return cards
+
+
+class DeckRegistry:
+    """
+    Decks available to new games, loaded from the deck folder on first use.
+
+    Every "<name>-deck.json" file is a deck called <name>, so a deck is added by
+    dropping a file in the folder. Parsed decks are cached in memory together with
+    the file's mtime and size, and reloaded when the file changes.
+
+    Returned decks are shared by every game and must not be modified.
+    """
+
+    def __init__(self, decks_dir: Path = DECKS_DIR):
+        self.decks_dir = Path(decks_dir)
+        # name -> ((mtime_ns, size), cards)
+        self._decks: Dict[str, Tuple[Tuple[int, int], List[dict]]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Path:
+        return self.decks_dir / f"{name}{DECK_FILE_SUFFIX}"
+
+    def names(self) -> List[str]:
+        """Names of the decks in the deck folder."""
+        return sorted(path.name[:-len(DECK_FILE_SUFFIX)] for path in self.decks_dir.glob(f"*{DECK_FILE_SUFFIX}"))
+
+    def get(self, name: str) -> List[dict]:
+        """
+        Return the cards of a deck, loading the file if it is new or changed.
+
+        Raises:
+            DeckError: if there is no such deck or its file is invalid
+        """
+        path = self._path(name)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            raise DeckError(f"Unknown deck {name}, expected {path}.")
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._decks.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        with self._lock:
+            cached = self._decks.get(name)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            try:
+                cards = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError as e:
+                raise DeckError(f"Deck {name} is not valid JSON: {e}")
+            self._decks[name] = (key, validate_deck(name, cards))
+            return cards
+
+
+# Registry shared by the process
+deck_registry = DeckRegistry()
+
+
+def get_deck(name: str) -> List[dict]:
+    return deck_registry.get(name)
@@ -0,0 +1,149 @@
+from typing import Any, Optional, Set
+from dataclasses import dataclass
+from contextvars import ContextVar
+import asyncio
+
+# Event types carried on a turn's event bus
+TOKEN = "token"
+NODE_START = "node_start"
+NODE_END = "node_end"
+STATE_UPDATE = "state_update"
+ERROR = "error"
+# Published by the Referee while its response is still streaming
+VERDICT = "verdict"
+PARTIAL_STATE = "partial_state"
+# Published after each agent call with its prompt and completion tokens
+TOKEN_USAGE = "token_usage"
+
+# Banner printed (and streamed to the frontend) when each agent node starts
+NODE_HEADERS = {
+    "player": "-------------PLAYER NODE STARTED-------------------",
+    "mentor": "-------------MASTER NODE STARTED-------------------",
+    "referee": "-------------REFEREE NODE STARTED-------------------",
+}
+
+# Maximum number of undelivered events buffered per turn before producers wait
+DEFAULT_MAX_PENDING_EVENTS = 1024
+
+
+@dataclass
+class TurnEvent:
+    type: str
+    data: Any = None
+    node: Optional[str] = None
+
+
+class TurnEventBus:
+    """
+    Bounded channel carrying the events of a single turn to its stream.
+
+    Must be created on the event loop that consumes it. Async producers wait for
+    room with publish(); producers on worker threads block in publish_threadsafe().
+    Sync producers on the loop thread cannot wait, so on a full bus their events
+    are queued by background tasks, in order, and still delivered after close().
+
+    close() never waits, so a turn ends even when nobody reads its stream. When
+    the consumer goes away, abandon() drops the undelivered events and makes every
+    later publish return at once.
+    """
+    _CLOSED = object()
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING_EVENTS):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._loop = asyncio.get_running_loop()
+        # Puts waiting for room on behalf of sync producers on the loop thread
+        self._pending_puts: Set[asyncio.Task] = set()
+        self._closed = False
+        self._abandoned = False
+
+    async def publish(self, event: TurnEvent) -> None:
+        if not self._abandoned:
+            await self._queue.put(event)
+
+    def publish_threadsafe(self, event: TurnEvent) -> None:
+        if self._abandoned:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            # Sync code on the loop thread cannot wait for the consumer. Once one
+            # event waits for room, later ones queue behind it to keep the order.
+            if not self._pending_puts and not self._queue.full():
+                self._queue.put_nowait(event)
+                return
+            task = self._loop.create_task(self._queue.put(event))
+            self._pending_puts.add(task)
+            task.add_done_callback(self._pending_puts.discard)
+            return
+        asyncio.run_coroutine_threadsafe(self._queue.put(event), self._loop).result()
+
+    async def close(self) -> None:
+        """Mark the end of the turn's events, without waiting for room on the bus."""
+        self._closed = True
+        if self._pending_puts:
+            # The sentinel would overtake the waiting events, the consumer stops once they are delivered
+            return
+        try:
+            self._queue.put_nowait(self._CLOSED)
+        except asyncio.QueueFull:
+            pass
+
+    def abandon(self) -> None:
+        """The consumer is gone: drop the undelivered events so no producer waits for room again."""
+        self._abandoned = True
+        for task in list(self._pending_puts):
+            task.cancel()
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    def _finished(self) -> bool:
+        return self._closed and self._queue.empty() and all(task.done() for task in self._pending_puts)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> TurnEvent:
+        if self._finished():
+            raise StopAsyncIteration
+        event = await self._queue.get()
+        if event is self._CLOSED:
+            raise StopAsyncIteration
+        return event
+
+
+# Bus of the turn running in the current context; None outside a streamed turn
+current_event_bus: ContextVar[Optional[TurnEventBus]] = ContextVar("current_event_bus", default=None)
+
+
+def _print_event(event: TurnEvent) -> None:
+    # No turn is listening (CLI and example scripts), keep the console output
+    if event.type == TOKEN:
+        print(event.data, end="", flush=True)
+    elif event.type == NODE_START:
+        print(NODE_HEADERS.get(event.node, event.node))
+    elif event.type == NODE_END:
+        print()  # Add a newline after the streaming response
+    elif event.type == ERROR:
+        print(event.data)
+
+
+def emit(event_type: str, data: Any = None, node: Optional[str] = None) -> None:
+    """Publish an event to the current turn's bus from synchronous code."""
+    event = TurnEvent(event_type, data, node)
+    bus = current_event_bus.get()
+    if bus is None:
+        _print_event(event)
+    else:
+        bus.publish_threadsafe(event)
+
+
+async def aemit(event_type: str, data: Any = None, node: Optional[str] = None) -> None:
+    """Publish an event to the current turn's bus, waiting while the bus is full."""
+    event = TurnEvent(event_type, data, node)
+    bus = current_event_bus.get()
+    if bus is None:
+        _print_event(event)
+    else:
+        await bus.publish(event)
@@ -1,2 +1,2 @@
 # Pokemon TCG graph module
-from pktcgai.graph.pokemon_tcg_graph import run_pokemon_tcg_turn, create_pokemon_tcg_graph, initialize_game_state 
\ No newline at end of file
+from pktcgai.graph.pokemon_tcg_graph import run_pokemon_tcg_turn, create_pokemon_tcg_graph, initialize_game_state, get_compiled_graph, warm_up_graphs, run_pokemon_tcg_turn_async
\ No newline at end of file
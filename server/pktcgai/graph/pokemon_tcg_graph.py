@@ -1,18 +1,44 @@
-from typing import Dict, List, Any, TypedDict, Annotated, Literal, Union
+from typing import Dict, List, Any, Optional, Tuple, TypedDict, Annotated, Literal, Union
 import json
+import os
+import threading
 from enum import Enum
 
 from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 from pktcgai.chains.player import Player
 from pktcgai.chains.mentor import Master as Mentor
 from pktcgai.chains.referee import Referee
+from pktcgai.llm.ai import ANTHROPIC_LLM
+from pktcgai.card_map import hash_card_map, serialize_relevant_cards, GameCardMap
+from pktcgai.prompts.budget import (
+    NODE_BUDGETS, PLAYER, MENTOR, Compaction, PromptEstimate, compact_conversation, fit_to_budget,
+    prompt_overhead, usage_report, add_chunk_usage
+)
+from pktcgai.events import emit, aemit, TOKEN, NODE_START, NODE_END, ERROR, TOKEN_USAGE
+from pktcgai.state import BoardState, dict_to_player_state, dataclass_to_dict
+from pktcgai.actions import parse_action
+from pktcgai.rules import find_rule_violation
+
+
+# Bump whenever the Player, Mentor or Referee prompt templates change so that
+# graphs compiled against the old templates are not reused.
+PROMPT_VERSION = "4"
+
+# When set, the Referee returns a patch of the changes instead of restating the game state
+REFEREE_DIFF_MODE = os.getenv("REFEREE_DIFF_MODE", "").lower() in ("1", "true", "yes")
+
+# Compiled workflows keyed by (model config, prompt version, referee diff mode), shared by every turn and session
+_COMPILED_GRAPHS: Dict[tuple, Any] = {}
+_COMPILED_GRAPHS_LOCK = threading.Lock()
 
 
 class ConversationState(TypedDict):
     """State for the Pokemon TCG agent conversation flow."""
     game_state: Dict[str, Any]
     card_id_to_card_mapping: Dict[str, Any]
+    card_map_hash: str
     player_action: str
     mentor_player_conversation: List[Dict[str, str]]
     current_node: str
@@ -20,6 +46,109 @@ class ConversationState(TypedDict):
     decision_is_legal: bool
     decision_explanation: str
     updated_game_state: Dict[str, Any]
+    state_patch: Optional[Dict[str, Any]]
+
+
+# Zones of a prepared player view holding plain cards ({"id": n}); hidden
+# opponent zones hold "N cards" strings instead and are passed through
+_CARD_LIST_ZONES = ("discard", "lostZone", "deck", "hand", "prizeCards")
+
+
+def _without_hp(card: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in card.items() if k != 'hp'}
+
+
+class GameStateTransformer:
+    """
+    Expands card ids in prepared game states into card details, without hp.
+
+    Built once per card map: each card's hp-stripped view is computed up front
+    (for interned card maps, once per definition across all games). Player views
+    are walked along the fixed zone schema (active, bench, card zones, stadium)
+    and copied as they are built, so no JSON round trip is needed; anything off-schema goes through the generic recursive expansion.
+    Card details in the output are shared between results and must not be modified.
+    """
+
+    def __init__(self, card_id_to_card_mapping):
+        # hp-stripped view per card id, reachable by int and by str id
+        self._views: Dict[Any, Dict[str, Any]] = {}
+        for card_id, card in card_id_to_card_mapping.items():
+            if isinstance(card_id_to_card_mapping, GameCardMap):
+                # Kept with the database the handle belongs to, shared by every game using it
+                view = card_id_to_card_mapping.database.derived("without_hp", card_id_to_card_mapping.handle(card_id), _without_hp)
+            else:
+                view = _without_hp(card)
+            self._views[card_id] = self._views[str(card_id)] = view
+            if isinstance(card_id, str) and card_id.isdigit():
+                self._views[int(card_id)] = view
+
+    def _view(self, card_id) -> Optional[Dict[str, Any]]:
+        # True == 1 as a dict key, booleans are never card ids
+        if isinstance(card_id, bool) or not isinstance(card_id, (int, str)):
+            return None
+        return self._views.get(card_id)
+
+    def _card(self, card):
+        if isinstance(card, dict) and len(card) == 1 and "id" in card:
+            view = self._views.get(card["id"])
+            return {"id": card["id"], **view} if view is not None else {"id": card["id"]}
+        return self._generic(card)
+
+    def _pokemon(self, pokemon):
+        if isinstance(pokemon, dict) and "id" in pokemon and pokemon.keys() <= {"id", "hp", "attachedCards"}:
+            attached = pokemon.get("attachedCards")
+            result = {"id": pokemon["id"]}
+            if "attachedCards" in pokemon:
+                result["attachedCards"] = [self._card(card) for card in attached] if isinstance(attached, list) else attached
+            view = self._views.get(pokemon["id"])
+            if view is not None:
+                result.update(view)
+            return result
+        return self._generic(pokemon)
+
+    def _player(self, player: Dict[str, Any]) -> Dict[str, Any]:
+        result = {}
+        for zone, value in player.items():
+            if zone == "active":
+                result[zone] = self._pokemon(value) if value is not None else None
+            elif zone == "bench" and isinstance(value, list):
+                result[zone] = [self._pokemon(pokemon) for pokemon in value]
+            elif zone in _CARD_LIST_ZONES and isinstance(value, list):
+                result[zone] = [self._card(card) for card in value]
+            elif zone == "stadium":
+                result[zone] = self._card(value) if value is not None else None
+            else:
+                result[zone] = self._generic(value)
+        return result
+
+    def _generic(self, obj):
+        """Expansion for data off the zone schema, same rules as the original recursive walk."""
+        if isinstance(obj, dict):
+            result = {}
+            view = None
+            for key, value in obj.items():
+                # Remove 'hp' keys
+                if key == 'hp':
+                    continue
+                if key == 'id' and self._view(value) is not None:
+                    view = self._views[value]
+                    result[key] = value
+                else:
+                    result[key] = self._generic(value)
+            if view is not None:
+                # Merge card details into the object
+                result.update(view)
+            return result
+        if isinstance(obj, list):
+            return [self._generic(item) for item in obj]
+        # Replace a bare card ID with the full card details
+        view = self._view(obj)
+        return dict(view) if view is not None else obj
+
+    def transform(self, game_state):
+        if isinstance(game_state, dict):
+            return {key: self._player(value) if isinstance(value, dict) else self._generic(value) for key, value in game_state.items()}
+        return self._generic(game_state)
 
 
 def transform_game_state(game_state, card_id_to_card_mapping):
@@ -28,6 +157,9 @@ def transform_game_state(game_state, card_id_to_card_mapping):
     1. Removing all 'hp' keys
     2. Replacing any numeric values with full card details from the mapping if they exist as keys
     
+    The input is not modified. Ids are matched whether the mapping is keyed by int
+    or by str.
+    
     Args:
         game_state: The original game state
         card_id_to_card_mapping: Mapping of card IDs to card details
@@ -35,210 +167,300 @@ def transform_game_state(game_state, card_id_to_card_mapping):
     Returns:
         Transformed game state
     """
-    # Create a deep copy of the game state to avoid modifying the original
-    transformed_game_state = json.loads(json.dumps(game_state))
+    return GameStateTransformer(card_id_to_card_mapping).transform(game_state)
+
+
+def transform_game_states(game_states, card_id_to_card_mapping) -> List[Any]:
+    """Transform many game states sharing one card map (e.g. a recorded game), reusing the card views."""
+    transformer = GameStateTransformer(card_id_to_card_mapping)
+    return [transformer.transform(game_state) for game_state in game_states]
+
+
+def _format_conversation(conversation: List[Dict[str, str]]) -> str:
+    """Render the mentor/player conversation as prompt text."""
+    formatted_conversation = ""
+    for message in conversation:
+        if message["role"] == "player":
+            formatted_conversation += f"Player: {message['content']}\n"
+        elif message["role"] == "note":
+            # Left by compact_conversation in place of older messages
+            formatted_conversation += f"{message['content']}\n"
+        else:
+            formatted_conversation += f"Mentor: {message['content']}\n"
+    return formatted_conversation
+
+
+def _visible_game_state(state: ConversationState) -> Dict[str, Any]:
+    """The part of the prepared game state the agents are allowed to see."""
+    return {"YOUR_HAND": state["game_state"]["YOUR_HAND"], "OPPONENT_HAND": state["game_state"]["OPPONENT_HAND"]}
+
+
+def _chunk_text(chunk) -> str:
+    # AIMessageChunk objects have a .content attribute to get the text
+    return chunk.content if hasattr(chunk, 'content') else str(chunk)
+
+
+def _player_inputs(state: ConversationState, overhead: int) -> Tuple[Dict[str, str], PromptEstimate]:
+    additional_context = ""
+    if not state["decision_is_legal"] and state["decision_explanation"]:
+        additional_context = f"\n\nYour previous action: '{state['player_action']}' was ILLEGAL: {state['decision_explanation']}\nPlease reconsider your action."
+        state["final_decision"] = False
+
+    temp_game_state = _visible_game_state(state)
+    # Compact JSON, indent=2 cost the state about 70% more tokens
+    game_state = json.dumps(temp_game_state)
+    budget = NODE_BUDGETS[PLAYER]
+
+    def build_inputs(compaction: Compaction) -> Dict[str, str]:
+        conversation = compact_conversation(state["mentor_player_conversation"], compaction, budget.recent_messages)
+        return {
+            "game_state": game_state,
+            # Only the cards visible in this view, copies collapsed into one entry
+            "card_id_to_card_mapping": serialize_relevant_cards(
+                temp_game_state, state["card_id_to_card_mapping"], state["card_map_hash"], brief=compaction.brief_cards
+            ),
+            "mentor_player_conversation": _format_conversation(conversation) + additional_context
+        }
+
+    return fit_to_budget(budget, overhead, build_inputs)
+
+
+def _record_player_response(state: ConversationState, full_response: str) -> ConversationState:
+    if "FINAL DECISION:" in full_response:
+        # decision_parts = full_response.split("FINAL DECISION:")
+        # player_action = decision_parts[1].strip()
+        state["player_action"] = full_response
+        state["final_decision"] = True
+    else:
+        state["final_decision"] = False
     
-    # Helper function to recursively process the game state
-    def process_game_state(obj):
-        if isinstance(obj, dict):
-            # Remove 'hp' keys
-            if 'hp' in obj:
-                del obj['hp']
-            
-            # Process each key-value pair in the dictionary
-            for key, value in list(obj.items()):
-                # Special handling for 'id' key (maintain backward compatibility)
-                if key == 'id' and str(value) in card_id_to_card_mapping:
-                    card_id = str(value)
-                    card_details = card_id_to_card_mapping[card_id]
-                    # Merge card details into the object
-                    for detail_key, detail_value in card_details.items():
-                        if detail_key != 'hp':  # Skip adding hp back
-                            obj[detail_key] = detail_value
-                else:
-                    # Process the value recursively
-                    obj[key] = process_game_state(value)
-            
-        elif isinstance(obj, list):
-            # Process items in lists
-            return [process_game_state(item) for item in obj]
-        
-        # Check if this is a card ID (could be an int or string representation of an int)
-        elif (isinstance(obj, (int, str)) and 
-              str(obj) in card_id_to_card_mapping):
-            # Replace the ID with the full card details
-            card_id = str(obj)
-            card_details = card_id_to_card_mapping[card_id]
-            # Filter out hp from the returned card details
-            return {k: v for k, v in card_details.items() if k != 'hp'}
-        
-        return obj
+    state["mentor_player_conversation"].append({
+        "role": "player",
+        "content": full_response
+    })
+    return state
+
+
+def _mentor_inputs(state: ConversationState, overhead: int) -> Tuple[Dict[str, str], PromptEstimate]:
+    latest_player_message = next(
+        (msg["content"] for msg in reversed(state["mentor_player_conversation"]) 
+         if msg["role"] == "player"), 
+        ""
+    )
     
-    # Apply transformations and return the processed state
-    transformed_game_state = process_game_state(transformed_game_state)
-    return transformed_game_state
+    temp_game_state = _visible_game_state(state)
+    game_state = json.dumps(temp_game_state)
+    budget = NODE_BUDGETS[MENTOR]
+
+    def build_inputs(compaction: Compaction) -> Dict[str, str]:
+        conversation = compact_conversation(state["mentor_player_conversation"], compaction, budget.recent_messages)
+        return {
+            "game_state": game_state,
+            "card_id_to_card_mapping": serialize_relevant_cards(
+                temp_game_state, state["card_id_to_card_mapping"], state["card_map_hash"], brief=compaction.brief_cards
+            ),
+            "mentor_player_conversation": _format_conversation(conversation),
+            "player_question": latest_player_message
+        }
+
+    return fit_to_budget(budget, overhead, build_inputs)
+
 
+def _record_mentor_response(state: ConversationState, full_response: str) -> ConversationState:
+    state["mentor_player_conversation"].append({
+        "role": "mentor",
+        "content": full_response
+    })
+    return state
 
-def create_pokemon_tcg_graph():
-    """Create and return the Pokemon TCG agent workflow graph."""
+
+def _referee_inputs(state: ConversationState) -> Dict[str, Any]:
+    return {
+        "game_state": _visible_game_state(state),
+        "player_action": state["player_action"],
+        "card_id_to_card_mapping": state["card_id_to_card_mapping"],
+        "card_map_hash": state["card_map_hash"]
+    }
+
+
+def _local_rejection(state: ConversationState) -> Optional[Dict[str, Any]]:
+    """
+    Reject the player's move locally when the rules check proves it illegal.
     
-    player_agent = Player().make_chain()
-    mentor_agent = Mentor().make_chain()
-    referee_agent = Referee()  # Use the full Referee instance, not just the chain
+    find_rule_violation returning None only means the move is not obviously
+    illegal, so legal verdicts (and the updated game state) always come from the
+    Referee. Every graph run is a fresh turn with no TurnRecord carried over, so
+    only the checks that need no history of the turn can fire.
     
-    workflow = StateGraph(ConversationState)
+    Returns:
+        A result shaped like Referee.invoke's, or None if the Referee must decide
+    """
+    game_state = state["game_state"]
+    your_hand = game_state.get("YOUR_HAND")
+    if not isinstance(your_hand, dict):
+        return None
+    card_map = state["card_id_to_card_mapping"]
+    player = dict_to_player_state(your_hand)
+    action = parse_action(state["player_action"], player, card_map)
+    if action is None:
+        return None
+    
+    violation = find_rule_violation(player, action, card_map)
+    if violation is None:
+        return None
+    return {
+        "is_legal": False,
+        "explanation": f"ILLEGAL ACTION: {violation}",
+        "updated_state": game_state
+    }
+
+
+def _record_referee_result(state: ConversationState, result: Dict[str, Any]) -> ConversationState:
+    # Use the processed result from the referee's invoke method
+    state["decision_is_legal"] = result["is_legal"]
+    state["decision_explanation"] = result["explanation"]
+    state["updated_game_state"] = result["updated_state"]
+    state["state_patch"] = result.get("state_patch")
+    return state
+
+
+def _record_referee_error(state: ConversationState, error: Exception) -> ConversationState:
+    emit(ERROR, f"Error in referee node: {error}", node="referee")
+    state["decision_is_legal"] = False
+    state["decision_explanation"] = f"Error processing action: {str(error)}"
+    state["updated_game_state"] = state["game_state"]
+    state["state_patch"] = None
+    return state
+
+
+def create_pokemon_tcg_graph(llm=None, referee_diff_mode=False):
+    """
+    Create and return the Pokemon TCG agent workflow graph.
+
+    Every node has a sync and an async implementation, so the compiled graph can be
+    driven with invoke/stream from a worker thread or with ainvoke/astream_events
+    directly on the event loop.
+
+    Args:
+        llm: Chat model used by every agent, defaults to ANTHROPIC_LLM
+        referee_diff_mode: Have the Referee return a state patch instead of the full game state
+
+    Returns:
+        The uncompiled StateGraph
+    """
     
+    player = Player()
+    mentor = Mentor()
+    player_agent = player.make_chain(llm)
+    mentor_agent = mentor.make_chain(llm)
+    # Fixed part of each prompt, counted towards the node's token budget
+    player_overhead = prompt_overhead(player.prompt)
+    mentor_overhead = prompt_overhead(mentor.prompt)
+    referee_agent = Referee(llm, diff_mode=referee_diff_mode)  # Use the full Referee instance, not just the chain
+    
+    workflow = StateGraph(ConversationState)
     
     def player_node(state: ConversationState) -> ConversationState:
-        # print("IN THE PLAYER NODE")
-        print("-------------PLAYER NODE STARTED-------------------")
-        formatted_conversation = ""
-        for message in state["mentor_player_conversation"]:
-            if message["role"] == "player":
-                formatted_conversation += f"Player: {message['content']}\n"
-            else:
-                formatted_conversation += f"Mentor: {message['content']}\n"
-        
-        additional_context = ""
-        if not state["decision_is_legal"] and state["decision_explanation"]:
-            additional_context = f"\n\nYour previous action: '{state['player_action']}' was ILLEGAL: {state['decision_explanation']}\nPlease reconsider your action."
-            state["final_decision"] = False
-
-        # Transform the game state for the player
-        # transformed_game_state = transform_game_state(
-        #     state["game_state"], 
-        #     state["card_id_to_card_mapping"]
-        # )
-
-        # print()
-        # print("THIS IS THE TRANSFORMED STATE", transformed_game_state)
-        # print()
-
-        # print("THIS IS THE TRANSFORMED STATE TO THE PLAYER", transformed_game_state)
-        temp_game_state = {"YOUR_HAND": state["game_state"]["YOUR_HAND"], "OPPONENT_HAND": state["game_state"]["OPPONENT_HAND"]}
-
-        # print("THIS IS THE TEMP GAME STATE TO THE PLAYER", temp_game_state)
-        # print("THIS IS THE CARD ID TO CARD MAPPING TO THE PLAYER", state["card_id_to_card_mapping"])
-                
+        emit(NODE_START, node="player")
+        inputs, estimate = _player_inputs(state, player_overhead)
         # Get streaming response
-        response_chunks = player_agent.stream({
-            "game_state": json.dumps(temp_game_state, indent=2),
-            "card_id_to_card_mapping": json.dumps(state["card_id_to_card_mapping"], indent=2),
-            "mentor_player_conversation": formatted_conversation + additional_context
-        })
+        response_chunks = player_agent.stream(inputs)
         
-        # Process and collect streaming chunks
+        # Publish each chunk as it comes in for real-time display
         full_response = ""
-        # Print each chunk as it comes in for real-time display
+        usage = None
         for chunk in response_chunks:
-            # AIMessageChunk objects have a .content attribute to get the text
-            chunk_text = chunk.content if hasattr(chunk, 'content') else str(chunk)
-            print(chunk_text, end="", flush=True)
+            chunk_text = _chunk_text(chunk)
+            emit(TOKEN, chunk_text, node="player")
             full_response += chunk_text
-        print()  # Add a newline after the streaming response
+            usage = add_chunk_usage(usage, chunk)
+        emit(TOKEN_USAGE, usage_report(estimate, full_response, usage), node="player")
+        emit(NODE_END, node="player")
         
-        if "FINAL DECISION:" in full_response:
-            # decision_parts = full_response.split("FINAL DECISION:")
-            # player_action = decision_parts[1].strip()
-            player_action = full_response
-            
-            state["player_action"] = player_action
-            state["final_decision"] = True
-            
-            state["mentor_player_conversation"].append({
-                "role": "player",
-                "content": full_response
-            })
-        else:
-            state["mentor_player_conversation"].append({
-                "role": "player",
-                "content": full_response
-            })
-            state["final_decision"] = False
-        # print("IN PLAYER NODE STATE CONVERSATIONS", state["mentor_player_conversation"])
-        return state
+        return _record_player_response(state, full_response)
     
-    def mentor_node(state: ConversationState) -> ConversationState:
-        # print("IN THE MENTOR NODE")
-        print("-------------MASTER NODE STARTED-------------------")
-        latest_player_message = next(
-            (msg["content"] for msg in reversed(state["mentor_player_conversation"]) 
-             if msg["role"] == "player"), 
-            ""
-        )
-        
-        # Transform the game state for the mentor
-        # transformed_game_state = transform_game_state(
-        #     state["game_state"], 
-        #     state["card_id_to_card_mapping"]
-        # )
-
-        formatted_conversation = ""
-        for message in state["mentor_player_conversation"]:
-            if message["role"] == "player":
-                formatted_conversation += f"Player: {message['content']}\n"
-            else:
-                formatted_conversation += f"Mentor: {message['content']}\n"
-        
-        temp_game_state = {"YOUR_HAND": state["game_state"]["YOUR_HAND"], "OPPONENT_HAND": state["game_state"]["OPPONENT_HAND"]}
+    async def aplayer_node(state: ConversationState) -> ConversationState:
+        await aemit(NODE_START, node="player")
+        inputs, estimate = _player_inputs(state, player_overhead)
+        full_response = ""
+        usage = None
+        async for chunk in player_agent.astream(inputs):
+            chunk_text = _chunk_text(chunk)
+            await aemit(TOKEN, chunk_text, node="player")
+            full_response += chunk_text
+            usage = add_chunk_usage(usage, chunk)
+        await aemit(TOKEN_USAGE, usage_report(estimate, full_response, usage), node="player")
+        await aemit(NODE_END, node="player")
         
+        return _record_player_response(state, full_response)
+    
+    def mentor_node(state: ConversationState) -> ConversationState:
+        emit(NODE_START, node="mentor")
+        inputs, estimate = _mentor_inputs(state, mentor_overhead)
         # Get streaming response
-        response_chunks = mentor_agent.stream({
-            "game_state": json.dumps(temp_game_state),
-            "card_id_to_card_mapping": json.dumps(state["card_id_to_card_mapping"]),
-            "mentor_player_conversation": formatted_conversation,
-            "player_question": latest_player_message
-        })
+        response_chunks = mentor_agent.stream(inputs)
         
-        # Process and collect streaming chunks
+        # Publish each chunk as it comes in for real-time display
         full_response = ""
-        # Print each chunk as it comes in for real-time display
+        usage = None
         for chunk in response_chunks:
-            # AIMessageChunk objects have a .content attribute to get the text
-            chunk_text = chunk.content if hasattr(chunk, 'content') else str(chunk)
-            print(chunk_text, end="", flush=True)
+            chunk_text = _chunk_text(chunk)
+            emit(TOKEN, chunk_text, node="mentor")
             full_response += chunk_text
-        print()  # Add a newline after the streaming response
+            usage = add_chunk_usage(usage, chunk)
+        emit(TOKEN_USAGE, usage_report(estimate, full_response, usage), node="mentor")
+        emit(NODE_END, node="mentor")
         
-        # print("IN MASTER NODE RESPONSE", response.keys(), type(response))
-        state["mentor_player_conversation"].append({
-            "role": "mentor",
-            "content": full_response
-        })
-        # print("IN MASTER NODE STATE CONVERSATIONS", state["mentor_player_conversation"])
-        return state
+        return _record_mentor_response(state, full_response)
     
-    def referee_node(state: ConversationState) -> ConversationState:
-        print("-------------REFEREE NODE STARTED-------------------")
+    async def amentor_node(state: ConversationState) -> ConversationState:
+        await aemit(NODE_START, node="mentor")
+        inputs, estimate = _mentor_inputs(state, mentor_overhead)
+        full_response = ""
+        usage = None
+        async for chunk in mentor_agent.astream(inputs):
+            chunk_text = _chunk_text(chunk)
+            await aemit(TOKEN, chunk_text, node="mentor")
+            full_response += chunk_text
+            usage = add_chunk_usage(usage, chunk)
+        await aemit(TOKEN_USAGE, usage_report(estimate, full_response, usage), node="mentor")
+        await aemit(NODE_END, node="mentor")
         
-        # Convert game state and card mapping to strings if needed
-        # game_state_str = json.dumps(state["game_state"]) if isinstance(state["game_state"], dict) else state["game_state"]
-        # card_mapping_str = json.dumps(state["card_id_to_card_mapping"]) if isinstance(state["card_id_to_card_mapping"], dict) else state["card_id_to_card_mapping"]
-        temp_game_state = {"YOUR_HAND": state["game_state"]["YOUR_HAND"], "OPPONENT_HAND": state["game_state"]["OPPONENT_HAND"]}
-        # Use referee's invoke method which handles JSON filtering
+        return _record_mentor_response(state, full_response)
+    
+    def referee_node(state: ConversationState) -> ConversationState:
+        emit(NODE_START, node="referee")
+        try:
+            # Moves the rules check proves illegal are rejected without an LLM call
+            result = _local_rejection(state)
+            if result is not None:
+                emit(TOKEN, result["explanation"], node="referee")
+            else:
+                # Use referee's invoke method which handles JSON filtering
+                result = referee_agent.invoke(_referee_inputs(state))
+            state = _record_referee_result(state, result)
+        except Exception as e:
+            state = _record_referee_error(state, e)
+        emit(NODE_END, node="referee")
+        return state
+    
+    async def areferee_node(state: ConversationState) -> ConversationState:
+        await aemit(NODE_START, node="referee")
         try:
-            result = referee_agent.invoke({
-                "game_state": temp_game_state,
-                "player_action": state["player_action"],
-                "card_id_to_card_mapping": state["card_id_to_card_mapping"]
-            })
-            
-            # Use the processed result from the invoke method
-            state["decision_is_legal"] = result["is_legal"]
-            state["decision_explanation"] = result["explanation"]
-            state["updated_game_state"] = result["updated_state"]
-            
+            result = _local_rejection(state)
+            if result is not None:
+                await aemit(TOKEN, result["explanation"], node="referee")
+            else:
+                result = await referee_agent.ainvoke(_referee_inputs(state))
+            state = _record_referee_result(state, result)
         except Exception as e:
-            print(f"Error in referee node: {e}")
-            state["decision_is_legal"] = False
-            state["decision_explanation"] = f"Error processing action: {str(e)}"
-            state["updated_game_state"] = state["game_state"]
-        
+            state = _record_referee_error(state, e)
+        await aemit(NODE_END, node="referee")
         return state
     
-    workflow.add_node("player", player_node)
-    workflow.add_node("mentor", mentor_node)
-    workflow.add_node("referee", referee_node)
+    workflow.add_node("player", RunnableLambda(player_node, afunc=aplayer_node))
+    workflow.add_node("mentor", RunnableLambda(mentor_node, afunc=amentor_node))
+    workflow.add_node("referee", RunnableLambda(referee_node, afunc=areferee_node))
     
     
     workflow.add_conditional_edges(
@@ -268,22 +490,79 @@ def create_pokemon_tcg_graph():
     return workflow
 
 
-def initialize_game_state(game_data, card_mapping) -> ConversationState:
+def model_config_key(llm=None) -> tuple:
+    """
+    Return a hashable description of the chat model a graph is compiled against.
+
+    Provider models (ChatAnthropic) are described by their settings, so equally
+    configured instances share a graph. Wrappers (cached, recording) and models
+    configured otherwise (replay, scripted) are told apart by instance, with the
+    wrapped model's key included.
+    """
+    llm = llm or ANTHROPIC_LLM
+    inner = getattr(llm, "inner", None)
+    if inner is None and "model" in getattr(type(llm), "model_fields", {}):
+        return (
+            type(llm).__name__,
+            getattr(llm, "model", None),
+            getattr(llm, "temperature", None),
+            getattr(llm, "max_tokens", None),
+        )
+    # The registry keeps the compiled graph, and with it the model, alive, so its id is never reused
+    return (type(llm).__name__, id(llm), model_config_key(inner) if inner is not None else None)
+
+
+def get_compiled_graph(llm=None, prompt_version: str = PROMPT_VERSION, referee_diff_mode: bool = REFEREE_DIFF_MODE):
+    """
+    Return the compiled workflow for the given chat model, building it on first use.
+
+    Compiled graphs hold no per-turn state, so a single instance is shared by all
+    turns and sessions in the process.
+
+    Args:
+        llm: Chat model used by every agent, defaults to ANTHROPIC_LLM
+        prompt_version: Version of the prompt templates the graph is built from
+        referee_diff_mode: Have the Referee return a state patch instead of the full game state
+
+    Returns:
+        The compiled LangGraph application
+    """
+    key = (model_config_key(llm), prompt_version, referee_diff_mode)
+    app = _COMPILED_GRAPHS.get(key)
+    if app is None:
+        with _COMPILED_GRAPHS_LOCK:
+            app = _COMPILED_GRAPHS.get(key)
+            if app is None:
+                app = create_pokemon_tcg_graph(llm, referee_diff_mode).compile()
+                _COMPILED_GRAPHS[key] = app
+    return app
+
+
+def warm_up_graphs(llms=None) -> None:
+    """Compile the workflow for each chat model ahead of the first turn (call at startup)."""
+    for llm in llms or [None]:
+        get_compiled_graph(llm)
+
+
+def initialize_game_state(game_data, card_mapping, card_map_hash=None) -> ConversationState:
     """Initialize the game state for the Pokemon TCG agent workflow."""
     return {
         "game_state": game_data,
         "card_id_to_card_mapping": card_mapping,
+        # Hash once per turn at most; BoardState already carries it for live games
+        "card_map_hash": card_map_hash or hash_card_map(card_mapping),
         "player_action": "",
         "mentor_player_conversation": [],
         "current_node": "player",
         "final_decision": False,
         "decision_is_legal": False,
         "decision_explanation": "",
-        "updated_game_state": {}
+        "updated_game_state": {},
+        "state_patch": None
     }
 
 
-def run_pokemon_tcg_turn(game_data, card_mapping, max_iterations=500) -> Dict[str, Any]:
+def run_pokemon_tcg_turn(game_data, card_mapping, max_iterations=500, llm=None, card_map_hash=None) -> Dict[str, Any]:
     """
     Run a single turn of the Pokemon TCG agent workflow.
     
@@ -291,16 +570,16 @@ def run_pokemon_tcg_turn(game_data, card_mapping, max_iterations=500) -> Dict[st
         game_data: The current game state
         card_mapping: Mapping of card IDs to card details
         max_iterations: Maximum number of iterations to prevent infinite loops
+        llm: Chat model used by every agent, defaults to ANTHROPIC_LLM
+        card_map_hash: Precomputed hash of card_mapping (BoardState.cardMapHash)
         
     Returns:
         Dict containing the action, legality status, explanation, updated game state,
         and the conversation history
     """
-    initial_state = initialize_game_state(game_data, card_mapping)
-    
-    workflow = create_pokemon_tcg_graph()
+    initial_state = initialize_game_state(game_data, card_mapping, card_map_hash)
     
-    app = workflow.compile()
+    app = get_compiled_graph(llm)
 
     # print("THIS IS THE INITIAL STATE", initial_state)
     
@@ -308,6 +587,27 @@ def run_pokemon_tcg_turn(game_data, card_mapping, max_iterations=500) -> Dict[st
     # in case the player keeps making illegal actions
     final_state = app.invoke(initial_state, {"recursion_limit": max_iterations})
     
+    return _turn_result(final_state)
+
+
+async def run_pokemon_tcg_turn_async(game_data, card_mapping, max_iterations=500, llm=None, card_map_hash=None) -> Dict[str, Any]:
+    """
+    Async counterpart of run_pokemon_tcg_turn.
+
+    The graph runs on the caller's event loop through the async node
+    implementations, so concurrent turns do not need a thread each.
+    Takes the same arguments and returns the same result as run_pokemon_tcg_turn.
+    """
+    initial_state = initialize_game_state(game_data, card_mapping, card_map_hash)
+    
+    app = get_compiled_graph(llm)
+    
+    final_state = await app.ainvoke(initial_state, {"recursion_limit": max_iterations})
+    
+    return _turn_result(final_state)
+
+
+def _turn_result(final_state: ConversationState) -> Dict[str, Any]:
     # Check if we hit the recursion limit - this means we had too many illegal actions
     hit_limit = False
     if not final_state["decision_is_legal"] and final_state["decision_explanation"]:
@@ -318,6 +618,8 @@ def run_pokemon_tcg_turn(game_data, card_mapping, max_iterations=500) -> Dict[st
         "is_legal": final_state["decision_is_legal"],
         "explanation": final_state["decision_explanation"],
         "updated_game_state": final_state["updated_game_state"],
+        # Only set when the Referee answered in diff mode
+        "state_patch": final_state.get("state_patch"),
         "conversation": final_state["mentor_player_conversation"],
         "game_state": final_state["game_state"],
         "card_id_to_card_mapping": final_state["card_id_to_card_mapping"],
@@ -0,0 +1,188 @@
+from typing import Dict, List, Any, Optional, Tuple, NamedTuple
+from dataclasses import dataclass
+
+from pktcgai.state import BoardState, PlayerState, PokemonInPlay, Card, Deck
+from pktcgai.zobrist import board_hash, set_board_hash
+
+# A Pokémon in play as (id, hp, attached card ids), attached is None when attachedCards is
+PokemonSnapshot = Tuple[int, int, Optional[Tuple[int, ...]]]
+
+
+class PlayerSnapshot(NamedTuple):
+    """Immutable copy of a PlayerState, cards as ids."""
+    active: Optional[PokemonSnapshot]
+    bench: Tuple[PokemonSnapshot, ...]
+    discard: Tuple[int, ...]
+    lostZone: Tuple[int, ...]
+    deck: Tuple[int, ...]
+    hand: Tuple[int, ...]
+    stadium: Optional[int]
+    prizeCards: Tuple[int, ...]
+
+
+def _ids(cards: Optional[List[Card]]) -> Tuple[int, ...]:
+    return tuple(card.id for card in cards or ())
+
+
+def _pokemon(pokemon: Optional[PokemonInPlay]) -> Optional[PokemonSnapshot]:
+    if pokemon is None:
+        return None
+    return (pokemon.id, pokemon.hp, _ids(pokemon.attachedCards) if pokemon.attachedCards is not None else None)
+
+
+def _share(value, previous):
+    """Reuse the previous snapshot's object when the zone did not change."""
+    return previous if previous is not None and previous == value else value
+
+
+def snapshot_player(player: PlayerState, previous: Optional[PlayerSnapshot] = None) -> PlayerSnapshot:
+    """
+    Snapshot a player's side, sharing unchanged zones with a previous snapshot.
+
+    Returns the previous snapshot itself if nothing on this side changed.
+    """
+    zones = PlayerSnapshot(
+        active=_pokemon(player.active),
+        bench=tuple(_pokemon(pokemon) for pokemon in player.bench or ()),
+        discard=_ids(player.discard),
+        lostZone=_ids(player.lostZone),
+        deck=_ids(player.deck),
+        hand=_ids(player.hand),
+        stadium=player.stadium.id if player.stadium is not None else None,
+        prizeCards=_ids(player.prizeCards)
+    )
+    if previous is None:
+        return zones
+    if zones == previous:
+        return previous
+    return PlayerSnapshot(*(_share(value, old) for value, old in zip(zones, previous)))
+
+
+def _restore_pokemon(pokemon: Optional[PokemonSnapshot]) -> Optional[PokemonInPlay]:
+    if pokemon is None:
+        return None
+    card_id, hp, attached = pokemon
+    return PokemonInPlay(id=card_id, hp=hp, attachedCards=[Card(id=attached_id) for attached_id in attached] if attached is not None else None)
+
+
+def restore_player(snapshot: PlayerSnapshot) -> PlayerState:
+    """Build a fresh, mutable PlayerState from a snapshot."""
+    return PlayerState(
+        active=_restore_pokemon(snapshot.active),
+        bench=[_restore_pokemon(pokemon) for pokemon in snapshot.bench],
+        discard=[Card(id=card_id) for card_id in snapshot.discard],
+        lostZone=[Card(id=card_id) for card_id in snapshot.lostZone],
+        deck=Deck(Card(id=card_id) for card_id in snapshot.deck),
+        hand=[Card(id=card_id) for card_id in snapshot.hand],
+        stadium=Card(id=snapshot.stadium) if snapshot.stadium is not None else None,
+        prizeCards=[Card(id=card_id) for card_id in snapshot.prizeCards]
+    )
+
+
+@dataclass(frozen=True, eq=False)
+class BoardSnapshot:
+    """
+    Immutable board at one point of a game, linked to the snapshot before it.
+
+    Zones that did not change since the parent are the parent's own tuples, so a
+    turn costs memory only for the zones it touched. The card map is shared.
+    """
+    playerOne: PlayerSnapshot
+    playerTwo: PlayerSnapshot
+    cardMap: Dict[int, dict]
+    cardMapHash: str
+    version: int
+    board_hash: int  # Zobrist hash, see pktcgai.zobrist
+    seed: int = 0
+    rng_state: Optional[tuple] = None  # State of the game's random number generator
+    label: str = ""
+    parent: Optional["BoardSnapshot"] = None
+    depth: int = 0  # Number of snapshots before this one
+
+    def to_board_state(self) -> BoardState:
+        """Build a fresh, mutable BoardState from the snapshot."""
+        state = BoardState(
+            playerOne=restore_player(self.playerOne),
+            playerTwo=restore_player(self.playerTwo),
+            cardMap=self.cardMap,
+            cardMapHash=self.cardMapHash,
+            version=self.version,
+            seed=self.seed
+        )
+        if self.rng_state is not None:
+            state.rng.setstate(self.rng_state)
+        set_board_hash(state, self.board_hash)
+        return state
+
+
+def take_snapshot(state: BoardState, parent: Optional[BoardSnapshot] = None, label: str = "") -> BoardSnapshot:
+    """Snapshot a board, sharing unchanged zones with the parent snapshot."""
+    return BoardSnapshot(
+        playerOne=snapshot_player(state.playerOne, parent.playerOne if parent else None),
+        playerTwo=snapshot_player(state.playerTwo, parent.playerTwo if parent else None),
+        cardMap=state.cardMap,
+        cardMapHash=state.cardMapHash,
+        version=state.version,
+        board_hash=board_hash(state),
+        seed=state.seed,
+        rng_state=state.rng.getstate(),
+        label=label,
+        parent=parent,
+        depth=parent.depth + 1 if parent else 0
+    )
+
+
+class GameHistory:
+    """
+    The snapshots of one game, newest first through parent links.
+
+    Undo moves back to the parent and branch() starts an independent history
+    from the current snapshot; both take O(1) and copy nothing, since snapshots
+    are immutable and shared.
+    """
+
+    def __init__(self, head: Optional[BoardSnapshot] = None):
+        self.head = head
+
+    def __len__(self) -> int:
+        return self.head.depth + 1 if self.head is not None else 0
+
+    def record(self, state: BoardState, label: str = "") -> BoardSnapshot:
+        """Snapshot the board as the newest entry, unless it is unchanged since the last one."""
+        head = self.head
+        if head is not None and head.version == state.version and head.board_hash == board_hash(state):
+            return head
+        self.head = take_snapshot(state, head, label)
+        return self.head
+
+    def undo(self, state: Optional[BoardState] = None) -> Optional[BoardState]:
+        """
+        Drop the newest snapshot and return the board as it was before it, None if there is nothing to undo.
+
+        If state (the live board) changed since the newest snapshot, e.g. a turn
+        that failed part way and was not recorded, the newest snapshot is returned
+        instead and kept.
+        """
+        head = self.head
+        if head is not None and state is not None and (head.version != state.version or head.board_hash != board_hash(state)):
+            return head.to_board_state()
+        if head is None or head.parent is None:
+            return None
+        self.head = head.parent
+        return self.head.to_board_state()
+
+    def branch(self) -> "GameHistory":
+        """A new history continuing from the current snapshot, for what-if play or search."""
+        return GameHistory(self.head)
+
+    def snapshots(self) -> List[BoardSnapshot]:
+        """All snapshots, oldest first."""
+        snapshots = []
+        snapshot = self.head
+        while snapshot is not None:
+            snapshots.append(snapshot)
+            snapshot = snapshot.parent
+        return snapshots[::-1]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        return [{"depth": snapshot.depth, "label": snapshot.label, "version": snapshot.version, "hash": f"{snapshot.board_hash:016x}"} for snapshot in self.snapshots()]
@@ -2,10 +2,42 @@ from langchain_anthropic import ChatAnthropic
 import os
 from dotenv import load_dotenv
 
+from pktcgai.llm.cache import CachedChatModel, ResponseCache, DEFAULT_TTL_SECONDS
+from pktcgai.llm.replay import RecordingChatModel, ReplayChatModel, EXACT
+from pktcgai.llm.fake import ScriptedChatModel
+
 load_dotenv()
 
-ANTHROPIC_LLM = ChatAnthropic(
-            model="claude-3-7-sonnet-20250219",
-            anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
-            streaming=True
-        )
\ No newline at end of file
+# Set to a log file to serve recorded exchanges instead of calling the API
+# (offline runs and benchmarks), or to record every exchange to that file
+LLM_REPLAY_PATH = os.getenv("PKTCGAI_LLM_REPLAY", "")
+LLM_RECORD_PATH = os.getenv("PKTCGAI_LLM_RECORD", "")
+# Set to "1" or to ScriptedChatModel settings ("tokens_per_second=80,error_rate=0.01")
+# to run every agent on the local scripted model, for load tests
+FAKE_LLM_SPEC = os.getenv("PKTCGAI_FAKE_LLM", "")
+
+if FAKE_LLM_SPEC:
+    ANTHROPIC_LLM = ScriptedChatModel.from_spec("" if FAKE_LLM_SPEC.lower() in ("1", "true", "yes") else FAKE_LLM_SPEC)
+elif LLM_REPLAY_PATH:
+    ANTHROPIC_LLM = ReplayChatModel(
+        log_path=LLM_REPLAY_PATH,
+        mode=os.getenv("PKTCGAI_LLM_REPLAY_MODE", EXACT),
+        # Reproduce the recorded time to first token and inter-chunk delays
+        realtime=os.getenv("PKTCGAI_LLM_REPLAY_REALTIME", "").lower() in ("1", "true", "yes")
+    )
+else:
+    ANTHROPIC_LLM = ChatAnthropic(
+                model="claude-3-7-sonnet-20250219",
+                anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
+                streaming=True
+            )
+    if LLM_RECORD_PATH:
+        ANTHROPIC_LLM = RecordingChatModel(inner=ANTHROPIC_LLM, log_path=LLM_RECORD_PATH)
+
+# Set to a SQLite file (or ":memory:") to answer repeated prompts from a cache,
+# e.g. when replaying a preset game or re-running pokemon_tcg_example.py
+LLM_CACHE_PATH = os.getenv("PKTCGAI_LLM_CACHE", "")
+LLM_CACHE_TTL_SECONDS = float(os.getenv("PKTCGAI_LLM_CACHE_TTL", DEFAULT_TTL_SECONDS))
+
+if LLM_CACHE_PATH:
+    ANTHROPIC_LLM = CachedChatModel(inner=ANTHROPIC_LLM, response_cache=ResponseCache(LLM_CACHE_PATH, ttl=LLM_CACHE_TTL_SECONDS))
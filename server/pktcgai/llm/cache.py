@@ -0,0 +1,235 @@
+from typing import Dict, List, Any, Optional, Iterator, AsyncIterator, Union
+from collections import OrderedDict
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict
+
+DEFAULT_MEMORY_ENTRIES = 512
+DEFAULT_DISK_ENTRIES = 20000
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# A response is stored as the list of its streamed chunk contents (str or content blocks)
+Chunks = List[Union[str, list]]
+
+
+def _chunk_text(content) -> str:
+    """Plain text of a chunk's content, whether a string or a list of content blocks."""
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+
+
+def cache_key(messages: List[BaseMessage], params: Dict[str, Any]) -> str:
+    """Hash of the rendered prompt and the model parameters, the identity of a request."""
+    payload = json.dumps(
+        {"messages": [[message.type, message.content] for message in messages], "params": params},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteResponseStore:
+    """
+    Disk tier of the response cache, one row per response in a SQLite file.
+
+    Entries older than ttl are treated as missing and deleted on the next write,
+    as are the least recently used entries beyond max_entries.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_DISK_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, chunks TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[Chunks]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute("SELECT chunks, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                return None
+            with self._connection:
+                self._connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, key: str, chunks: Chunks) -> None:
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, chunks, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(chunks, ensure_ascii=False), now, now)
+            )
+            self._connection.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses")
+
+
+class ResponseCache:
+    """
+    Exact-match cache of chat model responses: an in-memory LRU in front of an
+    optional disk tier.
+
+    Args:
+        path: SQLite file for the disk tier, None or ":memory:" for memory only
+        ttl: Seconds a response stays valid in either tier
+        max_memory_entries: Responses kept in memory, least recently used dropped first
+        max_disk_entries: Responses kept on disk
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_TTL_SECONDS,
+                 max_memory_entries: int = DEFAULT_MEMORY_ENTRIES, max_disk_entries: int = DEFAULT_DISK_ENTRIES):
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.disk = SQLiteResponseStore(path, ttl, max_disk_entries) if path and path != ":memory:" else None
+        # key -> (stored at, chunks)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Chunks]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and time.time() - entry[0] <= self.ttl:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._memory.pop(key, None)
+        chunks = self.disk.get(key) if self.disk is not None else None
+        with self._lock:
+            if chunks is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, chunks)
+        return chunks
+
+    def put(self, key: str, chunks: Chunks) -> None:
+        with self._lock:
+            self._remember(key, chunks)
+        if self.disk is not None:
+            self.disk.put(key, chunks)
+
+    def _remember(self, key: str, chunks: Chunks) -> None:
+        self._memory[key] = (time.time(), chunks)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+
+class CachedChatModel(BaseChatModel):
+    """
+    Wraps a chat model and answers repeated requests from a ResponseCache.
+
+    Requests are matched on the rendered messages plus the wrapped model's
+    parameters. A hit is replayed chunk by chunk as originally streamed, so
+    streaming callers (and the SSE stream) behave as on a miss, only faster. A
+    response is stored only once it has been received in full: a stream the caller
+    stops early (the Referee after an illegal verdict) is not cached.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: BaseChatModel
+    response_cache: ResponseCache
+
+    @property
+    def _llm_type(self) -> str:
+        return f"cached-{self.inner._llm_type}"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"inner": self.inner._identifying_params}
+
+    def __getattr__(self, name: str):
+        # Read-only passthrough (model, temperature, ...) so callers such as
+        # model_config_key see the wrapped model's settings
+        try:
+            return super().__getattr__(name)
+        except AttributeError:
+            inner = self.__dict__.get("inner")
+            if inner is None or name.startswith("_"):
+                raise
+            return getattr(inner, name)
+
+    def _key(self, messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any]) -> str:
+        params = {"llm_type": self.inner._llm_type, **self.inner._identifying_params, "stop": stop, **kwargs}
+        return cache_key(messages, params)
+
+    @staticmethod
+    def _replay(chunks: Chunks) -> Iterator[ChatGenerationChunk]:
+        for content in chunks:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=content))
+
+    @staticmethod
+    def _result(chunks: Chunks) -> ChatResult:
+        if all(isinstance(content, str) for content in chunks):
+            content = "".join(chunks)
+        else:
+            content = "".join(_chunk_text(content) for content in chunks)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = self._key(messages, stop, kwargs)
+        chunks = self.response_cache.get(key)
+        if chunks is None:
+            chunks = [self.inner.invoke(messages, stop=stop, **kwargs).content]
+            self.response_cache.put(key, chunks)
+        return self._result(chunks)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = self._key(messages, stop, kwargs)
+        chunks = self.response_cache.get(key)
+        if chunks is None:
+            chunks = [(await self.inner.ainvoke(messages, stop=stop, **kwargs)).content]
+            self.response_cache.put(key, chunks)
+        return self._result(chunks)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        key = self._key(messages, stop, kwargs)
+        chunks = self.response_cache.get(key)
+        if chunks is not None:
+            yield from self._replay(chunks)
+            return
+        received = []
+        for chunk in self.inner.stream(messages, stop=stop, **kwargs):
+            received.append(chunk.content)
+            yield ChatGenerationChunk(message=chunk)
+        self.response_cache.put(key, received)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        key = self._key(messages, stop, kwargs)
+        chunks = self.response_cache.get(key)
+        if chunks is not None:
+            for chunk in self._replay(chunks):
+                yield chunk
+            return
+        received = []
+        async for chunk in self.inner.astream(messages, stop=stop, **kwargs):
+            received.append(chunk.content)
+            yield ChatGenerationChunk(message=chunk)
+        self.response_cache.put(key, received)
@@ -0,0 +1,228 @@
+from typing import Dict, List, Any, Optional, Iterator, AsyncIterator
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from pktcgai.prompts.layout import prompt_text
+from pktcgai.rules import MAX_BENCH_SIZE
+
+PLAYER = "player"
+MENTOR = "mentor"
+REFEREE = "referee"
+
+# Opening words of each agent's prompt, used to tell which agent is calling
+ROLE_MARKERS = {
+    "You are a Pokémon player": PLAYER,
+    "You are a master mentor": MENTOR,
+    "You are a Referee": REFEREE,
+}
+
+# Heading of the game state segment in every agent's prompt (see pktcgai.prompts.layout)
+STATE_HEADING = "Here is the current game state as a JSON object:"
+# End of the heading of the card list in the Player's prompt
+CARDS_HEADING = 'refers to that card under "ids"):'
+
+# Responses, formatted with: card_id (a card in the player's hand), active_id,
+# reason (for illegal verdicts) and state (the JSON block of a Referee verdict)
+DEFAULT_TEMPLATES = {
+    "question": "Should I play ( id: {card_id} ) this turn?",
+    "decision": "FINAL DECISION: Play ( id: {card_id} ) from my hand.",
+    "attach": "FINAL DECISION: Attach ( id: {card_id} ) to my Active Pokémon ( id: {active_id} ).",
+    "pass": "FINAL DECISION: Pass the turn.",
+    "mentor": "Playing ( id: {card_id} ) looks good, it sets up your next attack while keeping ( id: {active_id} ) safe.",
+    "legal": "The action is legal.\n```json\n{state}\n```",
+    "illegal": "ILLEGAL ACTION: {reason}\n```json\n{state}\n```",
+}
+DEFAULT_ILLEGAL_REASON = "That card cannot be played right now."
+EMPTY_PATCH = {"moves": [], "hp": []}
+
+
+class ScriptedModelError(RuntimeError):
+    """Failure injected by ScriptedChatModel (error_rate)."""
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Local stand-in for ANTHROPIC_LLM for load testing, no outside service needed.
+
+    It recognises the agent from its prompt and answers in that agent's format:
+    the Player asks the Mentor mentor_questions times and then sends a FINAL
+    DECISION about a card in its hand, the Mentor approves, and the Referee rules
+    the move legal (returning the game state unchanged, or an empty patch in diff
+    mode) or, with probability illegal_rate, illegal. Responses come from templates
+    (see DEFAULT_TEMPLATES).
+
+    The Player prefers moves the local rules check cannot reject (attaching an
+    Energy, playing a Trainer, benching a Basic Pokémon), so decisions go to the
+    Referee rather than being ruled illegal before it is called.
+
+    Streaming is paced by time_to_first_token and tokens_per_second, a token being
+    chunk_size characters (tokens_per_second 0 streams without delay). With
+    probability error_rate a call fails with ScriptedModelError before its first
+    token. Randomness comes from seed, so a run is reproducible.
+    """
+    tokens_per_second: float = 0.0
+    time_to_first_token: float = 0.0
+    chunk_size: int = 4
+    error_rate: float = 0.0
+    illegal_rate: float = 0.0
+    mentor_questions: int = 1
+    templates: Dict[str, str] = {}
+    seed: Optional[int] = None
+    _rng: random.Random = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "ScriptedChatModel":
+        """Build from "key=value,..." settings, e.g. "tokens_per_second=80,error_rate=0.01"."""
+        settings = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            key, _, value = item.partition("=")
+            if key not in cls.model_fields or key == "templates":
+                raise ValueError(f"Unknown scripted model setting {key}.")
+            settings[key] = value
+        return cls(**settings)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"seed": self.seed, "illegal_rate": self.illegal_rate, "mentor_questions": self.mentor_questions}
+
+    def _template(self, name: str) -> str:
+        return self.templates.get(name, DEFAULT_TEMPLATES[name])
+
+    def _random(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def _choice(self, items: List[Any]) -> Any:
+        with self._lock:
+            return self._rng.choice(items)
+
+    @staticmethod
+    def _game_state(prompt: str) -> Optional[Dict[str, Any]]:
+        if STATE_HEADING not in prompt:
+            return None
+        try:
+            state, _ = json.JSONDecoder().raw_decode(prompt.split(STATE_HEADING, 1)[1].lstrip())
+        except json.JSONDecodeError:
+            return None
+        return state if isinstance(state, dict) else None
+
+    @staticmethod
+    def _cards(prompt: str) -> Dict[int, Dict[str, Any]]:
+        """The cards listed in the Player's prompt by id, empty if the prompt has no card list."""
+        if CARDS_HEADING not in prompt:
+            return {}
+        try:
+            entries, _ = json.JSONDecoder().raw_decode(prompt.split(CARDS_HEADING, 1)[1].lstrip())
+        except json.JSONDecodeError:
+            return {}
+        if not isinstance(entries, list):
+            return {}
+        return {card_id: entry for entry in entries if isinstance(entry, dict) for card_id in entry.get("ids") or []}
+
+    @staticmethod
+    def _referee_bound(card: Dict[str, Any], has_active: bool, bench_size: int) -> Optional[str]:
+        """The decision template for a move with the card that only the Referee can rule on, None if there is none."""
+        supertype = card.get("supertype")
+        if supertype == "Energy":
+            return "attach" if has_active else None
+        if supertype == "Trainer":
+            return "decision"
+        if supertype == "Pokémon" and "Basic" in card.get("subtypes", []) and bench_size < MAX_BENCH_SIZE:
+            return "decision"
+        return None
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        prompt = prompt_text(messages)
+        role = next((role for marker, role in ROLE_MARKERS.items() if marker in prompt), PLAYER)
+        if role == REFEREE:
+            return self._referee(prompt)
+
+        your_side = (self._game_state(prompt) or {}).get("YOUR_HAND") or {}
+        hand = [card["id"] for card in your_side.get("hand") or [] if isinstance(card, dict) and "id" in card]
+        active = your_side.get("active") or {}
+        active_id = active.get("id", "?")
+        cards = self._cards(prompt)
+        moves = [
+            (card_id, decision) for card_id in hand
+            if (decision := self._referee_bound(cards.get(card_id, {}), bool(active), len(your_side.get("bench") or [])))
+        ]
+        if not moves:
+            moves = [(card_id, "decision") for card_id in hand]
+        card_id, decision = self._choice(moves) if moves else (None, "pass")
+        if role == MENTOR:
+            return self._template("mentor").format(card_id=card_id, active_id=active_id)
+        asked = len(re.findall(r"^\s*Mentor: ", prompt, re.M))
+        if card_id is None:
+            return self._template("pass")
+        if asked < self.mentor_questions:
+            return self._template("question").format(card_id=card_id, active_id=active_id)
+        return self._template(decision).format(card_id=card_id, active_id=active_id)
+
+    def _referee(self, prompt: str) -> str:
+        # Diff mode asks for the changes only, full-state mode for the whole game state
+        if "Each card that changes zone is one move" in prompt:
+            state = json.dumps(EMPTY_PATCH)
+        else:
+            state = json.dumps(self._game_state(prompt) or {})
+        if self._random() < self.illegal_rate:
+            return self._template("illegal").format(reason=DEFAULT_ILLEGAL_REASON, state=state)
+        return self._template("legal").format(state=state)
+
+    def _chunks(self, text: str) -> List[str]:
+        size = max(1, self.chunk_size)
+        return [text[start:start + size] for start in range(0, len(text), size)]
+
+    def _check_error(self) -> None:
+        if self.error_rate and self._random() < self.error_rate:
+            raise ScriptedModelError("Injected model failure.")
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text = self._respond(messages)
+        time.sleep(self.time_to_first_token)
+        self._check_error()
+        if self.tokens_per_second:
+            time.sleep(len(self._chunks(text)) / self.tokens_per_second)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text = self._respond(messages)
+        await asyncio.sleep(self.time_to_first_token)
+        self._check_error()
+        if self.tokens_per_second:
+            await asyncio.sleep(len(self._chunks(text)) / self.tokens_per_second)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        text = self._respond(messages)
+        time.sleep(self.time_to_first_token)
+        self._check_error()
+        for index, chunk in enumerate(self._chunks(text)):
+            if index and self.tokens_per_second:
+                time.sleep(1 / self.tokens_per_second)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        text = self._respond(messages)
+        await asyncio.sleep(self.time_to_first_token)
+        self._check_error()
+        for index, chunk in enumerate(self._chunks(text)):
+            if index and self.tokens_per_second:
+                await asyncio.sleep(1 / self.tokens_per_second)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
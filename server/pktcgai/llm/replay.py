@@ -0,0 +1,175 @@
+from typing import Dict, List, Any, Optional, Iterator, AsyncIterator
+from collections import defaultdict, deque
+import asyncio
+import gzip
+import json
+import threading
+import time
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict, PrivateAttr
+
+from pktcgai.llm.cache import cache_key, _chunk_text
+
+# Exchange logs are JSON lines, one exchange per line:
+#   {"key": ..., "model": ..., "chunks": [[delay, content], ...]}
+# where delay is the seconds since the previous chunk (since the request for the
+# first one, i.e. the time to first token). Logs ending in .gz are gzip-compressed.
+
+EXACT = "exact"  # Serve the exchange recorded for the same prompt
+SEQUENTIAL = "sequential"  # Serve exchanges in recorded order, whatever the prompt
+
+
+class ReplayMiss(LookupError):
+    """No recorded exchange matches the request."""
+
+
+def _open_log(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def exchange_key(messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any]) -> str:
+    """Identity of a request in a log. The model is left out so a log replays under any model name."""
+    return cache_key(messages, {"stop": stop, **kwargs})
+
+
+def load_exchanges(path: str) -> List[Dict[str, Any]]:
+    with _open_log(path, "r") as log:
+        return [json.loads(line) for line in log if line.strip()]
+
+
+class RecordingChatModel(BaseChatModel):
+    """
+    Wraps a chat model and appends every exchange it serves to a log, with the
+    delay before each chunk, for ReplayChatModel to serve later.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: BaseChatModel
+    log_path: str
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return f"recording-{self.inner._llm_type}"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"inner": self.inner._identifying_params}
+
+    def _write(self, key: str, chunks: List[list]) -> None:
+        line = json.dumps({"key": key, "model": self.inner._llm_type, "chunks": chunks}, ensure_ascii=False, separators=(",", ":"))
+        with self._lock, _open_log(self.log_path, "a") as log:
+            log.write(line + "\n")
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        started = time.perf_counter()
+        message = self.inner.invoke(messages, stop=stop, **kwargs)
+        self._write(exchange_key(messages, stop, kwargs), [[time.perf_counter() - started, message.content]])
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=message.content))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        started = time.perf_counter()
+        message = await self.inner.ainvoke(messages, stop=stop, **kwargs)
+        self._write(exchange_key(messages, stop, kwargs), [[time.perf_counter() - started, message.content]])
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=message.content))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        chunks = []
+        last = time.perf_counter()
+        try:
+            for chunk in self.inner.stream(messages, stop=stop, **kwargs):
+                now = time.perf_counter()
+                chunks.append([round(now - last, 4), chunk.content])
+                last = now
+                yield ChatGenerationChunk(message=chunk)
+        finally:
+            # Streams stopped early by the caller are recorded as far as they went
+            self._write(exchange_key(messages, stop, kwargs), chunks)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        chunks = []
+        last = time.perf_counter()
+        try:
+            async for chunk in self.inner.astream(messages, stop=stop, **kwargs):
+                now = time.perf_counter()
+                chunks.append([round(now - last, 4), chunk.content])
+                last = now
+                yield ChatGenerationChunk(message=chunk)
+        finally:
+            self._write(exchange_key(messages, stop, kwargs), chunks)
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Chat model that serves the exchanges of a recorded log, with no network.
+
+    In EXACT mode a request gets the exchange recorded for the same prompt (the
+    exchanges of a prompt recorded several times are served in turn, the last one
+    repeating); in SEQUENTIAL mode requests get the exchanges in recorded order.
+    With realtime set, chunks are delayed as recorded, scaled by speed (2.0 replays
+    twice as fast).
+
+    Raises:
+        ReplayMiss: on a request with no recorded exchange
+    """
+    log_path: str
+    mode: str = EXACT
+    realtime: bool = False
+    speed: float = 1.0
+    _by_key: Dict[str, deque] = PrivateAttr(default_factory=dict)
+    _in_order: deque = PrivateAttr(default_factory=deque)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any) -> None:
+        by_key = defaultdict(deque)
+        for exchange in load_exchanges(self.log_path):
+            by_key[exchange["key"]].append(exchange["chunks"])
+            self._in_order.append(exchange["chunks"])
+        self._by_key = dict(by_key)
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"log_path": self.log_path, "mode": self.mode}
+
+    def _next(self, messages, stop, kwargs) -> List[list]:
+        with self._lock:
+            queue = self._in_order if self.mode == SEQUENTIAL else self._by_key.get(exchange_key(messages, stop, kwargs))
+            if not queue:
+                raise ReplayMiss(f"No recorded exchange for this request in {self.log_path}.")
+            return queue.popleft() if len(queue) > 1 or self.mode == SEQUENTIAL else queue[0]
+
+    def _delay(self, seconds: float) -> float:
+        return seconds / self.speed if self.realtime and self.speed > 0 else 0.0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        chunks = self._next(messages, stop, kwargs)
+        time.sleep(self._delay(sum(delay for delay, _ in chunks)))
+        content = "".join(_chunk_text(content) for _, content in chunks)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        chunks = self._next(messages, stop, kwargs)
+        await asyncio.sleep(self._delay(sum(delay for delay, _ in chunks)))
+        content = "".join(_chunk_text(content) for _, content in chunks)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        for delay, content in self._next(messages, stop, kwargs):
+            if self.realtime:
+                time.sleep(self._delay(delay))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=content))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        for delay, content in self._next(messages, stop, kwargs):
+            if self.realtime:
+                await asyncio.sleep(self._delay(delay))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=content))
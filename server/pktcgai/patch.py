@@ -0,0 +1,209 @@
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, field
+
+from pktcgai.state import BoardState, PlayerState, PokemonInPlay, Card, CARD_ZONES, copy_player, find_in_play
+from pktcgai.card_map import lookup_card
+
+# Zone names the Referee uses in a patch, seen from the player taking the turn.
+# Zones on the other side of the board are prefixed with "opponent.", e.g.
+# "opponent.discard". Attachments use "attached:<pokemon id>" and evolving
+# onto a Pokémon in play uses "evolve:<pokemon id>".
+OPPONENT_PREFIX = "opponent."
+IN_PLAY_ZONES = ("active", "bench")
+SINGLE_CARD_ZONES = ("stadium",)
+
+
+class PatchError(ValueError):
+    """The patch does not match the board it is applied to."""
+
+
+@dataclass
+class CardMove:
+    card_id: int
+    from_zone: str
+    to_zone: str
+
+
+@dataclass
+class HpChange:
+    card_id: int  # Pokémon in play on either side of the board
+    delta: int
+
+
+@dataclass
+class StatePatch:
+    """The changes one action makes to the board, as returned by the Referee in diff mode."""
+    moves: List[CardMove] = field(default_factory=list)
+    hp: List[HpChange] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not self.moves and not self.hp
+
+
+def parse_patch(data: Any) -> StatePatch:
+    """
+    Build a StatePatch from the Referee's JSON.
+
+    Accepts {"moves": [{"card_id", "from", "to"}, ...], "hp": [{"card_id", "delta"}, ...]},
+    moves may also be given as [card_id, from_zone, to_zone] triples.
+
+    Raises:
+        PatchError: if the JSON does not have this shape
+    """
+    if not isinstance(data, dict):
+        raise PatchError("The patch must be a JSON object.")
+    # Anything else (e.g. a restated game state) is not a patch, not an empty one
+    if "moves" not in data and "hp" not in data:
+        raise PatchError('The patch must have "moves" or "hp".')
+    patch = StatePatch()
+    try:
+        for move in data.get("moves") or []:
+            if isinstance(move, (list, tuple)):
+                card_id, from_zone, to_zone = move
+            else:
+                card_id, from_zone, to_zone = move["card_id"], move["from"], move["to"]
+            patch.moves.append(CardMove(int(card_id), str(from_zone), str(to_zone)))
+        for change in data.get("hp") or []:
+            patch.hp.append(HpChange(int(change["card_id"]), int(change["delta"])))
+    except (KeyError, TypeError, ValueError) as e:
+        raise PatchError(f"Malformed patch entry: {e}")
+    return patch
+
+
+def _card_hp(card_map: Dict[Any, dict], card_id: int) -> int:
+    return int((lookup_card(card_map, card_id) or {}).get("hp", 0) or 0)
+
+
+def patch_to_dict(patch: StatePatch) -> Dict[str, Any]:
+    return {
+        "moves": [{"card_id": move.card_id, "from": move.from_zone, "to": move.to_zone} for move in patch.moves],
+        "hp": [{"card_id": change.card_id, "delta": change.delta} for change in patch.hp]
+    }
+
+
+def _resolve_zone(zone: str, player: PlayerState, opponent: PlayerState) -> Tuple[PlayerState, str, Optional[int]]:
+    """Split a zone name into the side it is on, the zone and the Pokémon id it refers to."""
+    side = player
+    if zone.startswith(OPPONENT_PREFIX):
+        side = opponent
+        zone = zone[len(OPPONENT_PREFIX):]
+    if ":" in zone:
+        zone, pokemon_id = zone.split(":", 1)
+        if zone not in ("attached", "evolve") or not pokemon_id.strip().isdigit():
+            raise PatchError(f"Unknown zone {zone}:{pokemon_id}.")
+        return side, zone, int(pokemon_id)
+    if zone not in CARD_ZONES + IN_PLAY_ZONES + SINGLE_CARD_ZONES:
+        raise PatchError(f"Unknown zone {zone}.")
+    return side, zone, None
+
+
+def _take(side: PlayerState, zone: str, pokemon_id: Optional[int], card_id: int):
+    """Remove a card from a zone and return it, a PokemonInPlay when it leaves play."""
+    if zone in CARD_ZONES:
+        cards = getattr(side, zone)
+        for index, card in enumerate(cards):
+            if card.id == card_id:
+                return cards.pop(index)
+    elif zone == "active":
+        if side.active is not None and side.active.id == card_id:
+            pokemon, side.active = side.active, None
+            return pokemon
+    elif zone == "bench":
+        for index, pokemon in enumerate(side.bench):
+            if pokemon.id == card_id:
+                return side.bench.pop(index)
+    elif zone == "stadium":
+        if side.stadium is not None and side.stadium.id == card_id:
+            card, side.stadium = side.stadium, None
+            return card
+    elif zone == "attached":
+        target = find_in_play(side, pokemon_id)
+        for index, card in enumerate(target.attachedCards if target else []):
+            if card.id == card_id:
+                return target.attachedCards.pop(index)
+    raise PatchError(f"Card ( id: {card_id} ) is not in {zone}.")
+
+
+def _put(side: PlayerState, zone: str, pokemon_id: Optional[int], taken, card_map: Dict[Any, dict]) -> None:
+    """Place a taken card (or Pokémon with its attachments) into a zone."""
+    if isinstance(taken, PokemonInPlay):
+        if zone in IN_PLAY_ZONES:
+            pokemon = taken
+            cards = []
+        else:
+            # Leaving play: the Pokémon and everything attached to it go together
+            pokemon = None
+            cards = [Card(id=taken.id)] + list(taken.attachedCards or [])
+    else:
+        pokemon = PokemonInPlay(id=taken.id, hp=_card_hp(card_map, taken.id), attachedCards=[]) if zone in IN_PLAY_ZONES else None
+        cards = [taken]
+
+    if zone == "active":
+        if side.active is not None:
+            raise PatchError(f"The Active Spot is taken by ( id: {side.active.id} ).")
+        side.active = pokemon
+    elif zone == "bench":
+        side.bench.append(pokemon)
+    elif zone in CARD_ZONES:
+        getattr(side, zone).extend(cards)
+    elif zone == "stadium":
+        if len(cards) != 1 or side.stadium is not None:
+            raise PatchError("Only one Stadium card can be in play.")
+        side.stadium = cards[0]
+    elif zone == "attached":
+        target = find_in_play(side, pokemon_id)
+        if target is None:
+            raise PatchError(f"( id: {pokemon_id} ) is not in play.")
+        target.attachedCards.extend(cards)
+    elif zone == "evolve":
+        target = find_in_play(side, pokemon_id)
+        if target is None or len(cards) != 1:
+            raise PatchError(f"( id: {pokemon_id} ) is not in play.")
+        # Damage carries over to the evolved Pokémon; the previous stage stays underneath it
+        damage = _card_hp(card_map, target.id) - target.hp
+        target.attachedCards.append(Card(id=target.id))
+        target.id = cards[0].id
+        target.hp = _card_hp(card_map, target.id) - damage
+
+
+def apply_patch(state: BoardState, patch: StatePatch, player_number: int) -> None:
+    """
+    Check a patch against the board and apply it in place.
+
+    Hp deltas are applied first (damage comes before a Knock Out), then the moves
+    in order. The patch is first applied to copies of both players, so the board
+    is only changed if every entry is valid.
+
+    Args:
+        state: The game's board, updated in place
+        patch: Changes returned by the Referee
+        player_number: 1 or 2, the player whose turn produced the patch
+
+    Raises:
+        PatchError: if a card is not where the patch says it is
+    """
+    card_map = state.cardMap
+    player = copy_player(state.playerOne if player_number == 1 else state.playerTwo)
+    opponent = copy_player(state.playerTwo if player_number == 1 else state.playerOne)
+
+    for change in patch.hp:
+        pokemon = find_in_play(player, change.card_id) or find_in_play(opponent, change.card_id)
+        if pokemon is None:
+            raise PatchError(f"( id: {change.card_id} ) is not in play.")
+        pokemon.hp += change.delta
+
+    for move in patch.moves:
+        if lookup_card(card_map, move.card_id) is None:
+            raise PatchError(f"Unknown card ( id: {move.card_id} ).")
+        from_side, from_zone, from_pokemon = _resolve_zone(move.from_zone, player, opponent)
+        to_side, to_zone, to_pokemon = _resolve_zone(move.to_zone, player, opponent)
+        if from_zone == "evolve":
+            raise PatchError("Cards cannot be moved out of an evolution.")
+        taken = _take(from_side, from_zone, from_pokemon, move.card_id)
+        _put(to_side, to_zone, to_pokemon, taken, card_map)
+
+    if player_number == 1:
+        state.playerOne, state.playerTwo = player, opponent
+    else:
+        state.playerOne, state.playerTwo = opponent, player
+    state.mark_changed()
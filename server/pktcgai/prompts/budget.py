@@ -0,0 +1,179 @@
+from typing import Dict, List, Any, Callable, Optional, Sequence, Tuple
+from dataclasses import dataclass
+import os
+import re
+
+from langchain_core.messages.ai import add_usage
+from langchain_core.prompts import ChatPromptTemplate
+
+from pktcgai.prompts.layout import prompt_text
+
+PLAYER = "player"
+MENTOR = "mentor"
+REFEREE = "referee"
+
+# Pieces a BPE tokenizer rarely merges across: words, runs of up to 3 digits,
+# runs of whitespace (indentation) and single symbols. A single space is merged
+# into the word that follows it, so it is not counted.
+_TOKEN_PIECES = re.compile(r"[^\W\d_]+|\d{1,3}|\s{2,}|[^\w\s]")
+CHARS_PER_TOKEN = 4
+
+# Older conversation messages are cut to their first sentence, at most this long
+SUMMARY_CHARS = 160
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the tokens of a text locally, with no tokenizer or API call.
+
+    Errs on the high side for prose and is close for JSON.
+    """
+    if not text:
+        return 0
+    return sum((len(piece) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN for piece in _TOKEN_PIECES.findall(text))
+
+
+def prompt_overhead(prompt: ChatPromptTemplate) -> int:
+    """Estimated tokens of a prompt's fixed text, i.e. with every variable empty."""
+    return estimate_tokens(prompt_text(prompt.format_messages(**{name: "" for name in prompt.input_variables})))
+
+
+@dataclass(frozen=True)
+class TokenBudget:
+    max_prompt_tokens: int  # Estimated prompt tokens above which the prompt is compacted
+    recent_messages: int = 4  # Latest conversation messages always sent word for word
+
+
+# Budgets per agent node. Override with e.g. PKTCGAI_TOKEN_BUDGETS="player=8000,referee=12000"
+DEFAULT_BUDGETS = {
+    PLAYER: TokenBudget(12000),
+    MENTOR: TokenBudget(12000),
+    REFEREE: TokenBudget(12000),
+}
+
+
+def parse_budgets(spec: str) -> Dict[str, TokenBudget]:
+    """
+    Build the node budgets from "node=max_prompt_tokens,..." settings, the defaults filling the rest.
+
+    Raises:
+        ValueError: on an unknown node or a value that is not a number
+    """
+    budgets = dict(DEFAULT_BUDGETS)
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        node, _, value = item.partition("=")
+        if node not in budgets:
+            raise ValueError(f"Unknown node {node} in token budgets.")
+        budgets[node] = TokenBudget(int(value), budgets[node].recent_messages)
+    return budgets
+
+
+NODE_BUDGETS = parse_budgets(os.getenv("PKTCGAI_TOKEN_BUDGETS", ""))
+
+
+@dataclass(frozen=True)
+class Compaction:
+    summarize_older: bool = False  # Older conversation messages cut to their first sentence
+    brief_cards: bool = False  # Rules text of off-board cards left out (see card_map.relevant_card_subset)
+    drop_older: bool = False  # Older conversation messages left out
+
+
+# Tried in order until the prompt fits its budget; the last one is used regardless
+COMPACTION_STAGES = (
+    Compaction(),
+    Compaction(summarize_older=True),
+    Compaction(summarize_older=True, brief_cards=True),
+    Compaction(summarize_older=True, brief_cards=True, drop_older=True),
+)
+# For prompts without a conversation (the Referee)
+CARD_COMPACTION_STAGES = (Compaction(), Compaction(brief_cards=True))
+
+
+def _first_sentence(text: str) -> str:
+    sentence = _SENTENCE_END.split(text.strip(), 1)[0]
+    if len(sentence) > SUMMARY_CHARS:
+        sentence = sentence[:SUMMARY_CHARS].rstrip()
+    return sentence if sentence == text.strip() else sentence + " [...]"
+
+
+def compact_conversation(conversation: List[Dict[str, str]], compaction: Compaction, recent_messages: int) -> List[Dict[str, str]]:
+    """
+    Apply a compaction to the messages before the latest recent_messages.
+
+    Returns:
+        The messages to render, the conversation itself when nothing changes
+    """
+    older = len(conversation) - recent_messages
+    if older <= 0 or not (compaction.summarize_older or compaction.drop_older):
+        return conversation
+    recent = conversation[older:]
+    if compaction.drop_older:
+        return [{"role": "note", "content": f"({older} earlier messages left out)"}] + recent
+    return [{"role": message["role"], "content": _first_sentence(message["content"])} for message in conversation[:older]] + recent
+
+
+@dataclass(frozen=True)
+class PromptEstimate:
+    prompt_tokens: int  # Estimated tokens of the rendered prompt
+    budget: int
+    stage: int  # Index of the compaction stage used, 0 when nothing was compacted
+
+
+def fit_to_budget(budget: TokenBudget, overhead: int, build_inputs: Callable[[Compaction], Dict[str, str]],
+                  stages: Sequence[Compaction] = COMPACTION_STAGES) -> Tuple[Dict[str, str], PromptEstimate]:
+    """
+    Build a prompt's inputs with the least compaction that fits the budget.
+
+    Args:
+        budget: The node's budget
+        overhead: prompt_overhead of the node's prompt
+        build_inputs: Builds the prompt variables (strings) for a compaction
+        stages: Compactions to try, from the least to the most aggressive
+
+    Returns:
+        The prompt variables and their estimate; those of the last stage when none fits
+    """
+    # Stages often leave some variables (the game state, the card list) unchanged,
+    # each distinct value is estimated once per call
+    estimates: Dict[str, int] = {}
+    for stage, compaction in enumerate(stages):
+        inputs = build_inputs(compaction)
+        tokens = overhead
+        for value in inputs.values():
+            if isinstance(value, str):
+                if value not in estimates:
+                    estimates[value] = estimate_tokens(value)
+                tokens += estimates[value]
+        if tokens <= budget.max_prompt_tokens or stage == len(stages) - 1:
+            return inputs, PromptEstimate(tokens, budget.max_prompt_tokens, stage)
+
+
+def add_chunk_usage(usage: Optional[Dict[str, Any]], chunk) -> Optional[Dict[str, Any]]:
+    """Add up the usage_metadata the provider attaches to some streamed chunks."""
+    chunk_usage = getattr(chunk, "usage_metadata", None)
+    if not chunk_usage:
+        return usage
+    return add_usage(usage, chunk_usage) if usage else chunk_usage
+
+
+def usage_report(estimate: PromptEstimate, response: str, usage_metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Token usage of one agent call, as counted by the provider when the model
+    reports it (usage_metadata of the streamed chunks), estimated otherwise.
+    """
+    report = {
+        "prompt_tokens": estimate.prompt_tokens,
+        "completion_tokens": estimate_tokens(response),
+        "estimated": True,
+        "estimated_prompt_tokens": estimate.prompt_tokens,
+        "budget": estimate.budget,
+        "compaction_stage": estimate.stage,
+    }
+    if usage_metadata:
+        report.update(
+            prompt_tokens=usage_metadata.get("input_tokens", 0),
+            completion_tokens=usage_metadata.get("output_tokens", 0),
+            estimated=False
+        )
+    return report
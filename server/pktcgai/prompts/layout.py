@@ -0,0 +1,64 @@
+from typing import List, Sequence, Tuple
+from dataclasses import dataclass
+import os
+
+from langchain_core.prompts import ChatPromptTemplate
+
+# Providers cache prompts by prefix, so each agent's prompt is assembled from
+# segments ordered from the most to the least stable: what an agent always sends
+# first, what changes every call last.
+STATIC = "static"  # Instructions, the same on every call of an agent
+PER_GAME = "per_game"  # Card details, change only when other cards become visible
+PER_TURN = "per_turn"  # Game state, the same for every call within a turn
+PER_CALL = "per_call"  # Conversation so far, the action to judge
+STABILITY_ORDER = (STATIC, PER_GAME, PER_TURN, PER_CALL)
+
+# Segments ending in a cache breakpoint (Anthropic allows 4 per request). Set the
+# variable to a comma separated list of segment kinds, or to an empty string to
+# send the prompt without cache_control.
+PROMPT_CACHE_BREAKPOINTS: Tuple[str, ...] = tuple(
+    kind.strip() for kind in os.getenv("PKTCGAI_PROMPT_CACHE_BREAKPOINTS", "static,per_game,per_turn").split(",") if kind.strip()
+)
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+@dataclass(frozen=True)
+class PromptSegment:
+    kind: str  # One of STABILITY_ORDER
+    template: str  # Prompt template text, {variables} are filled in per call
+
+
+def layered_prompt(segments: Sequence[PromptSegment], breakpoints: Sequence[str] = PROMPT_CACHE_BREAKPOINTS) -> ChatPromptTemplate:
+    """
+    Build a chat prompt from segments, one text block per segment in a single human message.
+
+    The last block of each segment kind listed in breakpoints carries cache_control,
+    so the prefix up to it can be served from the provider's prompt cache.
+
+    Raises:
+        ValueError: if the segments are not ordered from the most to the least stable
+    """
+    ranks = [STABILITY_ORDER.index(segment.kind) for segment in segments]
+    if ranks != sorted(ranks):
+        raise ValueError("Prompt segments must go from the most to the least stable.")
+    blocks: List[dict] = []
+    for index, segment in enumerate(segments):
+        block = {"type": "text", "text": segment.template}
+        is_last_of_kind = index == len(segments) - 1 or segments[index + 1].kind != segment.kind
+        if segment.kind in breakpoints and is_last_of_kind:
+            block["cache_control"] = CACHE_CONTROL
+        blocks.append(block)
+    return ChatPromptTemplate.from_messages([("human", blocks)])
+
+
+def prompt_text(messages) -> str:
+    """The text of a rendered prompt, joining the segments of every message."""
+    parts = []
+    for message in messages:
+        content = message.content
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+    return "".join(parts)
@@ -1,2988 +1,26 @@
-from fastapi import APIRouter, Response, BackgroundTasks, Query
+from fastapi import APIRouter, Response, BackgroundTasks, Query, HTTPException
 from fastapi.responses import StreamingResponse
 import json
 import asyncio
-from ..state import get_initial_state, BoardState, PlayerState, PokemonInPlay, Card
-from pktcgai.graph.pokemon_tcg_graph import run_pokemon_tcg_turn, transform_game_state
+from ..state import get_initial_state, BoardState, PlayerState, PokemonInPlay, Card, dict_to_player_state, dict_to_pokemon_card, dataclass_to_dict
+from pktcgai.graph.pokemon_tcg_graph import run_pokemon_tcg_turn_async, transform_game_state
+from pktcgai.decks import get_deck
+from pktcgai.views import project_board, SPECTATOR
+from pktcgai.zobrist import cached_board_hash, set_board_hash, move_card
+from pktcgai.patch import parse_patch, apply_patch, PatchError
+from pktcgai.sessions import GameSessionManager, GameSession, DEFAULT_GAME_ID
+from pktcgai.events import TurnEvent, TurnEventBus, current_event_bus, NODE_HEADERS, TOKEN, NODE_START, STATE_UPDATE, ERROR, TOKEN_USAGE
 from typing import Dict, List, Any, Optional
 from dataclasses import asdict
-import io
-import sys
-import contextlib
-import queue
-import threading
 
 router = APIRouter()
 
-# Create a thread-safe queue for real-time streaming
-stream_queue = queue.Queue()
+# Live games, each with its own board state updated by player actions
+sessions = GameSessionManager()
 
-# Global state that will be updated by player actions
-state = None
-
-PIKACHU_DECK = [
-  {
-    "name": "Flying Pikachu V",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "V"
-    ],
-    "hp": "190",
-    "types": [
-      "Lightning"
-    ],
-    "attacks": [
-      {
-        "cost": [
-          "Lightning"
-        ],
-        "name": "Thunder Shock",
-        "damage": "20",
-        "text": "Flip a coin. If heads, your opponent's Active Pokémon is now Paralyzed.",
-        "convertedEnergyCost": 1
-      },
-      {
-        "cost": [
-          "Colorless",
-          "Colorless",
-          "Colorless"
-        ],
-        "name": "Fly",
-        "damage": "120",
-        "text": "Flip a coin. If tails, this attack does nothing. If heads, during your opponent's next turn, prevent all damage from and effects of attacks done to this Pokémon.",
-        "convertedEnergyCost": 3
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Lightning",
-        "value": "×2"
-      }
-    ],
-    "evolvesTo": [
-      "Raichu"
-    ],
-    "rules": [
-      "V rule: When your Pokémon V is Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/cel25/6_hires.png"
-    }
-  },
-  {
-    "name": "Pikachu V",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "V"
-    ],
-    "hp": "190",
-    "types": [
-      "Lightning"
-    ],
-    "attacks": [
-      {
-        "name": "Charge",
-        "cost": [
-          "Lightning"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "",
-        "text": "Search your deck for up to 2 Lightning Energy cards and attach them to this Pokémon. Then, shuffle your deck."
-      },
-      {
-        "name": "Thunderbolt",
-        "cost": [
-          "Lightning",
-          "Lightning",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "200",
-        "text": "Discard all Energy from this Pokémon."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Fighting",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Raichu"
-    ],
-    "rules": [
-      "V rule: When your Pokémon V is Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swshp/SWSH061_hires.png"
-    }
-  },
-  {
-    "name": "Pikachu V",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "V"
-    ],
-    "hp": "190",
-    "types": [
-      "Lightning"
-    ],
-    "attacks": [
-      {
-        "name": "Charge",
-        "cost": [
-          "Lightning"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "",
-        "text": "Search your deck for up to 2 Lightning Energy cards and attach them to this Pokémon. Then, shuffle your deck."
-      },
-      {
-        "name": "Thunderbolt",
-        "cost": [
-          "Lightning",
-          "Lightning",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "200",
-        "text": "Discard all Energy from this Pokémon."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Fighting",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Raichu"
-    ],
-    "rules": [
-      "V rule: When your Pokémon V is Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh4/43_hires.png"
-    }
-  },
-  {
-    "name": "Pikachu V",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "V"
-    ],
-    "hp": "200",
-    "types": [
-      "Lightning"
-    ],
-    "attacks": [
-      {
-        "name": "Tail Whap",
-        "cost": [
-          "Colorless"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "20",
-        "text": ""
-      },
-      {
-        "name": "Thunderbolt",
-        "cost": [
-          "Lightning",
-          "Colorless",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "100",
-        "text": ""
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Fighting",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Raichu"
-    ],
-    "rules": [
-      "V rule: When your Pokémon V is Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh8/86_hires.png"
-    }
-  },
-  {
-    "name": "Pikachu-EX",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "EX"
-    ],
-    "hp": "130",
-    "types": [
-      "Lightning"
-    ],
-    "attacks": [
-      {
-        "name": "Thunder Shock",
-        "cost": [
-          "Lightning",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 2,
-        "damage": "30",
-        "text": "Flip a coin. If heads your opponent's Active Pokémon is now Paralyzed."
-      },
-      {
-        "name": "Mega Thunderbolt",
-        "cost": [
-          "Lightning",
-          "Lightning",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "160",
-        "text": "Discard all Energy attached to this Pokémon."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Fighting",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Raichu"
-    ],
-    "rules": [
-      "Pokémon-EX rule: When a Pokémon-EX has been Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/xyp/XY174_hires.png"
-    }
-  },
-  {
-    "name": "Basic Lightning Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv1/257_hires.png"
-    }
-  },
-  {
-    "name": "Basic Lightning Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv1/257_hires.png"
-    }
-  },
-  {
-    "name": "Basic Lightning Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv1/257_hires.png"
-    }
-  },
-  {
-    "name": "Basic Lightning Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv1/257_hires.png"
-    }
-  },
-  {
-    "name": "Basic Lightning Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv1/257_hires.png"
-    }
-  },
-  {
-    "name": "Basic Lightning Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv1/257_hires.png"
-    }
-  },
-  {
-    "name": "Cheren",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Supporter"
-    ],
-    "rules": [
-      "Draw 3 cards.",
-      "You may play only 1 Supporter card during your turn (before your attack)."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/bw5/91_hires.png"
-    }
-  },
-  {
-    "name": "Cheren",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Supporter"
-    ],
-    "rules": [
-      "Draw 3 cards.",
-      "You may play only 1 Supporter card during your turn (before your attack)."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/bw5/91_hires.png"
-    }
-  },
-  {
-    "name": "Cheren",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Supporter"
-    ],
-    "rules": [
-      "Draw 3 cards.",
-      "You may play only 1 Supporter card during your turn (before your attack)."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/bw5/91_hires.png"
-    }
-  },
-  {
-    "name": "Cheren",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Supporter"
-    ],
-    "rules": [
-      "Draw 3 cards.",
-      "You may play only 1 Supporter card during your turn (before your attack)."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/bw5/91_hires.png"
-    }
-  },
-  {
-    "name": "Nest Ball",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Search your deck for a Basic Pokémon and put it onto your Bench. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv4pt5/84_hires.png"
-    }
-  },
-  {
-    "name": "Nest Ball",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Search your deck for a Basic Pokémon and put it onto your Bench. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv4pt5/84_hires.png"
-    }
-  },
-  {
-    "name": "Nest Ball",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Search your deck for a Basic Pokémon and put it onto your Bench. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv4pt5/84_hires.png"
-    }
-  },
-  {
-    "name": "Nest Ball",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Search your deck for a Basic Pokémon and put it onto your Bench. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv4pt5/84_hires.png"
-    }
-  },
-  {
-    "name": "Flash Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Special"
-    ],
-    "rules": [
-      "This card can only be attached to Lightning Pokémon. This card provides Lightning Energy only while this card is attached to a Lightning Pokémon.",
-      "The Lightning Pokémon this card is attached to has no Weakness.",
-      "(If this card is attached to anything other than a Lightning Pokémon, discard this card.)"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/xy7/83_hires.png"
-    }
-  },
-  {
-    "name": "Flash Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Special"
-    ],
-    "rules": [
-      "This card can only be attached to Lightning Pokémon. This card provides Lightning Energy only while this card is attached to a Lightning Pokémon.",
-      "The Lightning Pokémon this card is attached to has no Weakness.",
-      "(If this card is attached to anything other than a Lightning Pokémon, discard this card.)"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/xy7/83_hires.png"
-    }
-  },
-  {
-    "name": "Flash Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Special"
-    ],
-    "rules": [
-      "This card can only be attached to Lightning Pokémon. This card provides Lightning Energy only while this card is attached to a Lightning Pokémon.",
-      "The Lightning Pokémon this card is attached to has no Weakness.",
-      "(If this card is attached to anything other than a Lightning Pokémon, discard this card.)"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/xy7/83_hires.png"
-    }
-  },
-  {
-    "name": "Charmander",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic"
-    ],
-    "hp": "70",
-    "types": [
-      "Fire"
-    ],
-    "attacks": [
-      {
-        "name": "Gnaw",
-        "cost": [
-          "Fire"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "10",
-        "text": ""
-      },
-      {
-        "name": "Flare",
-        "cost": [
-          "Fire",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 2,
-        "damage": "20",
-        "text": ""
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Water",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Charmeleon"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sm115/7_hires.png"
-    }
-  },
-  {
-    "name": "Charmander",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic"
-    ],
-    "hp": "70",
-    "types": [
-      "Fire"
-    ],
-    "attacks": [
-      {
-        "name": "Gnaw",
-        "cost": [
-          "Fire"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "10",
-        "text": ""
-      },
-      {
-        "name": "Flare",
-        "cost": [
-          "Fire",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 2,
-        "damage": "20",
-        "text": ""
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Water",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Charmeleon"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sm115/7_hires.png"
-    }
-  },
-  {
-    "name": "Charmander",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic"
-    ],
-    "hp": "70",
-    "types": [
-      "Fire"
-    ],
-    "attacks": [
-      {
-        "name": "Gnaw",
-        "cost": [
-          "Fire"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "10",
-        "text": ""
-      },
-      {
-        "name": "Flare",
-        "cost": [
-          "Fire",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 2,
-        "damage": "20",
-        "text": ""
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Water",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Charmeleon"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sm115/7_hires.png"
-    }
-  },
-  {
-    "name": "Charmander",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic"
-    ],
-    "hp": "70",
-    "types": [
-      "Fire"
-    ],
-    "attacks": [
-      {
-        "name": "Gnaw",
-        "cost": [
-          "Fire"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "10",
-        "text": ""
-      },
-      {
-        "name": "Flare",
-        "cost": [
-          "Fire",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 2,
-        "damage": "20",
-        "text": ""
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Water",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Charmeleon"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sm115/7_hires.png"
-    }
-  },
-  {
-    "name": "Charmander",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic"
-    ],
-    "hp": "70",
-    "types": [
-      "Fire"
-    ],
-    "attacks": [
-      {
-        "name": "Gnaw",
-        "cost": [
-          "Fire"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "10",
-        "text": ""
-      },
-      {
-        "name": "Flare",
-        "cost": [
-          "Fire",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 2,
-        "damage": "20",
-        "text": ""
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Water",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Charmeleon"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sm115/7_hires.png"
-    }
-  },
-  {
-    "name": "Fire Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12pt5/153_hires.png"
-    }
-  },
-  {
-    "name": "Fire Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12pt5/153_hires.png"
-    }
-  },
-  {
-    "name": "Fire Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12pt5/153_hires.png"
-    }
-  },
-  {
-    "name": "Fire Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12pt5/153_hires.png"
-    }
-  },
-  {
-    "name": "Hau",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Supporter"
-    ],
-    "rules": [
-      "Draw 3 cards.",
-      "You may play only 1 Supporter card during your turn (before your attack)."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sm7/132_hires.png"
-    }
-  },
-  {
-    "name": "Hau",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Supporter"
-    ],
-    "rules": [
-      "Draw 3 cards.",
-      "You may play only 1 Supporter card during your turn (before your attack)."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sm7/132_hires.png"
-    }
-  },
-  {
-    "name": "Hau",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Supporter"
-    ],
-    "rules": [
-      "Draw 3 cards.",
-      "You may play only 1 Supporter card during your turn (before your attack)."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sm7/132_hires.png"
-    }
-  },
-  {
-    "name": "Hau",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Supporter"
-    ],
-    "rules": [
-      "Draw 3 cards.",
-      "You may play only 1 Supporter card during your turn (before your attack)."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sm7/132_hires.png"
-    }
-  },
-  {
-    "name": "Quick Ball",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "You can play this card only if you discard another card from your hand.",
-      "Search your deck for a Basic Pokémon, reveal it, and put it into your hand. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh1/179_hires.png"
-    }
-  },
-  {
-    "name": "Quick Ball",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "You can play this card only if you discard another card from your hand.",
-      "Search your deck for a Basic Pokémon, reveal it, and put it into your hand. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh1/179_hires.png"
-    }
-  },
-  {
-    "name": "Quick Ball",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "You can play this card only if you discard another card from your hand.",
-      "Search your deck for a Basic Pokémon, reveal it, and put it into your hand. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh1/179_hires.png"
-    }
-  },
-  {
-    "name": "Quick Ball",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "You can play this card only if you discard another card from your hand.",
-      "Search your deck for a Basic Pokémon, reveal it, and put it into your hand. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh1/179_hires.png"
-    }
-  },
-  {
-    "name": "Flying Pikachu V",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "V"
-    ],
-    "hp": "190",
-    "types": [
-      "Lightning"
-    ],
-    "attacks": [
-      {
-        "cost": [
-          "Lightning"
-        ],
-        "name": "Thunder Shock",
-        "damage": "20",
-        "text": "Flip a coin. If heads, your opponent's Active Pokémon is now Paralyzed.",
-        "convertedEnergyCost": 1
-      },
-      {
-        "cost": [
-          "Colorless",
-          "Colorless",
-          "Colorless"
-        ],
-        "name": "Fly",
-        "damage": "120",
-        "text": "Flip a coin. If tails, this attack does nothing. If heads, during your opponent's next turn, prevent all damage from and effects of attacks done to this Pokémon.",
-        "convertedEnergyCost": 3
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Lightning",
-        "value": "×2"
-      }
-    ],
-    "evolvesTo": [
-      "Raichu"
-    ],
-    "rules": [
-      "V rule: When your Pokémon V is Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/cel25/6_hires.png"
-    }
-  },
-  {
-    "name": "Flying Pikachu V",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "V"
-    ],
-    "hp": "190",
-    "types": [
-      "Lightning"
-    ],
-    "attacks": [
-      {
-        "cost": [
-          "Lightning"
-        ],
-        "name": "Thunder Shock",
-        "damage": "20",
-        "text": "Flip a coin. If heads, your opponent's Active Pokémon is now Paralyzed.",
-        "convertedEnergyCost": 1
-      },
-      {
-        "cost": [
-          "Colorless",
-          "Colorless",
-          "Colorless"
-        ],
-        "name": "Fly",
-        "damage": "120",
-        "text": "Flip a coin. If tails, this attack does nothing. If heads, during your opponent's next turn, prevent all damage from and effects of attacks done to this Pokémon.",
-        "convertedEnergyCost": 3
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Lightning",
-        "value": "×2"
-      }
-    ],
-    "evolvesTo": [
-      "Raichu"
-    ],
-    "rules": [
-      "V rule: When your Pokémon V is Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/cel25/6_hires.png"
-    }
-  },
-  {
-    "name": "Pikachu V",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "V"
-    ],
-    "hp": "200",
-    "types": [
-      "Lightning"
-    ],
-    "attacks": [
-      {
-        "name": "Tail Whap",
-        "cost": [
-          "Colorless"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "20",
-        "text": ""
-      },
-      {
-        "name": "Thunderbolt",
-        "cost": [
-          "Lightning",
-          "Colorless",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "100",
-        "text": ""
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Fighting",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Raichu"
-    ],
-    "rules": [
-      "V rule: When your Pokémon V is Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh8/86_hires.png"
-    }
-  },
-  {
-    "name": "Pikachu V",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "V"
-    ],
-    "hp": "190",
-    "types": [
-      "Lightning"
-    ],
-    "attacks": [
-      {
-        "name": "Charge",
-        "cost": [
-          "Lightning"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "",
-        "text": "Search your deck for up to 2 Lightning Energy cards and attach them to this Pokémon. Then, shuffle your deck."
-      },
-      {
-        "name": "Thunderbolt",
-        "cost": [
-          "Lightning",
-          "Lightning",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "200",
-        "text": "Discard all Energy from this Pokémon."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Fighting",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Raichu"
-    ],
-    "rules": [
-      "V rule: When your Pokémon V is Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh4/43_hires.png"
-    }
-  },
-  {
-    "name": "Pikachu-EX",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "EX"
-    ],
-    "hp": "130",
-    "types": [
-      "Lightning"
-    ],
-    "attacks": [
-      {
-        "name": "Thunder Shock",
-        "cost": [
-          "Lightning",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 2,
-        "damage": "30",
-        "text": "Flip a coin. If heads your opponent's Active Pokémon is now Paralyzed."
-      },
-      {
-        "name": "Mega Thunderbolt",
-        "cost": [
-          "Lightning",
-          "Lightning",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "160",
-        "text": "Discard all Energy attached to this Pokémon."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Fighting",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Raichu"
-    ],
-    "rules": [
-      "Pokémon-EX rule: When a Pokémon-EX has been Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/xyp/XY174_hires.png"
-    }
-  },
-  {
-    "name": "Potion",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Heal 30 damage from 1 of your Pokémon.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12pt5/139_hires.png"
-    }
-  },
-  {
-    "name": "Potion",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Heal 30 damage from 1 of your Pokémon.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12pt5/139_hires.png"
-    }
-  },
-  {
-    "name": "Potion",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Heal 30 damage from 1 of your Pokémon.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12pt5/139_hires.png"
-    }
-  },
-  {
-    "name": "Potion",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Heal 30 damage from 1 of your Pokémon.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12pt5/139_hires.png"
-    }
-  },
-  {
-    "name": "Super Potion",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Heal 60 damage from 1 of your Pokémon. If you do, discard an Energy attached to that Pokémon.",
-      "You may play as many Item cards as you like during your turn (before your attack)."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/xy1/128_hires.png"
-    }
-  },
-  {
-    "name": "Super Potion",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Heal 60 damage from 1 of your Pokémon. If you do, discard an Energy attached to that Pokémon.",
-      "You may play as many Item cards as you like during your turn (before your attack)."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/xy1/128_hires.png"
-    }
-  },
-  {
-    "name": "Super Potion",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Heal 60 damage from 1 of your Pokémon. If you do, discard an Energy attached to that Pokémon.",
-      "You may play as many Item cards as you like during your turn (before your attack)."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/xy1/128_hires.png"
-    }
-  },
-  {
-    "name": "Charizard V",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "V"
-    ],
-    "hp": "220",
-    "types": [
-      "Fire"
-    ],
-    "attacks": [
-      {
-        "name": "Incinerate",
-        "cost": [
-          "Fire",
-          "Fire",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "90",
-        "text": "Before doing damage, discard all Pokémon Tools from your opponent's Active Pokémon."
-      },
-      {
-        "name": "Heat Blast",
-        "cost": [
-          "Fire",
-          "Fire",
-          "Fire",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 4,
-        "damage": "180",
-        "text": ""
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Water",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless",
-      "Colorless"
-    ],
-    "convertedRetreatCost": 2,
-    "rules": [
-      "V rule: When your Pokémon V is Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12pt5/18_hires.png"
-    }
-  },
-  {
-    "name": "Charizard V",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "V"
-    ],
-    "hp": "220",
-    "types": [
-      "Fire"
-    ],
-    "attacks": [
-      {
-        "name": "Incinerate",
-        "cost": [
-          "Fire",
-          "Fire",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "90",
-        "text": "Before doing damage, discard all Pokémon Tools from your opponent's Active Pokémon."
-      },
-      {
-        "name": "Heat Blast",
-        "cost": [
-          "Fire",
-          "Fire",
-          "Fire",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 4,
-        "damage": "180",
-        "text": ""
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Water",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless",
-      "Colorless"
-    ],
-    "convertedRetreatCost": 2,
-    "rules": [
-      "V rule: When your Pokémon V is Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12pt5/18_hires.png"
-    }
-  },
-  {
-    "name": "Charizard V",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "V"
-    ],
-    "hp": "220",
-    "types": [
-      "Fire"
-    ],
-    "attacks": [
-      {
-        "name": "Incinerate",
-        "cost": [
-          "Fire",
-          "Fire",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "90",
-        "text": "Before doing damage, discard all Pokémon Tools from your opponent's Active Pokémon."
-      },
-      {
-        "name": "Heat Blast",
-        "cost": [
-          "Fire",
-          "Fire",
-          "Fire",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 4,
-        "damage": "180",
-        "text": ""
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Water",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless",
-      "Colorless"
-    ],
-    "convertedRetreatCost": 2,
-    "rules": [
-      "V rule: When your Pokémon V is Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12pt5/18_hires.png"
-    }
-  },
-  {
-    "name": "Charizard-EX",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "EX"
-    ],
-    "hp": "180",
-    "types": [
-      "Fire"
-    ],
-    "attacks": [
-      {
-        "name": "Wing Attack",
-        "cost": [
-          "Colorless",
-          "Colorless",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "60",
-        "text": ""
-      },
-      {
-        "name": "Combustion Blast",
-        "cost": [
-          "Fire",
-          "Fire",
-          "Colorless",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 4,
-        "damage": "150",
-        "text": "This Pokémon can't use Combustion Blast during your next turn."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Water",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless",
-      "Colorless"
-    ],
-    "convertedRetreatCost": 2,
-    "evolvesTo": [
-      "M Charizard-EX"
-    ],
-    "rules": [
-      "Pokémon-EX rule: When a Pokémon-EX has been Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/xy2/12_hires.png"
-    }
-  },
-  {
-    "name": "Charizard-EX",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "EX"
-    ],
-    "hp": "180",
-    "types": [
-      "Fire"
-    ],
-    "attacks": [
-      {
-        "name": "Wing Attack",
-        "cost": [
-          "Colorless",
-          "Colorless",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "60",
-        "text": ""
-      },
-      {
-        "name": "Combustion Blast",
-        "cost": [
-          "Fire",
-          "Fire",
-          "Colorless",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 4,
-        "damage": "150",
-        "text": "This Pokémon can't use Combustion Blast during your next turn."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Water",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless",
-      "Colorless"
-    ],
-    "convertedRetreatCost": 2,
-    "evolvesTo": [
-      "M Charizard-EX"
-    ],
-    "rules": [
-      "Pokémon-EX rule: When a Pokémon-EX has been Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/xy2/12_hires.png"
-    }
-  },
-  {
-    "name": "Charizard-EX",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "EX"
-    ],
-    "hp": "180",
-    "types": [
-      "Fire"
-    ],
-    "attacks": [
-      {
-        "name": "Wing Attack",
-        "cost": [
-          "Colorless",
-          "Colorless",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "60",
-        "text": ""
-      },
-      {
-        "name": "Combustion Blast",
-        "cost": [
-          "Fire",
-          "Fire",
-          "Colorless",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 4,
-        "damage": "150",
-        "text": "This Pokémon can't use Combustion Blast during your next turn."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Water",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless",
-      "Colorless"
-    ],
-    "convertedRetreatCost": 2,
-    "evolvesTo": [
-      "M Charizard-EX"
-    ],
-    "rules": [
-      "Pokémon-EX rule: When a Pokémon-EX has been Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/xy2/12_hires.png"
-    }
-  },
-  {
-    "name": "Fire Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12pt5/153_hires.png"
-    }
-  },
-  {
-    "name": "Fire Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12pt5/153_hires.png"
-    }
-  },
-  {
-    "name": "Fire Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12pt5/153_hires.png"
-    }
-  }
-]
-
-GARDEVOIR_DECK = [
-  {
-    "name": "Ralts",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic"
-    ],
-    "hp": "70",
-    "types": [
-      "Psychic"
-    ],
-    "attacks": [
-      {
-        "name": "Teleportation Burst",
-        "cost": [
-          "Psychic"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "10",
-        "text": "Switch this Pokémon with 1 of your Benched Pokémon."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Darkness",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Kirlia"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh10/60_hires.png"
-    }
-  },
-  {
-    "name": "Ralts",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic"
-    ],
-    "hp": "70",
-    "types": [
-      "Psychic"
-    ],
-    "attacks": [
-      {
-        "name": "Teleportation Burst",
-        "cost": [
-          "Psychic"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "10",
-        "text": "Switch this Pokémon with 1 of your Benched Pokémon."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Darkness",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Kirlia"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh10/60_hires.png"
-    }
-  },
-  {
-    "name": "Ralts",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic"
-    ],
-    "hp": "70",
-    "types": [
-      "Psychic"
-    ],
-    "attacks": [
-      {
-        "name": "Teleportation Burst",
-        "cost": [
-          "Psychic"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "10",
-        "text": "Switch this Pokémon with 1 of your Benched Pokémon."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Darkness",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Kirlia"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh10/60_hires.png"
-    }
-  },
-  {
-    "name": "Ralts",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic"
-    ],
-    "hp": "60",
-    "types": [
-      "Psychic"
-    ],
-    "attacks": [
-      {
-        "name": "Memory Skip",
-        "cost": [
-          "Psychic"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "10",
-        "text": "Choose 1 of your opponent's Active Pokémon's attacks. During your opponent's next turn, that Pokémon can't use that attack."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Metal",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesTo": [
-      "Kirlia"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12/67_hires.png"
-    }
-  },
-  {
-    "name": "Kirlia",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Stage 1"
-    ],
-    "hp": "80",
-    "types": [
-      "Psychic"
-    ],
-    "attacks": [
-      {
-        "name": "Slap",
-        "cost": [
-          "Psychic",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 2,
-        "damage": "30",
-        "text": ""
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Metal",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless",
-      "Colorless"
-    ],
-    "convertedRetreatCost": 2,
-    "evolvesFrom": "Ralts",
-    "evolvesTo": [
-      "Gardevoir",
-      "Gallade"
-    ],
-    "abilities": [
-      {
-        "name": "Refinement",
-        "text": "You must discard a card from your hand in order to use this Ability. Once during your turn, you may draw 2 cards.",
-        "type": "Ability"
-      }
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12/68_hires.png"
-    }
-  },
-  {
-    "name": "Kirlia",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Stage 1"
-    ],
-    "hp": "80",
-    "types": [
-      "Psychic"
-    ],
-    "attacks": [
-      {
-        "name": "Slap",
-        "cost": [
-          "Psychic",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 2,
-        "damage": "30",
-        "text": ""
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Metal",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless",
-      "Colorless"
-    ],
-    "convertedRetreatCost": 2,
-    "evolvesFrom": "Ralts",
-    "evolvesTo": [
-      "Gardevoir",
-      "Gallade"
-    ],
-    "abilities": [
-      {
-        "name": "Refinement",
-        "text": "You must discard a card from your hand in order to use this Ability. Once during your turn, you may draw 2 cards.",
-        "type": "Ability"
-      }
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12/68_hires.png"
-    }
-  },
-  {
-    "name": "Kirlia",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Stage 1"
-    ],
-    "hp": "80",
-    "types": [
-      "Psychic"
-    ],
-    "attacks": [
-      {
-        "name": "Slap",
-        "cost": [
-          "Psychic",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 2,
-        "damage": "30",
-        "text": ""
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Metal",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless",
-      "Colorless"
-    ],
-    "convertedRetreatCost": 2,
-    "evolvesFrom": "Ralts",
-    "evolvesTo": [
-      "Gardevoir",
-      "Gallade"
-    ],
-    "abilities": [
-      {
-        "name": "Refinement",
-        "text": "You must discard a card from your hand in order to use this Ability. Once during your turn, you may draw 2 cards.",
-        "type": "Ability"
-      }
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12/68_hires.png"
-    }
-  },
-  {
-    "name": "Kirlia",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Stage 1"
-    ],
-    "hp": "80",
-    "types": [
-      "Psychic"
-    ],
-    "attacks": [
-      {
-        "name": "Mirage Step",
-        "cost": [
-          "Psychic"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "",
-        "text": "Search your deck for up to 3 Kirlia and put them onto your Bench. Then, shuffle your deck."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Metal",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "evolvesFrom": "Ralts",
-    "evolvesTo": [
-      "Gardevoir",
-      "Gallade"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh6/60_hires.png"
-    }
-  },
-  {
-    "name": "Gardevoir ex",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Stage 2",
-      "ex"
-    ],
-    "hp": "310",
-    "types": [
-      "Psychic"
-    ],
-    "attacks": [
-      {
-        "name": "Miracle Force",
-        "cost": [
-          "Psychic",
-          "Psychic",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "190",
-        "text": "This Pokémon recovers from all Special Conditions."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Darkness",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless",
-      "Colorless"
-    ],
-    "convertedRetreatCost": 2,
-    "evolvesFrom": "Kirlia",
-    "rules": [
-      "Pokémon ex rule: When your Pokémon ex is Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "abilities": [
-      {
-        "name": "Psychic Embrace",
-        "text": "As often as you like during your turn, you may attach a Basic Psychic Energy card from your discard pile to 1 of your Psychic Pokémon. If you attached Energy to a Pokémon in this way, put 2 damage counters on that Pokémon. You can't use this Ability on a Pokémon that would be Knocked Out.",
-        "type": "Ability"
-      }
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv4pt5/29_hires.png"
-    }
-  },
-  {
-    "name": "Gardevoir ex",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Stage 2",
-      "ex"
-    ],
-    "hp": "310",
-    "types": [
-      "Psychic"
-    ],
-    "attacks": [
-      {
-        "name": "Miracle Force",
-        "cost": [
-          "Psychic",
-          "Psychic",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "190",
-        "text": "This Pokémon recovers from all Special Conditions."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Darkness",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless",
-      "Colorless"
-    ],
-    "convertedRetreatCost": 2,
-    "evolvesFrom": "Kirlia",
-    "rules": [
-      "Pokémon ex rule: When your Pokémon ex is Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "abilities": [
-      {
-        "name": "Psychic Embrace",
-        "text": "As often as you like during your turn, you may attach a Basic Psychic Energy card from your discard pile to 1 of your Psychic Pokémon. If you attached Energy to a Pokémon in this way, put 2 damage counters on that Pokémon. You can't use this Ability on a Pokémon that would be Knocked Out.",
-        "type": "Ability"
-      }
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv4pt5/29_hires.png"
-    }
-  },
-  {
-    "name": "Gardevoir",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Stage 2"
-    ],
-    "hp": "140",
-    "types": [
-      "Psychic"
-    ],
-    "attacks": [
-      {
-        "name": "Brainwave",
-        "cost": [
-          "Colorless",
-          "Colorless",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "60+",
-        "text": "This attack does 30 more damage for each Psychic Energy attached to this Pokémon."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Metal",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless",
-      "Colorless"
-    ],
-    "convertedRetreatCost": 2,
-    "evolvesFrom": "Kirlia",
-    "abilities": [
-      {
-        "name": "Shining Arcana",
-        "text": "Once during your turn, you may look at the top 2 cards of your deck and attach any number of basic Energy cards you find there to your Pokémon in any way you like. Put the other cards into your hand.",
-        "type": "Ability"
-      }
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh6/61_hires.png"
-    }
-  },
-  {
-    "name": "Gardevoir",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Stage 2"
-    ],
-    "hp": "140",
-    "types": [
-      "Psychic"
-    ],
-    "attacks": [
-      {
-        "name": "Brainwave",
-        "cost": [
-          "Colorless",
-          "Colorless",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "60+",
-        "text": "This attack does 30 more damage for each Psychic Energy attached to this Pokémon."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Metal",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless",
-      "Colorless"
-    ],
-    "convertedRetreatCost": 2,
-    "evolvesFrom": "Kirlia",
-    "abilities": [
-      {
-        "name": "Shining Arcana",
-        "text": "Once during your turn, you may look at the top 2 cards of your deck and attach any number of basic Energy cards you find there to your Pokémon in any way you like. Put the other cards into your hand.",
-        "type": "Ability"
-      }
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh6/61_hires.png"
-    }
-  },
-  {
-    "name": "Zacian V",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "V"
-    ],
-    "hp": "220",
-    "types": [
-      "Psychic"
-    ],
-    "attacks": [
-      {
-        "cost": [
-          "Colorless",
-          "Colorless",
-          "Colorless"
-        ],
-        "name": "Storm Slash",
-        "damage": "60+",
-        "text": "This attack does 30 more damage for each Psychic Energy attached to this Pokémon.",
-        "convertedEnergyCost": 3
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Metal",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless",
-      "Colorless"
-    ],
-    "convertedRetreatCost": 2,
-    "rules": [
-      "V rule: When your Pokémon V is Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "abilities": [
-      {
-        "type": "Ability",
-        "name": "Roar of the Sword",
-        "text": "Once during your turn, you may search your deck for a Psychic Energy card and attach it to 1 of your Pokémon. Then, shuffle your deck. If you use this Ability, your turn ends."
-      }
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/cel25/16_hires.png"
-    }
-  },
-  {
-    "name": "Cresselia",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic"
-    ],
-    "hp": "120",
-    "types": [
-      "Psychic"
-    ],
-    "attacks": [
-      {
-        "name": "Moonglow Reverse",
-        "cost": [
-          "Psychic"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "",
-        "text": "Move 2 damage counters from each of your Pokémon to 1 of your opponent's Pokémon."
-      },
-      {
-        "name": "Lunar Blast",
-        "cost": [
-          "Psychic",
-          "Psychic",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "110",
-        "text": ""
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Darkness",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh11/74_hires.png"
-    }
-  },
-  {
-    "name": "Mew",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic"
-    ],
-    "hp": "60",
-    "types": [
-      "Psychic"
-    ],
-    "attacks": [
-      {
-        "cost": [
-          "Psychic",
-          "Colorless"
-        ],
-        "name": "Psyshot",
-        "damage": "30",
-        "text": "",
-        "convertedEnergyCost": 2
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Darkness",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "abilities": [
-      {
-        "type": "Ability",
-        "name": "Mysterious Tail",
-        "text": "Once during your turn, if this Pokémon is in the Active Spot, you may look at the top 6 cards of your deck, reveal an Item card you find there, and put it into your hand. Shuffle the other cards back into your deck."
-      }
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/cel25/11_hires.png"
-    }
-  },
-  {
-    "name": "Radiant Greninja",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "Radiant"
-    ],
-    "hp": "130",
-    "types": [
-      "Water"
-    ],
-    "attacks": [
-      {
-        "name": "Moonlight Shuriken",
-        "cost": [
-          "Water",
-          "Water",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "",
-        "text": "Discard 2 Energy from this Pokémon. This attack does 90 damage to 2 of your opponent's Pokémon. (Don't apply Weakness and Resistance for Benched Pokémon.)"
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Lightning",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "rules": [
-      "Radiant Pokémon Rule: You can't have more than 1 Radiant Pokémon in your deck."
-    ],
-    "abilities": [
-      {
-        "name": "Concealed Cards",
-        "text": "You must discard an Energy card from your hand in order to use this Ability. Once during your turn, you may draw 2 cards.",
-        "type": "Ability"
-      }
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh10/46_hires.png"
-    }
-  },
-  {
-    "name": "Manaphy",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic"
-    ],
-    "hp": "70",
-    "types": [
-      "Water"
-    ],
-    "attacks": [
-      {
-        "name": "Rain Splash",
-        "cost": [
-          "Water"
-        ],
-        "convertedEnergyCost": 1,
-        "damage": "20",
-        "text": ""
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Lightning",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "abilities": [
-      {
-        "name": "Wave Veil",
-        "text": "Prevent all damage done to your Benched Pokémon by attacks from your opponent's Pokémon.",
-        "type": "Ability"
-      }
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh9/41_hires.png"
-    }
-  },
-  {
-    "name": "Lumineon V",
-    "supertype": "Pokémon",
-    "subtypes": [
-      "Basic",
-      "V"
-    ],
-    "hp": "170",
-    "types": [
-      "Water"
-    ],
-    "attacks": [
-      {
-        "name": "Aqua Return",
-        "cost": [
-          "Water",
-          "Colorless",
-          "Colorless"
-        ],
-        "convertedEnergyCost": 3,
-        "damage": "120",
-        "text": "Shuffle this Pokémon and all attached cards into your deck."
-      }
-    ],
-    "weaknesses": [
-      {
-        "type": "Lightning",
-        "value": "×2"
-      }
-    ],
-    "retreatCost": [
-      "Colorless"
-    ],
-    "convertedRetreatCost": 1,
-    "rules": [
-      "V rule: When your Pokémon V is Knocked Out, your opponent takes 2 Prize cards."
-    ],
-    "abilities": [
-      {
-        "name": "Luminous Sign",
-        "text": "When you play this Pokémon from your hand onto your Bench during your turn, you may search your deck for a Supporter card, reveal it, and put it into your hand. Then, shuffle your deck.",
-        "type": "Ability"
-      }
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh9/40_hires.png"
-    }
-  },
-  {
-    "name": "Iono",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Supporter"
-    ],
-    "rules": [
-      "Each player shuffles their hand and puts it on the bottom of their deck. If either player put any cards on the bottom of their deck in this way, each player draws a card for each of their remaining Prize cards.",
-      "You may play only 1 Supporter card during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv4pt5/80_hires.png"
-    }
-  },
-  {
-    "name": "Iono",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Supporter"
-    ],
-    "rules": [
-      "Each player shuffles their hand and puts it on the bottom of their deck. If either player put any cards on the bottom of their deck in this way, each player draws a card for each of their remaining Prize cards.",
-      "You may play only 1 Supporter card during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv4pt5/80_hires.png"
-    }
-  },
-  {
-    "name": "Iono",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Supporter"
-    ],
-    "rules": [
-      "Each player shuffles their hand and puts it on the bottom of their deck. If either player put any cards on the bottom of their deck in this way, each player draws a card for each of their remaining Prize cards.",
-      "You may play only 1 Supporter card during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv4pt5/80_hires.png"
-    }
-  },
-  {
-    "name": "Professor's Research",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Supporter"
-    ],
-    "rules": [
-      "Discard your hand and draw 7 cards.",
-      "You may play only 1 Supporter card during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv4pt5/87_hires.png"
-    }
-  },
-  {
-    "name": "Professor's Research",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Supporter"
-    ],
-    "rules": [
-      "Discard your hand and draw 7 cards.",
-      "You may play only 1 Supporter card during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv4pt5/87_hires.png"
-    }
-  },
-  {
-    "name": "Boss's Orders (Ghetsis)",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Supporter"
-    ],
-    "rules": [
-      "Switch in 1 of your opponent's Benched Pokémon to the Active Spot.",
-      "You may play only 1 Supporter card during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv2/172_hires.png"
-    }
-  },
-  {
-    "name": "Boss's Orders (Ghetsis)",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Supporter"
-    ],
-    "rules": [
-      "Switch in 1 of your opponent's Benched Pokémon to the Active Spot.",
-      "You may play only 1 Supporter card during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv2/172_hires.png"
-    }
-  },
-  {
-    "name": "Battle VIP Pass",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "You can use this card only during your first turn.",
-      "Search your deck for up to 2 Basic Pokémon and put them onto your Bench. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh8/225_hires.png"
-    }
-  },
-  {
-    "name": "Battle VIP Pass",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "You can use this card only during your first turn.",
-      "Search your deck for up to 2 Basic Pokémon and put them onto your Bench. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh8/225_hires.png"
-    }
-  },
-  {
-    "name": "Battle VIP Pass",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "You can use this card only during your first turn.",
-      "Search your deck for up to 2 Basic Pokémon and put them onto your Bench. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh8/225_hires.png"
-    }
-  },
-  {
-    "name": "Battle VIP Pass",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "You can use this card only during your first turn.",
-      "Search your deck for up to 2 Basic Pokémon and put them onto your Bench. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh8/225_hires.png"
-    }
-  },
-  {
-    "name": "Level Ball",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Search your deck for a Pokémon with 90 HP or less, reveal it, and put it into your hand. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh5/129_hires.png"
-    }
-  },
-  {
-    "name": "Level Ball",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Search your deck for a Pokémon with 90 HP or less, reveal it, and put it into your hand. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh5/129_hires.png"
-    }
-  },
-  {
-    "name": "Level Ball",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Search your deck for a Pokémon with 90 HP or less, reveal it, and put it into your hand. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh5/129_hires.png"
-    }
-  },
-  {
-    "name": "Level Ball",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Search your deck for a Pokémon with 90 HP or less, reveal it, and put it into your hand. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh5/129_hires.png"
-    }
-  },
-  {
-    "name": "Ultra Ball",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "You can use this card only if you discard 2 other cards from your hand. Search your deck for a Pokémon, reveal it, and put it into your hand. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv1/196_hires.png"
-    }
-  },
-  {
-    "name": "Ultra Ball",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "You can use this card only if you discard 2 other cards from your hand. Search your deck for a Pokémon, reveal it, and put it into your hand. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv1/196_hires.png"
-    }
-  },
-  {
-    "name": "Ultra Ball",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "You can use this card only if you discard 2 other cards from your hand. Search your deck for a Pokémon, reveal it, and put it into your hand. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv1/196_hires.png"
-    }
-  },
-  {
-    "name": "Rare Candy",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Choose 1 of your Basic Pokémon in play. If you have a Stage 2 card in your hand that evolves from that Pokémon, put that card onto the Basic Pokémon to evolve it, skipping the Stage 1. You can't use this card during your first turn or on a Basic Pokémon that was put into play this turn.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv1/191_hires.png"
-    }
-  },
-  {
-    "name": "Rare Candy",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Choose 1 of your Basic Pokémon in play. If you have a Stage 2 card in your hand that evolves from that Pokémon, put that card onto the Basic Pokémon to evolve it, skipping the Stage 1. You can't use this card during your first turn or on a Basic Pokémon that was put into play this turn.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv1/191_hires.png"
-    }
-  },
-  {
-    "name": "Rare Candy",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Choose 1 of your Basic Pokémon in play. If you have a Stage 2 card in your hand that evolves from that Pokémon, put that card onto the Basic Pokémon to evolve it, skipping the Stage 1. You can't use this card during your first turn or on a Basic Pokémon that was put into play this turn.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv1/191_hires.png"
-    }
-  },
-  {
-    "name": "Fog Crystal",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Search your deck for a Psychic Energy card or a Basic Psychic Pokémon, reveal it, and put it into your hand. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh6/140_hires.png"
-    }
-  },
-  {
-    "name": "Fog Crystal",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Search your deck for a Psychic Energy card or a Basic Psychic Pokémon, reveal it, and put it into your hand. Then, shuffle your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh6/140_hires.png"
-    }
-  },
-  {
-    "name": "Super Rod",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Shuffle up to 3 in any combination of Pokémon and Basic Energy cards from your discard pile into your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv2/188_hires.png"
-    }
-  },
-  {
-    "name": "Super Rod",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Shuffle up to 3 in any combination of Pokémon and Basic Energy cards from your discard pile into your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv2/188_hires.png"
-    }
-  },
-  {
-    "name": "Lost Vacuum",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "You can use this card only if you put another card from your hand in the Lost Zone. Choose a Pokémon Tool attached to any Pokémon, or any Stadium in play, and put it in the Lost Zone.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh11/162_hires.png"
-    }
-  },
-  {
-    "name": "Pal Pad",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item"
-    ],
-    "rules": [
-      "Shuffle up to 2 Supporter cards from your discard pile into your deck.",
-      "You may play any number of Item cards during your turn."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv1/182_hires.png"
-    }
-  },
-  {
-    "name": "Forest Seal Stone",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Item",
-      "Pokémon Tool"
-    ],
-    "rules": [
-      "The Pokémon V this card is attached to can use the VSTAR Power on this card.",
-      "You may play any number of Item cards during your turn.",
-      "Attach a Pokémon Tool to 1 of your Pokémon that doesn't already have a Pokémon Tool attached."
-    ],
-    "abilities": [
-      {
-        "name": "Star Alchemy",
-        "text": "During your turn, you may search your deck for a card and put it into your hand. Then, shuffle your deck. (You can't use more than 1 VSTAR Power in a game.)",
-        "type": "Ability"
-      }
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh12/156_hires.png"
-    }
-  },
-  {
-    "name": "Artazon",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Stadium"
-    ],
-    "rules": [
-      "Once during each player's turn, that player may search their deck for a Basic Pokémon that doesn't have a Rule Box and put it onto their Bench. Then, that player shuffles their deck. (Pokémon ex, Pokémon V, etc. have Rule Boxes.)",
-      "You may play only 1 Stadium card during your turn. Put it next to the Active Spot, and discard it if another Stadium comes into play. A Stadium with the same name can't be played."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv4pt5/76_hires.png"
-    }
-  },
-  {
-    "name": "Collapsed Stadium",
-    "supertype": "Trainer",
-    "subtypes": [
-      "Stadium"
-    ],
-    "rules": [
-      "Each player can't have more than 4 Benched Pokémon. If a player has 5 or more Benched Pokémon, they discard Benched Pokémon until they have 4 Pokémon on the Bench. The player who played this card discards first. If more than one effect changes the number of Benched Pokémon allowed, use the smaller number."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/swsh9/137_hires.png"
-    }
-  },
-  {
-    "name": "Basic Psychic Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sve/5_hires.png"
-    }
-  },
-  {
-    "name": "Basic Psychic Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sve/5_hires.png"
-    }
-  },
-  {
-    "name": "Basic Psychic Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sve/5_hires.png"
-    }
-  },
-  {
-    "name": "Basic Psychic Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sve/5_hires.png"
-    }
-  },
-  {
-    "name": "Basic Psychic Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sve/5_hires.png"
-    }
-  },
-  {
-    "name": "Basic Psychic Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sve/5_hires.png"
-    }
-  },
-  {
-    "name": "Basic Psychic Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sve/5_hires.png"
-    }
-  },
-  {
-    "name": "Basic Psychic Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Basic"
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sve/5_hires.png"
-    }
-  },
-  {
-    "name": "Reversal Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Special"
-    ],
-    "rules": [
-      "As long as this card is attached to a Pokémon, it provides Colorless Energy.If you have more Prize cards remaining than your opponent, and if this card is attached to an Evolution Pokémon that doesn't have a Rule Box (Pokémon ex, Pokémon V, etc. have Rule Boxes), this card provides every type of Energy but provides only 3 Energy at a time."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv2/192_hires.png"
-    }
-  },
-  {
-    "name": "Reversal Energy",
-    "supertype": "Energy",
-    "subtypes": [
-      "Special"
-    ],
-    "rules": [
-      "As long as this card is attached to a Pokémon, it provides Colorless Energy.If you have more Prize cards remaining than your opponent, and if this card is attached to an Evolution Pokémon that doesn't have a Rule Box (Pokémon ex, Pokémon V, etc. have Rule Boxes), this card provides every type of Energy but provides only 3 Energy at a time."
-    ],
-    "images": {
-      "large": "https://images.pokemontcg.io/sv2/192_hires.png"
-    }
-  }
-]
-
-def dataclass_to_dict(obj):
-    """Convert a dataclass instance to a dictionary recursively."""
-    if hasattr(obj, "__dataclass_fields__"):
-        # For dataclass instances
-        result = {}
-        for field in obj.__dataclass_fields__:
-            value = getattr(obj, field)
-            result[field] = dataclass_to_dict(value)
-        return result
-    elif isinstance(obj, list):
-        # For lists
-        return [dataclass_to_dict(item) for item in obj]
-    elif isinstance(obj, dict):
-        # For dictionaries
-        return {key: dataclass_to_dict(value) for key, value in obj.items()}
-    else:
-        # For primitive types
-        return obj
+# Decks dealt to each player, by name in the deck registry (common/<name>-deck.json)
+PLAYER_ONE_DECK = "gardevoir"
+PLAYER_TWO_DECK = "pikachu"
 
 def prepare_game_state_for_player(current_state: BoardState, player_number: int):
     """
@@ -2990,130 +28,15 @@ def prepare_game_state_for_player(current_state: BoardState, player_number: int)
     
     For player1, this means seeing player1's full hand and player2's limited information.
     For player2, this means seeing player2's full hand and player1's limited information.
-    """
-    game_state = {"YOUR_HAND": {}, "OPPONENT_HAND": {}, "REAL_OPPONENT_HAND": {}}
-    # print("HERE 10", game_state)
-    # Convert BoardState to dictionary for easier manipulation
-    state_dict = dataclass_to_dict(current_state)
-    # print("HERE 11", state_dict)
-    if player_number == 1:
-        # Player1 sees their full hand
-        game_state["YOUR_HAND"] = state_dict["playerOne"]
-        game_state["REAL_OPPONENT_HAND"] = state_dict["playerTwo"]
-        # print("HERE 12", game_state)
-        # Player1 sees limited information about player2
-        opponent_state = state_dict["playerTwo"]
-        game_state["OPPONENT_HAND"] = {
-            "active": opponent_state["active"],
-            "bench": opponent_state["bench"],
-            "discard": opponent_state["discard"],
-            "lostZone": opponent_state["lostZone"],
-            "deck": f"{len(opponent_state['deck'])} cards",
-            "hand": f"{len(opponent_state['hand'])} cards",
-            "stadium": opponent_state["stadium"],
-            "prizeCards": f"{len(opponent_state['prizeCards'])} cards"
-        }
-        # print("HERE 13", game_state)
-    else:
-        # Player2 sees their full hand
-        game_state["YOUR_HAND"] = state_dict["playerTwo"]
-        game_state["REAL_OPPONENT_HAND"] = state_dict["playerOne"]
-        
-        # Player2 sees limited information about player1
-        opponent_state = state_dict["playerOne"]
-        game_state["OPPONENT_HAND"] = {
-            "active": opponent_state["active"],
-            "bench": opponent_state["bench"],
-            "discard": opponent_state["discard"],
-            "lostZone": opponent_state["lostZone"],
-            "deck": f"{len(opponent_state['deck'])} cards",
-            "hand": f"{len(opponent_state['hand'])} cards",
-            "stadium": opponent_state["stadium"],
-            "prizeCards": f"{len(opponent_state['prizeCards'])} cards"
-        }
-    
-    # Include the card mapping
-    # game_state["card_mapping"] = state_dict["cardMap"]
-    card_mapping = state_dict["cardMap"]
-    
-    return game_state, card_mapping
-
-def dict_to_player_state(player_dict: Dict) -> PlayerState:
-    """Convert a dictionary to a PlayerState object."""
-    # Convert active Pokemon
-    active = None
-    if player_dict.get("active"):
-        active_dict = player_dict["active"]
-        attached_cards = None
-        if active_dict.get("attachedCards"):
-            attached_cards = [Card(id=card["id"]) for card in active_dict["attachedCards"]]
-        active = PokemonInPlay(
-            id=active_dict["id"],
-            hp=active_dict.get("hp", 0),
-            attachedCards=attached_cards
-        )
-    
-    # Convert bench Pokemon
-    bench = []
-    for pokemon_dict in player_dict.get("bench", []):
-        attached_cards = None
-        if pokemon_dict.get("attachedCards"):
-            attached_cards = [Card(id=card["id"]) for card in pokemon_dict["attachedCards"]]
-        bench.append(PokemonInPlay(
-            id=pokemon_dict["id"],
-            hp=pokemon_dict.get("hp", 0),
-            attachedCards=attached_cards
-        ))
-    
-    # Convert other card lists
-    discard = [Card(id=card["id"]) for card in player_dict.get("discard", [])]
-    lost_zone = [Card(id=card["id"]) for card in player_dict.get("lostZone", [])]
-    deck = [Card(id=card["id"]) for card in player_dict.get("deck", [])]
-    hand = [Card(id=card["id"]) for card in player_dict.get("hand", [])]
-    prize_cards = [Card(id=card["id"]) for card in player_dict.get("prizeCards", [])]
-    
-    # Convert stadium
-    stadium = None
-    if player_dict.get("stadium") and isinstance(player_dict["stadium"], dict):
-        stadium = Card(id=player_dict["stadium"]["id"])
-    
-    return PlayerState(
-        active=active,
-        bench=bench,
-        discard=discard,
-        lostZone=lost_zone,
-        deck=deck,
-        hand=hand,
-        stadium=stadium,
-        prizeCards=prize_cards
-    )
-
-def dict_to_pokemon_card(card_dict: Dict):
-    """Convert dictionary representation of a card back to a proper Pokemon card object."""
-    if card_dict is None:
-        return None
     
-    # For active and bench Pokemon (those with hp or attachedCards)
-    if isinstance(card_dict, dict) and "id" in card_dict and ("hp" in card_dict or "attachedCards" in card_dict):
-        attached_cards = None
-        if card_dict.get("attachedCards"):
-            attached_cards = [Card(id=card["id"]) for card in card_dict["attachedCards"]]
-        
-        return PokemonInPlay(
-            id=card_dict["id"],
-            hp=card_dict.get("hp", 0),
-            attachedCards=attached_cards
-        )
-    # For stadium and other simple cards, create a Card object
-    elif isinstance(card_dict, dict) and "id" in card_dict:
-        return Card(id=card_dict["id"])
-    
-    # Fallback for unknown card types
-    return None
+    The view is projected by pktcgai.views and cached on the board under its
+    version, so it is returned again (and must not be modified) until the
+    board changes.
+    """
+    return project_board(current_state, player_number), current_state.cardMap
 
-def update_global_state(result: Dict, player_number: int):
-    """Update the global state with the changes from a player's turn."""
-    global state
+def update_board_state(state: BoardState, result: Dict, player_number: int):
+    """Update a game's board state with the changes from a player's turn."""
     # print("THIS IS THE UPDATED GAME STATE", type(result), result)
 
     if isinstance(result['updated_game_state']['YOUR_HAND'], str):
@@ -3127,6 +50,7 @@ def update_global_state(result: Dict, player_number: int):
     your_hand = result['updated_game_state']['YOUR_HAND']
     # opponent_hand = result.get("REAL_OPPONENT_HAND", {})
     opponent_hand = result['game_state']['REAL_OPPONENT_HAND']
+    opponent_view = result['game_state']['OPPONENT_HAND']
     # print("THIS IS THE YOUR HAND", your_hand)
     
     # Convert dictionary back to PlayerState
@@ -3138,7 +62,7 @@ def update_global_state(result: Dict, player_number: int):
     if player_number == 1:
         state.playerOne = player_state
         state.playerTwo = other_player_state
-        state.playerTwo.active = dict_to_pokemon_card(result['game_state']['OPPONENT_HAND']['active'])
+        state.playerTwo.active = dict_to_pokemon_card(opponent_view['active'])
 
         print("THIS IS THE PLAYER ONE STATE", state.playerOne)
         print("THIS IS THE PLAYER TWO STATE", state.playerTwo)
@@ -3161,7 +85,7 @@ def update_global_state(result: Dict, player_number: int):
     else:
         state.playerTwo = player_state
         state.playerOne = other_player_state
-        state.playerOne.active = dict_to_pokemon_card(result['game_state']['OPPONENT_HAND']['active'])
+        state.playerOne.active = dict_to_pokemon_card(opponent_view['active'])
         
         # Update opponent's visible information (player 1)
         # Only update what's visible to player 2 (active, bench, discard, etc.)
@@ -3177,50 +101,72 @@ def update_global_state(result: Dict, player_number: int):
         #     state.playerOne.stadium = dict_to_pokemon_card(opponent_hand["stadium"])
         # elif opponent_hand.get("stadium") is None:
         #     state.playerOne.stadium = None
-
-# Modify stdout to stream output in real-time
-class StreamingStdout:
-    def __init__(self):
-        self.buffer = io.StringIO()
-        
-    def write(self, text):
-        # Write to buffer for capturing
-        self.buffer.write(text)
-        # Add to stream queue for real-time updates
-        # if text.strip():
-        stream_queue.put(text)
     
-    def flush(self):
-        pass
-    
-    def getvalue(self):
-        return self.buffer.getvalue()
+    state.mark_changed()
 
-@contextlib.contextmanager
-def capture_stdout():
-    """Capture stdout and return it as a string while streaming in real-time."""
-    stdout_buffer = StreamingStdout()
-    original_stdout = sys.stdout
-    sys.stdout = stdout_buffer
-    try:
-        yield stdout_buffer
-    finally:
-        sys.stdout = original_stdout
+def strip_card_ids(message: str) -> str:
+    """Remove "( id: N )" references (and the space after them) from streamed text."""
+    # Track if we're inside brackets and build filtered message
+    inside_brackets = False
+    filtered_message = []
+    current_chunk = []
+    
+    for i, char in enumerate(message):
+        if char == '(':
+            # If we see an opening bracket, mark as inside brackets
+            # and don't include the opening bracket
+            inside_brackets = True
+            if current_chunk:
+                filtered_message.extend(current_chunk)
+                current_chunk = []
+        elif char == ')':
+            # If we see a closing bracket, mark as outside brackets
+            # and don't include the closing bracket or the following space
+            inside_brackets = False
+            current_chunk = []
+            # Skip the next character if it's a space
+            if i + 1 < len(message) and message[i + 1] == ' ':
+                continue
+        elif not inside_brackets:
+            # Only add characters when we're not inside brackets
+            current_chunk.append(char)
+    
+    # Add any remaining non-bracketed content
+    if current_chunk:
+        filtered_message.extend(current_chunk)
+    
+    return ''.join(filtered_message)
+
+def encode_sse_event(event: TurnEvent) -> Optional[str]:
+    """Encode a turn event in the SSE format the frontend expects, None if it is not sent."""
+    if event.type == TOKEN:
+        text = strip_card_ids(event.data)
+        # Only yield if we have content to stream
+        return f"data: {text}\n\n" if text else None
+    if event.type == NODE_START:
+        return f"data: {NODE_HEADERS.get(event.node, event.node)}\n\n"
+    if event.type == STATE_UPDATE:
+        return f"event: state_update\ndata: {json.dumps(event.data)}\n\n"
+    if event.type == ERROR:
+        return f"data: ERROR: {event.data}\n\n"
+    if event.type == TOKEN_USAGE:
+        return f"event: token_usage\ndata: {json.dumps({'node': event.node, **event.data})}\n\n"
+    # node_end, verdict and partial_state have no frontend representation
+    return None
 
-async def process_player_turn(player_number: int):
+async def process_player_turn(session: GameSession, player_number: int):
     """Process a player's turn and yield updates as they occur."""
-    global state, stream_queue
-    
-    # Clear any previous messages in the queue
-    while not stream_queue.empty():
-        try:
-            stream_queue.get_nowait()
-        except queue.Empty:
-            break
-    
-    # Prepare game state for the specified player
-    game_state, card_mapping = prepare_game_state_for_player(state, player_number)
-    
+    # Only one turn at a time per game, other games are not blocked
+    async with session.lock:
+        outcome = {"completed": False}
+        async for message in _run_player_turn(session.state, player_number, outcome):
+            yield message
+        # Failed or interrupted turns leave no undo point, undo returns to the last recorded board
+        if outcome["completed"]:
+            session.history.record(session.state, f"player {player_number} turn")
+    session.touch()
+
+async def _run_player_turn(state: BoardState, player_number: int, outcome: Dict[str, bool]):
     # Draw a card from the deck to the player's hand at the beginning of turn (classic Pokémon TCG rule)
     card_drawn = False
     try:
@@ -3230,12 +176,18 @@ async def process_player_turn(player_number: int):
         # Check if the deck has cards to draw
         if player_state.deck and len(player_state.deck) > 0:
             # print("HERE 2")
+            # Known when the last turn was recorded in the history; never recomputed here,
+            # the history computes it once at the end of the turn
+            previous_hash = cached_board_hash(state)
             # Draw the top card from the deck
-            top_card = player_state.deck.pop(0)
+            top_card = player_state.deck.draw()
             # Add the card to the player's hand
             if player_state.hand is None:
                 player_state.hand = []
             player_state.hand.append(top_card)
+            state.mark_changed()
+            if previous_hash is not None:
+                set_board_hash(state, move_card(previous_hash, player_number, top_card.id, "deck", "hand"))
             card_drawn = True
             # print("HERE 3")
             # Display message about card being drawn
@@ -3244,9 +196,6 @@ async def process_player_turn(player_number: int):
             card_name = card_info.get("name", f"Card ID: {card_id}")
             print(f"data: Drew {card_name} from the deck at the beginning of the turn.\n\n")
             yield f"data: Drew {card_name} from the deck at the beginning of the turn.\n\n"
-            
-            # Update the game state to reflect the drawn card
-            game_state, card_mapping = prepare_game_state_for_player(state, player_number)
             # print("HERE 4")
         else:
             yield f"data: Cannot draw a card: deck is empty.\n\n"
@@ -3260,94 +209,51 @@ async def process_player_turn(player_number: int):
         # print("HERE 5")
         current_state = dataclass_to_dict(state)
         # print("HERE 6")
-        yield f"event: state_update\ndata: {json.dumps(current_state)}\n\n"
+        yield encode_sse_event(TurnEvent(STATE_UPDATE, current_state))
         # Add a small delay to ensure the frontend can process the state update
         await asyncio.sleep(0.1)
     
+    # Prepare game state for the specified player, after the draw so it is built once
+    game_state, card_mapping = prepare_game_state_for_player(state, player_number)
+    
     # Run the player's turn
     # yield "data: Starting turn processing...\n\n"
     
-    # Create a synchronization event to signal when processing is complete
-    processing_complete = threading.Event()
     result_container = {"result": None}
     # print("HERE 7")
-    # Start a background thread to run the turn
-    def run_turn():
+    # Events of this turn only go to this response, other turns have their own bus
+    bus = TurnEventBus()
+    
+    # Run the turn as a task on this event loop, the graph nodes stream with astream
+    async def run_turn():
         # print("HERE 8", game_state)
+        # The task runs in a copy of the current context, so the binding stays local to it
+        current_event_bus.set(bus)
         try:
-            # Use a context manager to capture stdout
-            with capture_stdout() as stdout:
-                # Run the turn and get the results - this will fill the stream_queue
-                result_container["result"] = run_pokemon_tcg_turn(game_state, card_mapping)
-            # Signal completion
-            stream_queue.put(None)
+            result_container["result"] = await run_pokemon_tcg_turn_async(game_state, card_mapping, card_map_hash=state.cardMapHash)
         except Exception as e:
-            print(f"Error in background thread: {e}")
-            stream_queue.put(f"ERROR: {str(e)}")
-            stream_queue.put(None)
+            print(f"Error in turn task: {e}")
+            await bus.publish(TurnEvent(ERROR, str(e)))
         finally:
-            # Set the event to signal that processing is complete
-            processing_complete.set()
-    
-    # Start the background thread
-    thread = threading.Thread(target=run_turn)
-    thread.daemon = True  # Make thread a daemon so it doesn't block program exit
-    thread.start()
+            # Signal completion
+            await bus.close()
     
-    # Stream real-time updates from the queue
-    while True:
-        try:
-            # Try to get a message from the queue with timeout
-            message = await asyncio.to_thread(stream_queue.get, timeout=0.1)
-            
-            # None signals the end of the stream
-            if message is None:
-                break
-                
-            # Send the message as SSE
-            if isinstance(message, str):
-                # Track if we're inside brackets and build filtered message
-                inside_brackets = False
-                filtered_message = []
-                current_chunk = []
-                
-                for i, char in enumerate(message):
-                    if char == '(':
-                        # If we see an opening bracket, mark as inside brackets
-                        # and don't include the opening bracket
-                        inside_brackets = True
-                        if current_chunk:
-                            filtered_message.extend(current_chunk)
-                            current_chunk = []
-                    elif char == ')':
-                        # If we see a closing bracket, mark as outside brackets
-                        # and don't include the closing bracket or the following space
-                        inside_brackets = False
-                        current_chunk = []
-                        # Skip the next character if it's a space
-                        if i + 1 < len(message) and message[i + 1] == ' ':
-                            continue
-                    elif not inside_brackets:
-                        # Only add characters when we're not inside brackets
-                        current_chunk.append(char)
-                
-                # Add any remaining non-bracketed content
-                if current_chunk:
-                    filtered_message.extend(current_chunk)
-                
-                # Only yield if we have content to stream
-                if filtered_message:
-                    yield f"data: {''.join(filtered_message)}\n\n"
-        except queue.Empty:
-            # No messages in queue, continue waiting
-            await asyncio.sleep(0.01)
-        except Exception as e:
-            # Handle any other exceptions
-            print(f"Error streaming: {e}")
-            yield f"data: ERROR: {str(e)}\n\n"
+    turn_task = asyncio.create_task(run_turn())
     
-    # Wait for the processing to complete before continuing
-    await asyncio.to_thread(processing_complete.wait)
+    try:
+        # Stream real-time updates from the bus
+        async for event in bus:
+            message = encode_sse_event(event)
+            if message:
+                yield message
+        
+        # Wait for the processing to complete before continuing
+        await turn_task
+    finally:
+        # The client went away mid-turn, stop the agents instead of filling the bus
+        if not turn_task.done():
+            bus.abandon()
+            turn_task.cancel()
     
     # Get the result from the container
     result = result_container["result"]
@@ -3362,8 +268,16 @@ async def process_player_turn(player_number: int):
     if result["is_legal"]:
         # yield f"data: Legal action: {result['action']}\n\n"
         
-        # Update the global state with the changes
-        update_global_state(result, player_number)
+        # Update the game's board state with the changes
+        if result.get("state_patch") is not None:
+            # Diff mode: check the Referee's changes against the board before applying them
+            try:
+                apply_patch(state, parse_patch(result["state_patch"]), player_number)
+            except PatchError as e:
+                print(f"Rejected referee patch: {e}")
+                yield f"data: ERROR: Could not apply the Referee's changes: {e}\n\n"
+        else:
+            update_board_state(state, result, player_number)
         # yield "data: Game state updated.\n\n"
     else:
         # yield f"data: Illegal action: {result['explanation']}\n\n"
@@ -3377,77 +291,127 @@ async def process_player_turn(player_number: int):
         # Add a small delay between messages
         await asyncio.sleep(0.05)
     
+    outcome["completed"] = True
     yield "data: \nTurn completed.\n\n"
     
     # Send close event to signal the end of the stream
     yield "event: close\ndata: stream_complete\n\n"
 
-@router.get("/state")
-async def get_state(preset: bool = Query(False, description="Whether to use the preset state")):
-    global state
-    
-    # Initialize state if it hasn't been initialized yet
-    if state is None:
-        state = get_initial_state(GARDEVOIR_DECK, PIKACHU_DECK, isPreset=preset)
+TURN_STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "Access-Control-Allow-Origin": "*",
+    "X-Accel-Buffering": "no"  # Disable nginx buffering
+}
+
+def get_session(game_id: str, create_default: bool = True, preset: bool = False) -> GameSession:
+    """
+    Look up a game by id.
     
-    return dataclass_to_dict(state)
+    The default game is created on first use so clients that do not pass a
+    game id keep working; any other unknown id is a 404.
+    """
+    session = sessions.get(game_id)
+    if session is None:
+        if not (create_default and game_id == DEFAULT_GAME_ID):
+            raise HTTPException(status_code=404, detail=f"Unknown game id: {game_id}")
+        session = sessions.create(get_initial_state(get_deck(PLAYER_ONE_DECK), get_deck(PLAYER_TWO_DECK), isPreset=preset), game_id=game_id)
+    return session
+
+@router.post("/games")
+async def create_game(preset: bool = Query(False, description="Whether to use the preset state")):
+    """Start a new game and return its id along with the initial state."""
+    session = sessions.create(get_initial_state(get_deck(PLAYER_ONE_DECK), get_deck(PLAYER_TWO_DECK), isPreset=preset))
+    return {"game_id": session.game_id, "state": dataclass_to_dict(session.state)}
+
+@router.get("/games/{game_id}")
+async def get_game(game_id: str):
+    session = get_session(game_id, create_default=False)
+    return {"game_id": session.game_id, "state": dataclass_to_dict(session.state)}
+
+@router.get("/games/{game_id}/view")
+async def get_game_view(
+    game_id: str,
+    perspective: str = Query(SPECTATOR, description="spectator, 1 or 2")
+):
+    """Return the board as seen from a seat or by a spectator, hidden zones show only their card count."""
+    session = get_session(game_id, create_default=False)
+    if perspective == SPECTATOR:
+        view = project_board(session.state, SPECTATOR)
+    elif perspective in ("1", "2"):
+        view = project_board(session.state, int(perspective))
+        # The opponent's full side is for the Referee only
+        view = {"YOUR_HAND": view["YOUR_HAND"], "OPPONENT_HAND": view["OPPONENT_HAND"]}
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown perspective: {perspective}")
+    return {"game_id": session.game_id, "perspective": perspective, "view": view}
+
+@router.post("/games/{game_id}/undo")
+async def undo_turn(game_id: str):
+    """Roll the game back to the board before the last turn (or the last completed turn, after a failed one)."""
+    session = get_session(game_id, create_default=False)
+    async with session.lock:
+        state = session.history.undo(session.state)
+        if state is None:
+            raise HTTPException(status_code=409, detail="Nothing to undo")
+        session.state = state
+    return {"game_id": session.game_id, "state": dataclass_to_dict(session.state)}
+
+@router.get("/games/{game_id}/history")
+async def get_history(game_id: str):
+    session = get_session(game_id, create_default=False)
+    return {"game_id": session.game_id, "snapshots": session.history.summary()}
+
+@router.delete("/games/{game_id}")
+async def delete_game(game_id: str):
+    if not sessions.delete(game_id):
+        raise HTTPException(status_code=404, detail=f"Unknown game id: {game_id}")
+    return {"game_id": game_id, "deleted": True}
+
+@router.get("/state")
+async def get_state(
+    preset: bool = Query(False, description="Whether to use the preset state"),
+    game_id: str = Query(DEFAULT_GAME_ID, description="Game to read")
+):
+    # Initialize the default game if it hasn't been initialized yet
+    session = get_session(game_id, preset=preset)
+    
+    return dataclass_to_dict(session.state)
 
 @router.get("/player1/turn")
-async def player1_turn():
+async def player1_turn(game_id: str = Query(DEFAULT_GAME_ID, description="Game to play")):
     """
     Endpoint for player1 to take their turn.
     Returns a streaming response with updates.
     """
-    global state
-    
-    # Initialize state if it hasn't been initialized yet
-    if state is None:
-        state = get_initial_state(GARDEVOIR_DECK, PIKACHU_DECK)
+    session = get_session(game_id)
     
     return StreamingResponse(
-        process_player_turn(1), 
+        process_player_turn(session, 1), 
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-            "X-Accel-Buffering": "no"  # Disable nginx buffering
-        }
+        headers=TURN_STREAM_HEADERS
     )
 
 @router.get("/player2/turn")
-async def player2_turn():
+async def player2_turn(game_id: str = Query(DEFAULT_GAME_ID, description="Game to play")):
     """
     Endpoint for player2 to take their turn.
     Returns a streaming response with updates.
     """
-    global state
-    
-    # Initialize state if it hasn't been initialized yet
-    if state is None:
-        state = get_initial_state(GARDEVOIR_DECK, PIKACHU_DECK)
+    session = get_session(game_id)
     
     return StreamingResponse(
-        process_player_turn(2), 
+        process_player_turn(session, 2), 
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-            "X-Accel-Buffering": "no"  # Disable nginx buffering
-        }
+        headers=TURN_STREAM_HEADERS
     )
 
 @router.get("/refresh_state")
-async def refresh_state():
+async def refresh_state(game_id: str = Query(DEFAULT_GAME_ID, description="Game to read")):
     """
     Endpoint to refresh the game state.
     This can be called by the frontend after a card is drawn or when state changes.
     """
-    global state
-    
-    # Initialize state if it hasn't been initialized yet
-    if state is None:
-        state = get_initial_state(GARDEVOIR_DECK, PIKACHU_DECK)
+    session = get_session(game_id)
     
-    return dataclass_to_dict(state)
\ No newline at end of file
+    return dataclass_to_dict(session.state)
@@ -0,0 +1,137 @@
+from typing import Dict, List, Any, Optional
+from dataclasses import dataclass, field
+
+from pktcgai.state import PlayerState, PokemonInPlay, find_in_play
+from pktcgai.card_map import lookup_card
+from pktcgai.actions import Action, ActionKind
+
+MAX_BENCH_SIZE = 5
+
+ENERGY_TYPES = ["Grass", "Fire", "Water", "Lightning", "Psychic", "Fighting", "Darkness", "Metal", "Fairy", "Dragon"]
+
+
+@dataclass
+class TurnRecord:
+    """What the current player has already done this turn."""
+    energyAttached: bool = False
+    supporterPlayed: bool = False
+    retreated: bool = False
+    # Pokémon put into play this turn cannot evolve until the next one
+    enteredPlay: List[int] = field(default_factory=list)
+
+
+def provided_energy(pokemon: PokemonInPlay, card_map: Dict[Any, dict]) -> Optional[List[str]]:
+    """
+    Energy types provided by the cards attached to a Pokémon.
+
+    Returns None when a Special Energy is attached, since what it provides
+    depends on its text and cannot be counted with certainty.
+    """
+    energy = []
+    for attached in pokemon.attachedCards or []:
+        card = lookup_card(card_map, attached.id) or {}
+        if card.get("supertype") != "Energy":
+            continue
+        if "Basic" not in card.get("subtypes", []):
+            return None
+        energy_type = next((name for name in ENERGY_TYPES if name in card.get("name", "")), None)
+        if energy_type is None:
+            return None
+        energy.append(energy_type)
+    return energy
+
+
+def energy_cost_is_met(cost: List[str], energy: List[str]) -> bool:
+    """Check that the provided energy covers a cost, typed energy first, then Colorless."""
+    remaining = list(energy)
+    for energy_type in cost:
+        if energy_type == "Colorless":
+            continue
+        if energy_type not in remaining:
+            return False
+        remaining.remove(energy_type)
+    return len(remaining) >= cost.count("Colorless")
+
+
+def find_rule_violation(player: PlayerState, action: Action, card_map: Dict[Any, dict], turn: Optional[TurnRecord] = None) -> Optional[str]:
+    """
+    Check the rules that can be decided locally with certainty.
+
+    Covers cards actually being in hand, one energy attachment, one Supporter and
+    one retreat per turn, the bench limit, evolution chains, and attack and retreat
+    energy costs. Anything depending on card text is left to the Referee, so a None
+    result means "not obviously illegal", not "legal".
+
+    Args:
+        player: State of the player making the move
+        action: The move to check
+        card_map: Mapping of card IDs to card details
+        turn: What the player already did this turn, a fresh turn if omitted
+
+    Returns:
+        A one sentence explanation of the violated rule, or None
+    """
+    turn = turn or TurnRecord()
+    hand_ids = {card.id for card in player.hand or []}
+    card = lookup_card(card_map, action.card_id) if action.card_id is not None else None
+
+    if action.kind in (ActionKind.ATTACH, ActionKind.EVOLVE, ActionKind.BENCH, ActionKind.PLAY_TRAINER):
+        if action.card_id not in hand_ids or card is None:
+            return f"Card ( id: {action.card_id} ) is not in your hand."
+
+    if action.kind == ActionKind.ATTACH:
+        if find_in_play(player, action.target_id) is None:
+            return f"( id: {action.target_id} ) is not one of your Pokémon in play."
+        if card.get("supertype") == "Energy" and turn.energyAttached:
+            return "You can only attach one Energy card from your hand per turn."
+        if card.get("supertype") == "Pokémon":
+            return f"{card.get('name')} ( id: {action.card_id} ) is a Pokémon and cannot be attached."
+
+    elif action.kind == ActionKind.BENCH:
+        if card.get("supertype") != "Pokémon" or "Basic" not in card.get("subtypes", []):
+            return f"{card.get('name')} ( id: {action.card_id} ) is not a Basic Pokémon, so it cannot be put on the Bench."
+        if len(player.bench or []) >= MAX_BENCH_SIZE:
+            return f"Your Bench already has {MAX_BENCH_SIZE} Pokémon."
+
+    elif action.kind == ActionKind.EVOLVE:
+        target = find_in_play(player, action.target_id)
+        if target is None:
+            return f"( id: {action.target_id} ) is not one of your Pokémon in play."
+        target_card = lookup_card(card_map, target.id) or {}
+        if card.get("supertype") != "Pokémon" or card.get("evolvesFrom") != target_card.get("name"):
+            return f"{card.get('name')} ( id: {action.card_id} ) does not evolve from {target_card.get('name')} ( id: {target.id} )."
+        if target.id in turn.enteredPlay:
+            return f"{target_card.get('name')} ( id: {target.id} ) was put into play this turn and cannot evolve yet."
+
+    elif action.kind == ActionKind.PLAY_TRAINER:
+        if card.get("supertype") != "Trainer":
+            return f"{card.get('name')} ( id: {action.card_id} ) is not a Trainer card."
+        if "Supporter" in card.get("subtypes", []) and turn.supporterPlayed:
+            return "You can only play one Supporter card per turn."
+
+    elif action.kind == ActionKind.RETREAT:
+        if player.active is None:
+            return "You have no Active Pokémon to retreat."
+        if not player.bench:
+            return "You have no Benched Pokémon to switch in."
+        if turn.retreated:
+            return "You can only retreat once per turn."
+        if action.target_id is not None and find_in_play(player, action.target_id) in (None, player.active):
+            return f"( id: {action.target_id} ) is not on your Bench."
+        retreat_cost = (lookup_card(card_map, player.active.id) or {}).get("retreatCost", [])
+        energy = provided_energy(player.active, card_map)
+        if energy is not None and len(energy) < len(retreat_cost):
+            return f"Retreating costs {len(retreat_cost)} Energy but only {len(energy)} is attached."
+
+    elif action.kind == ActionKind.ATTACK:
+        if player.active is None:
+            return "You have no Active Pokémon to attack with."
+        active_card = lookup_card(card_map, player.active.id) or {}
+        attack = next((attack for attack in active_card.get("attacks", []) if attack["name"] == action.attack_name), None)
+        if attack is None:
+            return f"{active_card.get('name')} does not have the attack {action.attack_name}."
+        energy = provided_energy(player.active, card_map)
+        if energy is not None and not energy_cost_is_met(attack.get("cost", []), energy):
+            return f"{action.attack_name} costs {', '.join(attack.get('cost', []))} but the attached Energy does not cover it."
+
+    return None
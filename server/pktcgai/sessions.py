@@ -0,0 +1,84 @@
+from typing import Optional
+from dataclasses import dataclass, field
+from collections import OrderedDict
+import asyncio
+import time
+import uuid
+
+from pktcgai.state import BoardState
+from pktcgai.history import GameHistory
+
+# Game used by clients that do not pass a game id
+DEFAULT_GAME_ID = "default"
+
+DEFAULT_MAX_SESSIONS = 1000
+DEFAULT_IDLE_TIMEOUT_SECONDS = 60 * 60
+
+
+@dataclass
+class GameSession:
+    game_id: str
+    state: BoardState
+    # Serializes turns on this game while other games run in parallel
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    last_used: float = field(default_factory=time.monotonic)
+    # Snapshot of the board after every turn, for undo and replays
+    history: GameHistory = field(default_factory=GameHistory)
+
+    def touch(self) -> None:
+        self.last_used = time.monotonic()
+
+
+class GameSessionManager:
+    """
+    Holds the live games of the process, keyed by game id.
+
+    Sessions are kept in least-recently-used order. Sessions idle for longer than
+    idle_timeout, and the oldest ones beyond max_sessions, are evicted lazily on
+    access. A session with a turn in progress (lock held) is never evicted.
+    """
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions: "OrderedDict[str, GameSession]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, state: BoardState, game_id: Optional[str] = None) -> GameSession:
+        """Register a new game, replacing any existing game with the same id."""
+        game_id = game_id or uuid.uuid4().hex
+        session = GameSession(game_id=game_id, state=state)
+        session.history.record(state, "start")
+        self._sessions[game_id] = session
+        self._sessions.move_to_end(game_id)
+        self.evict()
+        return session
+
+    def get(self, game_id: str) -> Optional[GameSession]:
+        """Return the game with this id and mark it as recently used, None if unknown."""
+        self.evict()
+        session = self._sessions.get(game_id)
+        if session is not None:
+            session.touch()
+            self._sessions.move_to_end(game_id)
+        return session
+
+    def delete(self, game_id: str) -> bool:
+        return self._sessions.pop(game_id, None) is not None
+
+    def evict(self) -> None:
+        """Drop idle sessions, then the least recently used ones over max_sessions."""
+        now = time.monotonic()
+        for game_id, session in list(self._sessions.items()):
+            if now - session.last_used > self.idle_timeout and not session.lock.locked():
+                del self._sessions[game_id]
+
+        overflow = len(self._sessions) - self.max_sessions
+        for game_id, session in list(self._sessions.items()):
+            if overflow <= 0:
+                break
+            if not session.lock.locked():
+                del self._sessions[game_id]
+                overflow -= 1
@@ -1,5 +1,9 @@
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Union, get_type_hints, get_origin, get_args
+from dataclasses import dataclass, fields, is_dataclass, replace, MISSING
+from collections.abc import Mapping
+from collections import deque
+import random
+from pktcgai.card_map import hash_card_map, GameCardMap
 
 # Global card mapping dictionary
 CARD_MAP: Dict[int, dict] = {}
@@ -8,6 +12,40 @@ CARD_MAP: Dict[int, dict] = {}
 class Card:
     id: int
 
+class Deck(deque):
+    """
+    A player's deck, top card first.
+
+    Drawing from the top and putting a card on the top or bottom are O(1).
+    pop(index) is kept for code written against the list version.
+    """
+
+    def draw(self) -> Optional[Card]:
+        """Remove and return the top card, None if the deck is empty."""
+        return self.popleft() if self else None
+
+    def put_top(self, card: Card) -> None:
+        self.appendleft(card)
+
+    def put_bottom(self, card: Card) -> None:
+        self.append(card)
+
+    def shuffle(self, rng: random.Random) -> None:
+        """Shuffle in place with the game's random number generator (BoardState.rng)."""
+        cards = list(self)
+        rng.shuffle(cards)
+        self.clear()
+        self.extend(cards)
+
+    def pop(self, index: int = -1) -> Card:
+        if index == 0:
+            return self.popleft()
+        if index == -1:
+            return super().pop()
+        card = self[index]
+        del self[index]
+        return card
+
 @dataclass
 class PokemonInPlay:
     id: int
@@ -20,16 +58,61 @@ class PlayerState:
     bench: Optional[List[PokemonInPlay]] = None
     discard: Optional[List[Card]] = None
     lostZone: Optional[List[Card]] = None
-    deck: Optional[List[Card]] = None
+    deck: Optional[Deck] = None
     hand: Optional[List[Card]] = None
     stadium: Optional[Card] = None
     prizeCards: Optional[List[Card]] = None
 
+# Zones of a PlayerState holding a list of cards (the deck is a Deck, with the same list-style access)
+CARD_ZONES = ("hand", "deck", "discard", "lostZone", "prizeCards")
+
+def find_in_play(player: PlayerState, card_id: Optional[int]) -> Optional[PokemonInPlay]:
+    """The player's Active or Benched Pokémon with this id, None if it is not in play."""
+    if player.active and player.active.id == card_id:
+        return player.active
+    return next((pokemon for pokemon in player.bench or [] if pokemon.id == card_id), None)
+
+def _copy_pokemon(pokemon: Optional[PokemonInPlay]) -> Optional[PokemonInPlay]:
+    if pokemon is None:
+        return None
+    return replace(pokemon, attachedCards=list(pokemon.attachedCards or []))
+
+def copy_player(player: PlayerState) -> PlayerState:
+    """Copy a player's zones so they can be changed without touching the original."""
+    return PlayerState(
+        active=_copy_pokemon(player.active),
+        bench=[_copy_pokemon(pokemon) for pokemon in player.bench or []],
+        discard=list(player.discard or []),
+        lostZone=list(player.lostZone or []),
+        deck=Deck(player.deck or ()),
+        hand=list(player.hand or []),
+        stadium=player.stadium,
+        prizeCards=list(player.prizeCards or [])
+    )
+
 @dataclass
 class BoardState:
     playerOne: PlayerState
     playerTwo: PlayerState
-    cardMap: Dict[int, dict]  # Include the card map in the board state
+    cardMap: Dict[int, dict]  # Include the card map in the board state (a GameCardMap for new games)
+    cardMapHash: str = ""  # Content hash of cardMap, used to cache its serialized form
+    # Incremented by mark_changed() on every change, so views built from the board
+    # (pktcgai.views caches them in _views) know when they are stale
+    version: int = 0
+    # Seed of the game's random number generator: the same seed, decks and actions replay the same game
+    seed: int = 0
+
+    def mark_changed(self) -> None:
+        """Call after modifying the board in place."""
+        self.version += 1
+
+    @property
+    def rng(self) -> random.Random:
+        """The game's random number generator, use it (not the random module) for every shuffle or coin flip."""
+        rng = getattr(self, "_rng", None)
+        if rng is None:
+            rng = self._rng = random.Random(self.seed)
+        return rng
 
 def get_card_map(deck: List[dict]) -> Dict[int, dict]:
     card_map = {}
@@ -37,13 +120,15 @@ def get_card_map(deck: List[dict]) -> Dict[int, dict]:
         card_map[i] = card_info
     return card_map
 
-def get_initial_state(deck_one: List[dict], deck_two: List[dict], isPreset: bool = False) -> BoardState:
-    # Create a mapping of card IDs to card info for both decks
-    card_map_one = get_card_map(deck_one)
-    card_map_two = get_card_map(deck_two)
-    
-    # Combine both card maps
-    card_map = {**card_map_one, **{k + len(deck_one): v for k, v in card_map_two.items()}}
+def get_initial_state(deck_one: List[dict], deck_two: List[dict], isPreset: bool = False, seed: Optional[int] = None) -> BoardState:
+    # Every shuffle of the game comes from one generator seeded here, pass a seed to replay a game
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+    rng = random.Random(seed)
+
+    # Map the card IDs of both decks to the shared card definitions, the second
+    # deck's IDs continue after the first's
+    card_map = GameCardMap.from_decks(deck_one, deck_two)
     
     # Convert decks to Card objects with IDs
     cards_one = [Card(id=i) for i in range(len(deck_one))]
@@ -108,9 +193,8 @@ def get_initial_state(deck_one: List[dict], deck_two: List[dict], isPreset: bool
                 cards_two.remove(card)
         
         # Shuffle remaining cards
-        import random
-        random.shuffle(cards_one)
-        random.shuffle(cards_two)
+        rng.shuffle(cards_one)
+        rng.shuffle(cards_two)
         
         # Set up player one's preset state
         player_state = PlayerState(
@@ -120,7 +204,7 @@ def get_initial_state(deck_one: List[dict], deck_two: List[dict], isPreset: bool
             ) if zacian_v else None,
             hand=[battle_vip_pass] + psychic_energies[:2] + [cresselia, gardevoir_ex, ralts] if all([battle_vip_pass, cresselia, gardevoir_ex, ralts]) else [],
             prizeCards=cards_one[:6] if len(cards_one) >= 6 else [],
-            deck=cards_one[6:],
+            deck=Deck(cards_one[6:]),
             bench=[],
             discard=[],
             lostZone=[],
@@ -135,7 +219,7 @@ def get_initial_state(deck_one: List[dict], deck_two: List[dict], isPreset: bool
             ) if pikachu_ex else None,
             hand=[pikachu_v, charizard_ex, cheren] + lightning_energies[:2] + [fire_energy] if all([pikachu_v, charizard_ex, cheren, fire_energy]) else [],
             prizeCards=cards_two[:6] if len(cards_two) >= 6 else [],
-            deck=cards_two[6:],
+            deck=Deck(cards_two[6:]),
             bench=[],
             discard=[],
             lostZone=[],
@@ -143,9 +227,8 @@ def get_initial_state(deck_one: List[dict], deck_two: List[dict], isPreset: bool
         )
     else:
         # Original random setup logic
-        import random
-        random.shuffle(cards_one)
-        random.shuffle(cards_two)
+        rng.shuffle(cards_one)
+        rng.shuffle(cards_two)
         
         # Find a basic Pokemon for active for player one
         active_card_one = None
@@ -169,7 +252,7 @@ def get_initial_state(deck_one: List[dict], deck_two: List[dict], isPreset: bool
             ) if active_card_one else None,
             hand=cards_one[:6],  # First 6 cards in hand
             prizeCards=cards_one[6:12] if len(cards_one) >= 12 else [],  # Next 6 cards as prize cards
-            deck=cards_one[12:],  # Remaining cards in deck
+            deck=Deck(cards_one[12:]),  # Remaining cards in deck
             bench=[],  # Empty bench
             discard=[],  # Empty discard pile
             lostZone=[],  # Empty lost zone
@@ -198,7 +281,7 @@ def get_initial_state(deck_one: List[dict], deck_two: List[dict], isPreset: bool
             ) if active_card_two else None,
             hand=cards_two[:6],  # First 6 cards in hand
             prizeCards=cards_two[6:12] if len(cards_two) >= 12 else [],  # Next 6 cards as prize cards
-            deck=cards_two[12:],  # Remaining cards in deck
+            deck=Deck(cards_two[12:]),  # Remaining cards in deck
             bench=[],  # Empty bench
             discard=[],  # Empty discard pile
             lostZone=[],  # Empty lost zone
@@ -206,8 +289,141 @@ def get_initial_state(deck_one: List[dict], deck_two: List[dict], isPreset: bool
         )
     
     # Create board state with both player states and include the combined card map
-    return BoardState(
+    state = BoardState(
         playerOne=player_state,
         playerTwo=player_two_state,
-        cardMap=card_map
-    ) 
\ No newline at end of file
+        cardMap=card_map,
+        cardMapHash=hash_card_map(card_map),
+        seed=seed
+    )
+    # Carry on with the generator that dealt the cards
+    state._rng = rng
+    return state
+
+def _to_dict_expression(hint, value: str, depth: int = 0) -> str:
+    """Python expression turning `value` of type `hint` into its JSON-ready form."""
+    origin, args = get_origin(hint), get_args(hint)
+    if origin is Union and type(None) in args:
+        inner = next(arg for arg in args if arg is not type(None))
+        return f"(None if {value} is None else {_to_dict_expression(inner, value, depth)})"
+    if hint is Deck:
+        return _to_dict_expression(List[Card], value, depth)
+    if origin in (list, List):
+        item = f"item{depth}"
+        return f"[{_to_dict_expression(args[0], item, depth + 1)} for {item} in {value}]"
+    if origin in (dict, Dict):
+        # Card definitions are plain JSON already (and shared), only the mapping is copied
+        return f"dict({value})"
+    if is_dataclass(hint):
+        return f"_to_dict_{hint.__name__}({value})"
+    return value
+
+
+def _from_dict_expression(hint, value: str, depth: int = 0) -> str:
+    """Python expression building a value of type `hint` from its dictionary form."""
+    origin, args = get_origin(hint), get_args(hint)
+    if origin is Union and type(None) in args:
+        inner = next(arg for arg in args if arg is not type(None))
+        if get_origin(inner) in (list, List) or inner is Deck:
+            # Missing lists come back empty, like the hand-written converters did
+            return _from_dict_expression(inner, value, depth)
+        return f"({_from_dict_expression(inner, value, depth)} if isinstance({value}, dict) and {value} else None)"
+    if hint is Deck:
+        return f"Deck({_from_dict_expression(List[Card], value, depth)})"
+    if origin in (list, List):
+        item = f"item{depth}"
+        return f"[{_from_dict_expression(args[0], item, depth + 1)} for {item} in {value} or ()]"
+    if is_dataclass(hint):
+        return f"_from_dict_{hint.__name__}({value})"
+    return value
+
+
+# Required fields that may be missing from Referee output, filled as the old converters did
+_FIELD_FALLBACKS = {"hp": 0}
+
+
+def _generate_converters(classes) -> Dict[str, Any]:
+    """
+    Generate and compile a to-dict and a from-dict function per dataclass.
+
+    The functions are straight-line code built from the field type hints, so
+    converting a board does no reflection or type dispatch at run time.
+    """
+    source = []
+    for cls in classes:
+        hints = get_type_hints(cls)
+        name = cls.__name__
+        body = [f"def _to_dict_{name}(obj):"]
+        for field in fields(cls):
+            body.append(f"    {field.name} = obj.{field.name}")
+        items = ", ".join(f"{field.name!r}: {_to_dict_expression(hints[field.name], field.name)}" for field in fields(cls))
+        body.append(f"    return {{{items}}}")
+
+        body.append(f"def _from_dict_{name}(data):")
+        for field in fields(cls):
+            if field.default is not MISSING:
+                body.append(f"    {field.name} = data.get({field.name!r}, {field.default!r})")
+            elif field.name in _FIELD_FALLBACKS:
+                body.append(f"    {field.name} = data.get({field.name!r}, {_FIELD_FALLBACKS[field.name]!r})")
+            else:
+                body.append(f"    {field.name} = data[{field.name!r}]")
+        arguments = ", ".join(f"{field.name}={_from_dict_expression(hints[field.name], field.name)}" for field in fields(cls))
+        body.append(f"    return {name}({arguments})")
+        source.append("\n".join(body))
+
+    namespace = {cls.__name__: cls for cls in classes}
+    namespace["Deck"] = Deck
+    exec(compile("\n\n".join(source), "<state converters>", "exec"), namespace)
+    return namespace
+
+
+_CONVERTERS = _generate_converters([Card, PokemonInPlay, PlayerState, BoardState])
+card_to_dict = _CONVERTERS["_to_dict_Card"]
+pokemon_in_play_to_dict = _CONVERTERS["_to_dict_PokemonInPlay"]
+player_state_to_dict = _CONVERTERS["_to_dict_PlayerState"]
+board_state_to_dict = _CONVERTERS["_to_dict_BoardState"]
+board_state_from_dict = _CONVERTERS["_from_dict_BoardState"]
+# Serializer for each state class, used by dataclass_to_dict
+_TO_DICT = {
+    Card: card_to_dict,
+    PokemonInPlay: pokemon_in_play_to_dict,
+    PlayerState: player_state_to_dict,
+    BoardState: board_state_to_dict,
+}
+
+def dataclass_to_dict(obj):
+    """Convert a dataclass instance to a dictionary recursively."""
+    # The state classes have generated serializers, everything else is walked generically
+    serializer = _TO_DICT.get(type(obj))
+    if serializer is not None:
+        return serializer(obj)
+    if hasattr(obj, "__dataclass_fields__"):
+        # For dataclass instances
+        result = {}
+        for field in obj.__dataclass_fields__:
+            value = getattr(obj, field)
+            result[field] = dataclass_to_dict(value)
+        return result
+    elif isinstance(obj, (list, deque)):
+        # For lists (and decks)
+        return [dataclass_to_dict(item) for item in obj]
+    elif isinstance(obj, Mapping):
+        # For dictionaries (and GameCardMap)
+        return {key: dataclass_to_dict(value) for key, value in obj.items()}
+    else:
+        # For primitive types
+        return obj
+
+def dict_to_player_state(player_dict: Dict) -> PlayerState:
+    """Convert a dictionary to a PlayerState object."""
+    return _CONVERTERS["_from_dict_PlayerState"](player_dict)
+
+def dict_to_pokemon_card(card_dict: Dict):
+    """Convert dictionary representation of a card back to a proper Pokemon card object."""
+    if not isinstance(card_dict, dict) or "id" not in card_dict:
+        return None
+    # For active and bench Pokemon (those with hp or attachedCards)
+    if "hp" in card_dict or "attachedCards" in card_dict:
+        return _CONVERTERS["_from_dict_PokemonInPlay"](card_dict)
+    # For stadium and other simple cards, create a Card object
+    return _CONVERTERS["_from_dict_Card"](card_dict)
@@ -0,0 +1,109 @@
+from typing import Dict, Any, Optional, Union
+
+from pktcgai.state import BoardState, PlayerState, player_state_to_dict, pokemon_in_play_to_dict, card_to_dict
+
+# Perspectives a board can be projected for. Players 1 and 2 see their own side
+# in full and the public part of the other; a spectator sees only the public part
+# of both sides; a replay viewer (after the game) sees everything.
+PLAYER_ONE = 1
+PLAYER_TWO = 2
+SPECTATOR = "spectator"
+REPLAY = "replay"
+PERSPECTIVES = (PLAYER_ONE, PLAYER_TWO, SPECTATOR, REPLAY)
+
+# Zones only their owner may look at; others are shown how many cards they hold
+HIDDEN_ZONES = ("deck", "hand", "prizeCards")
+
+Perspective = Union[int, str]
+
+
+def hidden_zone(cards) -> str:
+    """What other players see of a hidden zone, e.g. "7 cards"."""
+    return f"{len(cards or ())} cards"
+
+
+def public_player_view(player: PlayerState) -> Dict[str, Any]:
+    """
+    The part of a player's side anyone at the table can see.
+
+    Built straight from the PlayerState: hidden zones are only counted, their
+    cards are never serialized.
+    """
+    return {
+        "active": pokemon_in_play_to_dict(player.active) if player.active is not None else None,
+        "bench": [pokemon_in_play_to_dict(pokemon) for pokemon in player.bench or ()],
+        "discard": [card_to_dict(card) for card in player.discard or ()],
+        "lostZone": [card_to_dict(card) for card in player.lostZone or ()],
+        "deck": hidden_zone(player.deck),
+        "hand": hidden_zone(player.hand),
+        "stadium": card_to_dict(player.stadium) if player.stadium is not None else None,
+        "prizeCards": hidden_zone(player.prizeCards)
+    }
+
+
+class _BoardProjections:
+    """Views of one board version, each player's side serialized at most once per form."""
+
+    def __init__(self, state: BoardState):
+        self.state = state
+        self.version = state.version
+        self.views: Dict[Perspective, Dict[str, Any]] = {}
+        self._full: Dict[int, Dict[str, Any]] = {}
+        self._public: Dict[int, Dict[str, Any]] = {}
+
+    def _player(self, number: int) -> PlayerState:
+        return self.state.playerOne if number == PLAYER_ONE else self.state.playerTwo
+
+    def full(self, number: int) -> Dict[str, Any]:
+        if number not in self._full:
+            self._full[number] = player_state_to_dict(self._player(number))
+        return self._full[number]
+
+    def public(self, number: int) -> Dict[str, Any]:
+        if number not in self._public:
+            self._public[number] = public_player_view(self._player(number))
+        return self._public[number]
+
+    def build(self, perspective: Perspective) -> Dict[str, Any]:
+        if perspective in (PLAYER_ONE, PLAYER_TWO):
+            opponent = PLAYER_TWO if perspective == PLAYER_ONE else PLAYER_ONE
+            return {
+                "YOUR_HAND": self.full(perspective),
+                "OPPONENT_HAND": self.public(opponent),
+                # The opponent's full side, for the Referee and for saving the turn; never shown to the Player
+                "REAL_OPPONENT_HAND": self.full(opponent)
+            }
+        if perspective == SPECTATOR:
+            return {"PLAYER_ONE": self.public(PLAYER_ONE), "PLAYER_TWO": self.public(PLAYER_TWO)}
+        if perspective == REPLAY:
+            return {"PLAYER_ONE": self.full(PLAYER_ONE), "PLAYER_TWO": self.full(PLAYER_TWO)}
+        raise ValueError(f"Unknown perspective {perspective!r}, expected one of {PERSPECTIVES}.")
+
+
+def project_board(state: BoardState, perspective: Perspective) -> Dict[str, Any]:
+    """
+    Project the board for a perspective.
+
+    Views are cached on the board under its version (in _views), so they are
+    returned again, and must not be modified, until the board changes. Perspectives
+    of the same version share the serialized sides.
+
+    Args:
+        state: The game's board
+        perspective: PLAYER_ONE, PLAYER_TWO, SPECTATOR or REPLAY
+
+    Returns:
+        For a player, {"YOUR_HAND", "OPPONENT_HAND", "REAL_OPPONENT_HAND"}; for a
+        spectator or a replay, {"PLAYER_ONE", "PLAYER_TWO"}
+
+    Raises:
+        ValueError: if the perspective is unknown
+    """
+    projections: Optional[_BoardProjections] = getattr(state, "_views", None)
+    if projections is None or projections.version != state.version:
+        projections = _BoardProjections(state)
+        state._views = projections
+    view = projections.views.get(perspective)
+    if view is None:
+        view = projections.views[perspective] = projections.build(perspective)
+    return view
@@ -0,0 +1,94 @@
+from typing import Dict, Tuple, Optional
+import hashlib
+
+from pktcgai.state import BoardState, PlayerState, CARD_ZONES
+
+# Zobrist hashing: every (player, zone, card) placement has a fixed random 64-bit
+# key and a board's hash is the XOR of the keys of everything on it, so moving a
+# card updates the hash with two XORs. Keys are derived from blake2b rather than
+# a seeded RNG so the hash of a board is the same in every process and run.
+#
+# Zone contents count as sets: the order of the deck or the hand is not part of
+# the hash. The Active Spot and the Bench are separate zones, attached cards are
+# keyed by the Pokémon they are attached to ("attached:<pokemon id>") and every
+# Pokémon in play also contributes its current hp.
+
+_KEYS: Dict[Tuple, int] = {}
+
+
+def zobrist_key(player_number: int, zone: str, card_id: int, hp: Optional[int] = None) -> int:
+    """The 64-bit key of a card in a zone (or, with hp, of a Pokémon in play having that hp)."""
+    key = (player_number, zone, card_id, hp)
+    value = _KEYS.get(key)
+    if value is None:
+        digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=8, person=b"pktcgai-zobrist")
+        value = _KEYS[key] = int.from_bytes(digest.digest(), "little")
+    return value
+
+
+def _pokemon_hash(player_number: int, zone: str, pokemon) -> int:
+    value = zobrist_key(player_number, zone, pokemon.id) ^ zobrist_key(player_number, "hp", pokemon.id, pokemon.hp)
+    attached_zone = f"attached:{pokemon.id}"
+    for card in pokemon.attachedCards or ():
+        value ^= zobrist_key(player_number, attached_zone, card.id)
+    return value
+
+
+def player_hash(player: PlayerState, player_number: int) -> int:
+    """XOR of the keys of everything on one player's side."""
+    value = 0
+    for zone in CARD_ZONES:
+        for card in getattr(player, zone) or ():
+            value ^= zobrist_key(player_number, zone, card.id)
+    if player.active is not None:
+        value ^= _pokemon_hash(player_number, "active", player.active)
+    for pokemon in player.bench or ():
+        value ^= _pokemon_hash(player_number, "bench", pokemon)
+    if player.stadium is not None:
+        value ^= zobrist_key(player_number, "stadium", player.stadium.id)
+    return value
+
+
+def compute_board_hash(state: BoardState) -> int:
+    """Hash a board from scratch, O(cards on the board)."""
+    return player_hash(state.playerOne, 1) ^ player_hash(state.playerTwo, 2)
+
+
+def board_hash(state: BoardState) -> int:
+    """
+    The board's 64-bit Zobrist hash.
+
+    The hash is cached on the board under its version (in _zobrist), so it is only
+    recomputed after a change that did not update it with set_board_hash. Two
+    boards with different hashes are different; equal hashes mean equal boards up
+    to zone order, barring a 1 in 2^64 collision.
+    """
+    value = cached_board_hash(state)
+    if value is not None:
+        return value
+    value = compute_board_hash(state)
+    state._zobrist = (state.version, value)
+    return value
+
+
+def cached_board_hash(state: BoardState) -> Optional[int]:
+    """The board's hash if it is known for its current version, None rather than recomputing it."""
+    cached = getattr(state, "_zobrist", None)
+    if cached is not None and cached[0] == state.version:
+        return cached[1]
+    return None
+
+
+def set_board_hash(state: BoardState, value: int) -> None:
+    """Record an incrementally updated hash for the board's current version."""
+    state._zobrist = (state.version, value)
+
+
+def move_card(value: int, player_number: int, card_id: int, from_zone: str, to_zone: str) -> int:
+    """Update a hash for a card moving between two list zones of the same player (e.g. a draw)."""
+    return value ^ zobrist_key(player_number, from_zone, card_id) ^ zobrist_key(player_number, to_zone, card_id)
+
+
+def change_hp(value: int, player_number: int, card_id: int, old_hp: int, new_hp: int) -> int:
+    """Update a hash for a Pokémon in play whose hp changed."""
+    return value ^ zobrist_key(player_number, "hp", card_id, old_hp) ^ zobrist_key(player_number, "hp", card_id, new_hp)
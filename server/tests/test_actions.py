@@ -0,0 +1,74 @@
+import pytest
+
+from pktcgai.actions import parse_action, ActionKind
+from pktcgai.state import PlayerState, PokemonInPlay, Card
+
+CARD_MAP = {
+    1: {"name": "Ralts", "supertype": "Pokémon", "attacks": [{"name": "Teleportation Burst"}]},
+    2: {"name": "Kirlia", "supertype": "Pokémon"},
+    3: {"name": "Battle VIP Pass", "supertype": "Trainer"},
+    4: {"name": "Basic Psychic Energy", "supertype": "Energy"},
+    5: {"name": "Rare Candy", "supertype": "Trainer"},
+    8: {"name": "Gardevoir ex", "supertype": "Pokémon", "evolvesFrom": "Kirlia"},
+    48: {"name": "Basic Psychic Energy", "supertype": "Energy"},
+}
+
+
+@pytest.fixture
+def player():
+    return PlayerState(
+        active=PokemonInPlay(id=1, hp=70, attachedCards=[]),
+        bench=[],
+        hand=[Card(id=2), Card(id=3), Card(id=4), Card(id=5)],
+    )
+
+
+@pytest.mark.parametrize("decision", [
+    "FINAL DECISION: Pass the turn.",
+    "FINAL DECISION: I pass.",
+    "FINAL DECISION: I'll end my turn",
+    "FINAL DECISION: **End turn**",
+])
+def test_pass_decisions(player, decision):
+    assert parse_action(decision, player, CARD_MAP).kind == ActionKind.PASS
+
+
+@pytest.mark.parametrize("decision", [
+    "FINAL DECISION: Play Battle VIP Pass",
+    "FINAL DECISION: Use the passive ability to bypass the effect",
+    "FINAL DECISION: Pass on attaching, play Kirlia instead",
+    "FINAL DECISION: I will bench Kirlia and then pass",
+])
+def test_other_decisions_mentioning_pass_are_not_passes(player, decision):
+    action = parse_action(decision, player, CARD_MAP)
+    assert action is None or action.kind != ActionKind.PASS
+
+
+@pytest.mark.parametrize("decision", [
+    "FINAL DECISION: Play ( id: 2 ) to the bench as a counter-attacker",
+    "FINAL DECISION: Play ( id: 2 ) so my attacker is ready",
+])
+def test_attack_is_matched_as_a_whole_word(player, decision):
+    assert parse_action(decision, player, CARD_MAP).kind == ActionKind.BENCH
+
+
+def test_attack_by_name(player):
+    action = parse_action("FINAL DECISION: Attack with Teleportation Burst", player, CARD_MAP)
+    assert action.kind == ActionKind.ATTACK
+    assert action.attack_name == "Teleportation Burst"
+
+
+def test_attach_to_active(player):
+    action = parse_action("FINAL DECISION: Attach ( id: 4 ) to my active Pokémon", player, CARD_MAP)
+    assert (action.kind, action.card_id, action.target_id) == (ActionKind.ATTACH, 4, 1)
+
+
+@pytest.mark.parametrize("decision", [
+    "FINAL DECISION: Use Gardevoir ex's Psychic Embrace ability to attach Basic Psychic Energy ( id: 48 ) from my discard pile to Ralts ( id: 1 )",
+    "FINAL DECISION: Attach Basic Psychic Energy ( id: 48 ) from my discard pile to Ralts ( id: 1 )",
+    "FINAL DECISION: Play Rare Candy to evolve Ralts ( id: 1 ) directly into Gardevoir ex ( id: 8 )",
+    "FINAL DECISION: Play Rare Candy ( id: 5 ) to evolve Ralts ( id: 1 ) into Gardevoir ex",
+    "FINAL DECISION: Evolve Ralts ( id: 1 ) into Gardevoir ex ( id: 8 )",
+])
+def test_moves_with_cards_not_in_hand_are_left_to_the_referee(player, decision):
+    assert parse_action(decision, player, CARD_MAP) is None
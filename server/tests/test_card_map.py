@@ -0,0 +1,26 @@
+from pktcgai.card_map import CardDatabase, GameCardMap
+from pktcgai.graph.pokemon_tcg_graph import transform_game_state
+
+RALTS = {"name": "Ralts", "supertype": "Pokémon", "hp": "70"}
+PIKACHU = {"name": "Pikachu", "supertype": "Pokémon", "hp": "60"}
+
+
+def test_card_map_reads_interned_definitions():
+    database = CardDatabase()
+    card_map = GameCardMap.from_decks([RALTS, RALTS], [PIKACHU], database=database)
+    assert len(database) == 2
+    assert card_map[0] is card_map[1]
+    assert card_map[2]["name"] == "Pikachu"
+    assert card_map.handle(0) == card_map.handle(1) != card_map.handle(2)
+
+
+def test_card_views_are_kept_per_database():
+    # Both databases give their first card handle 0
+    ralts_map = GameCardMap.from_decks([RALTS], database=CardDatabase())
+    pikachu_map = GameCardMap.from_decks([PIKACHU], database=CardDatabase())
+    game_state = {"YOUR_HAND": {"hand": [{"id": 0}]}}
+
+    ralts = transform_game_state(game_state, ralts_map)["YOUR_HAND"]["hand"][0]
+    pikachu = transform_game_state(game_state, pikachu_map)["YOUR_HAND"]["hand"][0]
+    assert (ralts["name"], pikachu["name"]) == ("Ralts", "Pikachu")
+    assert "hp" not in ralts
@@ -0,0 +1,65 @@
+import asyncio
+
+from pktcgai.events import TurnEvent, TurnEventBus, TOKEN
+
+
+async def _collect(bus: TurnEventBus):
+    return [event.data async for event in bus]
+
+
+def test_events_published_before_close_are_delivered():
+    async def run():
+        bus = TurnEventBus(max_pending=2)
+        for index in range(5):
+            # Sync producer on the loop thread, the bus fills after two events
+            bus.publish_threadsafe(TurnEvent(TOKEN, index))
+        await bus.close()
+        return await asyncio.wait_for(_collect(bus), timeout=1)
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+
+
+def test_close_on_a_full_bus_does_not_wait():
+    async def run():
+        bus = TurnEventBus(max_pending=2)
+        await bus.publish(TurnEvent(TOKEN, 0))
+        await bus.publish(TurnEvent(TOKEN, 1))
+        await asyncio.wait_for(bus.close(), timeout=1)
+        return await asyncio.wait_for(_collect(bus), timeout=1)
+
+    assert asyncio.run(run()) == [0, 1]
+
+
+def test_cancelled_producer_blocked_on_a_full_bus_finishes():
+    async def run():
+        bus = TurnEventBus(max_pending=2)
+
+        async def produce():
+            try:
+                for index in range(10):
+                    await bus.publish(TurnEvent(TOKEN, index))
+            finally:
+                await bus.close()
+
+        task = asyncio.create_task(produce())
+        await asyncio.sleep(0.01)
+        assert not task.done()  # Waiting for room, nobody reads the bus
+        task.cancel()
+        await asyncio.wait([task], timeout=1)
+        return task.done()
+
+    assert asyncio.run(run())
+
+
+def test_abandoned_bus_drops_events_and_pending_puts():
+    async def run():
+        bus = TurnEventBus(max_pending=2)
+        for index in range(5):
+            bus.publish_threadsafe(TurnEvent(TOKEN, index))
+        await asyncio.sleep(0)
+        bus.abandon()
+        await asyncio.wait_for(bus.publish(TurnEvent(TOKEN, 5)), timeout=1)
+        await asyncio.sleep(0)
+        return bus._pending_puts
+
+    assert not asyncio.run(run())
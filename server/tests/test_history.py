@@ -0,0 +1,96 @@
+from pktcgai.history import GameHistory
+from pktcgai.state import BoardState, PlayerState, PokemonInPlay, Card, Deck
+from pktcgai.zobrist import board_hash
+
+CARD_MAP = {
+    1: {"name": "Ralts", "supertype": "Pokémon", "hp": "70"},
+    3: {"name": "Basic Psychic Energy", "supertype": "Energy"},
+    4: {"name": "Basic Psychic Energy", "supertype": "Energy"},
+    10: {"name": "Pikachu", "supertype": "Pokémon", "hp": "60"},
+}
+
+
+def make_board() -> BoardState:
+    player = PlayerState(
+        active=PokemonInPlay(id=1, hp=70, attachedCards=[]), bench=[], discard=[], lostZone=[],
+        deck=Deck([Card(id=4)]), hand=[Card(id=3)], prizeCards=[]
+    )
+    opponent = PlayerState(
+        active=PokemonInPlay(id=10, hp=60, attachedCards=None), bench=[], discard=[], lostZone=[],
+        deck=Deck(), hand=[], prizeCards=[]
+    )
+    return BoardState(playerOne=player, playerTwo=opponent, cardMap=CARD_MAP, seed=7)
+
+
+def attach_energy(state: BoardState) -> None:
+    state.playerOne.active.attachedCards.append(state.playerOne.hand.pop())
+    state.mark_changed()
+
+
+def test_undo_restores_previous_board():
+    state = make_board()
+    history = GameHistory()
+    history.record(state, "start")
+    start_hash = board_hash(state)
+    rng_state = state.rng.getstate()
+
+    state.rng.random()
+    attach_energy(state)
+    history.record(state, "player 1 turn")
+    assert len(history) == 2
+
+    restored = history.undo(state)
+    assert len(history) == 1
+    assert restored.playerOne.hand[0].id == 3
+    assert restored.playerOne.active.attachedCards == []
+    assert restored.playerTwo.active.attachedCards is None
+    assert board_hash(restored) == start_hash
+    assert restored.rng.getstate() == rng_state
+
+
+def test_nothing_to_undo():
+    history = GameHistory()
+    assert history.undo() is None
+    history.record(make_board(), "start")
+    assert history.undo() is None
+    assert len(history) == 1
+
+
+def test_record_skips_unchanged_board():
+    state = make_board()
+    history = GameHistory()
+    head = history.record(state, "start")
+    assert history.record(state, "player 1 turn") is head
+    assert len(history) == 1
+
+
+def test_undo_after_unrecorded_change_returns_last_recorded_board():
+    state = make_board()
+    history = GameHistory()
+    history.record(state, "start")
+    attach_energy(state)
+    history.record(state, "player 1 turn")
+
+    # A failed turn changed the board without being recorded
+    state.playerOne.hand.append(state.playerOne.deck.pop())
+    state.mark_changed()
+
+    restored = history.undo(state)
+    assert len(history) == 2
+    assert [card.id for card in restored.playerOne.hand] == []
+    assert [card.id for card in restored.playerOne.active.attachedCards] == [3]
+    assert history.undo(restored).playerOne.hand[0].id == 3
+
+
+def test_branch_is_independent():
+    state = make_board()
+    history = GameHistory()
+    history.record(state, "start")
+    branch = history.branch()
+
+    attach_energy(state)
+    branch.record(state, "what if")
+    assert len(branch) == 2
+    assert len(history) == 1
+    assert history.head.to_board_state().playerOne.hand[0].id == 3
+    assert branch.head.parent is history.head
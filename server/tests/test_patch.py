@@ -0,0 +1,61 @@
+import pytest
+
+from pktcgai.patch import parse_patch, apply_patch, PatchError
+from pktcgai.state import BoardState, PlayerState, PokemonInPlay, Card
+
+CARD_MAP = {
+    1: {"name": "Ralts", "supertype": "Pokémon", "hp": "70"},
+    2: {"name": "Kirlia", "supertype": "Pokémon", "hp": "80"},
+    3: {"name": "Basic Psychic Energy", "supertype": "Energy"},
+    10: {"name": "Pikachu", "supertype": "Pokémon", "hp": "60"},
+}
+
+
+@pytest.fixture
+def board():
+    player = PlayerState(
+        active=PokemonInPlay(id=1, hp=70, attachedCards=[]), bench=[], discard=[], lostZone=[],
+        deck=[], hand=[Card(id=2), Card(id=3)], prizeCards=[]
+    )
+    opponent = PlayerState(
+        active=PokemonInPlay(id=10, hp=60, attachedCards=[]), bench=[], discard=[], lostZone=[],
+        deck=[], hand=[], prizeCards=[]
+    )
+    return BoardState(playerOne=player, playerTwo=opponent, cardMap=CARD_MAP)
+
+
+def test_parse_patch_requires_moves_or_hp():
+    with pytest.raises(PatchError):
+        parse_patch({"YOUR_HAND": {}})
+    assert parse_patch({"moves": [], "hp": []}).is_empty()
+    assert parse_patch({"moves": [[3, "hand", "attached:1"]]}).moves[0].to_zone == "attached:1"
+
+
+def test_apply_moves_and_damage(board):
+    version = board.version
+    patch = parse_patch({
+        "moves": [{"card_id": 3, "from": "hand", "to": "attached:1"}, {"card_id": 2, "from": "hand", "to": "evolve:1"}],
+        "hp": [{"card_id": 10, "delta": -30}]
+    })
+    apply_patch(board, patch, 1)
+    active = board.playerOne.active
+    assert active.id == 2 and active.hp == 80
+    assert [card.id for card in active.attachedCards] == [3, 1]
+    assert board.playerOne.hand == []
+    assert board.playerTwo.active.hp == 30
+    assert board.version > version
+
+
+def test_invalid_patch_leaves_the_board_unchanged(board):
+    # The first move is valid, the second is not: nothing may be applied
+    patch = parse_patch({"moves": [[3, "hand", "attached:1"], [2, "deck", "bench"]]})
+    with pytest.raises(PatchError):
+        apply_patch(board, patch, 1)
+    assert [card.id for card in board.playerOne.hand] == [2, 3]
+    assert board.playerOne.active.attachedCards == []
+
+
+def test_patch_from_player_two_targets_the_right_side(board):
+    apply_patch(board, parse_patch({"hp": [{"card_id": 1, "delta": -20}], "moves": [[1, "opponent.active", "opponent.discard"]]}), 2)
+    assert board.playerOne.active is None
+    assert [card.id for card in board.playerOne.discard] == [1]
@@ -0,0 +1,36 @@
+import json
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from pktcgai.chains.referee import Referee
+
+GAME_STATE = {"YOUR_HAND": {"hand": [{"id": 1}], "bench": []}, "OPPONENT_HAND": {}}
+UPDATED_STATE = {"YOUR_HAND": {"hand": [], "bench": [{"id": 1, "hp": 70}]}, "OPPONENT_HAND": {}}
+INPUTS = {"game_state": GAME_STATE, "player_action": "FINAL DECISION: Bench ( id: 1 )", "card_id_to_card_mapping": {}}
+
+
+def _response(payload):
+    return "The action is legal.\n```json\n" + payload + "\n```"
+
+
+def test_readable_patch_is_returned():
+    llm = FakeListChatModel(responses=[_response('{"moves": [{"card_id": 1, "from": "hand", "to": "bench"}], "hp": []}')])
+    result = Referee(llm, diff_mode=True).invoke(INPUTS)
+    assert result["is_legal"]
+    assert result["state_patch"]["moves"] == [{"card_id": 1, "from": "hand", "to": "bench"}]
+
+
+def test_unreadable_patch_falls_back_to_full_state():
+    # The diff-mode answer has no valid patch, the full-state Referee is asked next
+    llm = FakeListChatModel(responses=[_response('{"changes": "bench it"}'), _response(json.dumps(UPDATED_STATE))])
+    result = Referee(llm, diff_mode=True).invoke(INPUTS)
+    assert result["is_legal"]
+    assert result.get("state_patch") is None
+    assert result["updated_state"] == UPDATED_STATE
+
+
+def test_illegal_verdict_changes_nothing():
+    llm = FakeListChatModel(responses=["ILLEGAL ACTION: Card ( id: 1 ) is not in your hand."])
+    result = Referee(llm, diff_mode=True).invoke(INPUTS)
+    assert not result["is_legal"]
+    assert result["state_patch"] == {"moves": [], "hp": []}
@@ -0,0 +1,55 @@
+from pktcgai.state import BoardState, PlayerState, PokemonInPlay, Card, Deck
+from pktcgai.zobrist import board_hash, cached_board_hash, compute_board_hash, set_board_hash, move_card, change_hp
+
+CARD_MAP = {
+    1: {"name": "Ralts", "supertype": "Pokémon", "hp": "70"},
+    3: {"name": "Basic Psychic Energy", "supertype": "Energy"},
+    4: {"name": "Basic Psychic Energy", "supertype": "Energy"},
+    10: {"name": "Pikachu", "supertype": "Pokémon", "hp": "60"},
+}
+
+
+def make_board() -> BoardState:
+    player = PlayerState(
+        active=PokemonInPlay(id=1, hp=70, attachedCards=[Card(id=3)]), bench=[], discard=[], lostZone=[],
+        deck=Deck([Card(id=4)]), hand=[], prizeCards=[]
+    )
+    opponent = PlayerState(
+        active=PokemonInPlay(id=10, hp=60, attachedCards=None), bench=[], discard=[], lostZone=[],
+        deck=Deck(), hand=[], prizeCards=[]
+    )
+    return BoardState(playerOne=player, playerTwo=opponent, cardMap=CARD_MAP)
+
+
+def test_hash_is_cached_per_version():
+    state = make_board()
+    assert cached_board_hash(state) is None
+    value = board_hash(state)
+    assert cached_board_hash(state) == value
+    state.mark_changed()
+    assert cached_board_hash(state) is None
+
+
+def test_incremental_draw_matches_full_hash():
+    state = make_board()
+    previous = board_hash(state)
+    card = state.playerOne.deck.draw()
+    state.playerOne.hand.append(card)
+    state.mark_changed()
+    set_board_hash(state, move_card(previous, 1, card.id, "deck", "hand"))
+    assert board_hash(state) == compute_board_hash(state) != previous
+
+
+def test_incremental_hp_change_matches_full_hash():
+    state = make_board()
+    previous = board_hash(state)
+    state.playerTwo.active.hp = 40
+    assert change_hp(previous, 2, 10, 60, 40) == compute_board_hash(state)
+
+
+def test_zone_order_does_not_change_the_hash():
+    state = make_board()
+    state.playerOne.hand = [Card(id=4), Card(id=3)]
+    first = compute_board_hash(state)
+    state.playerOne.hand.reverse()
+    assert compute_board_hash(state) == first